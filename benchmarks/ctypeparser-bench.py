@@ -0,0 +1,129 @@
+#! /usr/bin/env python
+"""
+Micro-benchmark of the C type parser (pybindgen.typehandlers.ctypeparser).
+
+The type strings are those that pybindgen parses while scanning a set
+of header files with castxml and generating the bindings for them, in
+the same order and with the same repetitions:
+
+  ctypeparser-bench.py [--save types.txt] header.h [header.h ...]
+
+They can be saved and later reused without castxml:
+
+  ctypeparser-bench.py --types types.txt
+"""
+from __future__ import print_function
+
+import sys
+import os
+import time
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pybindgen import FileCodeSink
+from pybindgen.typehandlers import ctypeparser
+from pybindgen.typehandlers.ctypeparser import tokenizer
+
+
+def collect_type_strings(header_files, include_paths):
+    """Scan the headers, returning a list of (kind, type_string) in call order"""
+    from pybindgen.castxmlparser import ModuleParser
+    calls = []
+
+    original_normalize_type_string = ctypeparser.normalize_type_string
+    def normalize_type_string(type_string):
+        calls.append(('normalize', type_string))
+        return original_normalize_type_string(type_string)
+
+    original_type_traits_init = ctypeparser.TypeTraits.__init__
+    def type_traits_init(self, ctype):
+        calls.append(('traits', ctype))
+        original_type_traits_init(self, ctype)
+
+    ctypeparser.normalize_type_string = normalize_type_string
+    ctypeparser.TypeTraits.__init__ = type_traits_init
+    try:
+        module_parser = ModuleParser('bench', '::')
+        module = module_parser.parse(header_files, include_paths=include_paths)
+        with open(os.devnull, 'w') as devnull:
+            module.generate(FileCodeSink(devnull))
+    finally:
+        ctypeparser.normalize_type_string = original_normalize_type_string
+        ctypeparser.TypeTraits.__init__ = original_type_traits_init
+    return calls
+
+
+def clear_interning_tables():
+    ctypeparser._parsed_types.clear()
+    ctypeparser._normalized_types.clear()
+    ctypeparser._type_traits.clear()
+
+
+def replay(calls, interned):
+    for kind, type_string in calls:
+        if not interned:
+            clear_interning_tables()
+        if kind == 'normalize':
+            ctypeparser.normalize_type_string(type_string)
+        else:
+            ctypeparser.TypeTraits(type_string)
+
+
+def bench(description, func, repeat):
+    best = None
+    for dummy in range(repeat):
+        clear_interning_tables()
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    print("%-45s %8.2f ms" % (description, best*1e3))
+    return best
+
+
+def main(argv):
+    parser = OptionParser(usage="%prog [options] [header.h ...]")
+    parser.add_option('--types', dest='types_file', metavar='FILE',
+                      help="read the type strings from FILE instead of scanning headers")
+    parser.add_option('--save', dest='save_file', metavar='FILE',
+                      help="save the type strings collected from the headers to FILE")
+    parser.add_option('-I', dest='include_paths', action='append', default=[],
+                      help="add an include path for castxml")
+    parser.add_option('--repeat', dest='repeat', type='int', default=5,
+                      help="number of times each benchmark is run (best time is reported)")
+    options, args = parser.parse_args(argv)
+
+    if options.types_file:
+        with open(options.types_file) as types_file:
+            calls = [tuple(line.rstrip('\n').split('\t', 1)) for line in types_file]
+    elif args:
+        calls = collect_type_strings(args, options.include_paths)
+        if options.save_file:
+            with open(options.save_file, 'w') as save_file:
+                for kind, type_string in calls:
+                    save_file.write('%s\t%s\n' % (kind, type_string))
+    else:
+        parser.error("either header files or --types must be given")
+
+    unique_type_strings = sorted(set(type_string for kind, type_string in calls))
+    print("%i type strings parsed (%i unique)" % (len(calls), len(unique_type_strings)))
+
+    def tokenize_generic():
+        for type_string in unique_type_strings:
+            list(tokenizer.GetTokens(type_string + '\n'))
+    def tokenize_regex():
+        for type_string in unique_type_strings:
+            ctypeparser._tokenize_type(type_string)
+
+    generic = bench("tokenize unique strings, tokenizer.GetTokens", tokenize_generic, options.repeat)
+    regex = bench("tokenize unique strings, regex tokenizer", tokenize_regex, options.repeat)
+    print("%-45s %8.1fx" % ("", generic/regex))
+    uninterned = bench("parse all strings, no interning", lambda: replay(calls, False), options.repeat)
+    interned = bench("parse all strings, interned", lambda: replay(calls, True), options.repeat)
+    print("%-45s %8.1fx" % ("", uninterned/interned))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,90 @@
+AR = ['/usr/bin/ar']
+ARFLAGS = ['rcs']
+BINDIR = '/usr/local/bin'
+CC = ['/usr/bin/gcc']
+CCDEFINES = []
+CCFLAGS = ['-O2', '-g', '-Wall']
+CCFLAGS_PYEXT = ['-fvisibility=hidden']
+CCLNK_SRC_F = []
+CCLNK_TGT_F = ['-o']
+CC_NAME = 'gcc'
+CC_SRC_F = []
+CC_TGT_F = ['-c', '-o']
+CC_VERSION = ('12', '2', '0')
+CFLAGS_MACBUNDLE = ['-fPIC']
+CFLAGS_PYEMBED = ['-g', '-fwrapv', '-O3']
+CFLAGS_PYEXT = ['-g', '-fwrapv', '-O3']
+CFLAGS_cshlib = ['-fPIC']
+COMPILER_CC = 'gcc'
+COMPILER_CXX = 'g++'
+CPPPATH_ST = '-I%s'
+CXX = ['/usr/bin/g++']
+CXXFLAGS = ['-std=c++11', '-g0', '-O0']
+CXXFLAGS_MACBUNDLE = ['-fPIC']
+CXXFLAGS_PYEMBED = ['-g', '-fwrapv', '-O3']
+CXXFLAGS_PYEXT = ['-g', '-fwrapv', '-O3', '-fvisibility=hidden']
+CXXFLAGS_cxxshlib = ['-fPIC']
+CXXLNK_SRC_F = []
+CXXLNK_TGT_F = ['-o']
+CXX_NAME = 'gcc'
+CXX_SRC_F = []
+CXX_TGT_F = ['-c', '-o']
+DEFINES = ['PYTHONDIR="/usr/local/lib/python3.9/site-packages"', 'PYTHONARCHDIR="/usr/local/lib/python3.9/site-packages"', 'HAVE_PYEMBED=1', 'HAVE_PYEXT=1', 'HAVE_PYTHON_H=1', 'HAVE_STDINT_H=1']
+DEFINES_PYEMBED = ['OPENSSL_NO_SSL3', 'NDEBUG']
+DEFINES_PYEXT = ['OPENSSL_NO_SSL3', 'NDEBUG']
+DEFINES_ST = '-D%s'
+DEFINE_COMMENTS = {'PYTHONDIR': '', 'PYTHONARCHDIR': '', 'HAVE_PYEMBED': '', 'HAVE_PYEXT': '', 'HAVE_PYTHON_H': '', 'HAVE_STDINT_H': ''}
+DEST_BINFMT = 'elf'
+DEST_CPU = 'x86_64'
+DEST_OS = 'linux'
+ENABLE_BOOST_SHARED_PTR = True
+ENABLE_CXX11 = True
+ENABLE_PYGCCXML = False
+HAVE_PYEMBED = 1
+HAVE_PYEXT = 1
+HAVE_PYTHON_H = 1
+HAVE_STDINT_H = 1
+INCLUDES_PYEMBED = ['/root/.pyenv/versions/3.9.18/include/python3.9']
+INCLUDES_PYEXT = ['/root/.pyenv/versions/3.9.18/include/python3.9']
+LIBDIR = '/usr/local/lib64'
+LIBPATH_PYEMBED = ['/root/.pyenv/versions/3.9.18/lib']
+LIBPATH_PYEXT = ['/root/.pyenv/versions/3.9.18/lib']
+LIBPATH_ST = '-L%s'
+LIB_PYEMBED = ['python3.9', 'crypt', 'dl', 'm', 'm', 'python3.9', 'crypt', 'dl', 'm', 'm']
+LIB_PYEXT = ['crypt', 'dl', 'm', 'm', 'crypt', 'dl', 'm', 'm']
+LIB_ST = '-l%s'
+LINKFLAGS_MACBUNDLE = ['-bundle', '-undefined', 'dynamic_lookup']
+LINKFLAGS_cshlib = ['-shared']
+LINKFLAGS_cstlib = ['-Wl,-Bstatic']
+LINKFLAGS_cxxshlib = ['-shared']
+LINKFLAGS_cxxstlib = ['-Wl,-Bstatic']
+LINK_CC = ['/usr/bin/gcc']
+LINK_CXX = ['/usr/bin/g++']
+PREFIX = '/usr/local'
+PYC = 1
+PYFLAGS = ''
+PYFLAGS_OPT = '-O'
+PYO = 1
+PYTAG = 'cpython-39'
+PYTHON = ['/root/.pyenv/versions/3.9.18/bin/python']
+PYTHONARCHDIR = '/usr/local/lib/python3.9/site-packages'
+PYTHONDIR = '/usr/local/lib/python3.9/site-packages'
+PYTHON_CONFIG = ['/root/.pyenv/versions/3.9.18/bin/python-config']
+PYTHON_VERSION = '3.9'
+RPATH_PYEMBED = ['/root/.pyenv/versions/3.9.18/lib', '/root/.pyenv/versions/3.9.18/lib']
+RPATH_PYEXT = ['/root/.pyenv/versions/3.9.18/lib', '/root/.pyenv/versions/3.9.18/lib']
+RPATH_ST = '-Wl,-rpath,%s'
+SHLIB_MARKER = '-Wl,-Bdynamic'
+SONAME_ST = '-Wl,-h,%s'
+STLIBPATH_ST = '-L%s'
+STLIB_MARKER = '-Wl,-Bstatic'
+STLIB_ST = '-l%s'
+cprogram_PATTERN = '%s'
+cshlib_PATTERN = 'lib%s.so'
+cstlib_PATTERN = 'lib%s.a'
+cxxprogram_PATTERN = '%s'
+cxxshlib_PATTERN = 'lib%s.so'
+cxxstlib_PATTERN = 'lib%s.a'
+define_key = ['PYTHONDIR', 'PYTHONARCHDIR', 'HAVE_PYEMBED', 'HAVE_PYEXT', 'HAVE_PYTHON_H', 'HAVE_STDINT_H']
+macbundle_PATTERN = '%s.bundle'
+pyext_PATTERN = '%s.cpython-39-x86_64-linux-gnu.so'
@@ -0,0 +1,1320 @@
+/* This file was generated by PyBindGen 0...0...p.o.s.t.1.+.g.b.1.4.6.e.2.a.a.e */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stddef.h>
+
+
+#if PY_VERSION_HEX >= 0x03000000
+#if PY_VERSION_HEX >= 0x03050000
+typedef PyAsyncMethods* cmpfunc;
+#else
+typedef void* cmpfunc;
+#endif
+#define PyCObject_FromVoidPtr(a, b) PyCapsule_New(a, NULL, b)
+#define PyCObject_AsVoidPtr(a) PyCapsule_GetPointer(a, NULL)
+#define PyString_FromString(a) PyBytes_FromString(a)
+#define Py_TPFLAGS_CHECKTYPES 0 /* this flag doesn't exist in python 3 */
+#endif
+
+
+#if     __GNUC__ > 2
+# define PYBINDGEN_UNUSED(param) param __attribute__((__unused__))
+#elif     __GNUC__ > 2 || (__GNUC__ == 2 && __GNUC_MINOR__ > 4)
+# define PYBINDGEN_UNUSED(param) __attribute__((__unused__)) param
+#else
+# define PYBINDGEN_UNUSED(param) param
+#endif  /* !__GNUC__ */
+
+#ifndef _PyBindGenWrapperFlags_defined_
+#define _PyBindGenWrapperFlags_defined_
+typedef enum _PyBindGenWrapperFlags {
+   PYBINDGEN_WRAPPER_FLAG_NONE = 0,
+   PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED = (1<<0),
+} PyBindGenWrapperFlags;
+#endif
+
+#if PY_VERSION_HEX >= 0x03070000 && !defined(PyEval_ThreadsInitialized)
+#define PyEval_ThreadsInitialized() 1
+#endif
+
+
+
+#if PY_VERSION_HEX >= 0x03070000 && !defined(_PyBindGenFastcall_defined_)
+#define _PyBindGenFastcall_defined_
+/* Binds the arguments of a METH_FASTCALL|METH_KEYWORDS call to
+   parameter slots; 'keywords' is the wrapper's static keyword table,
+   and 'interned' its per-wrapper cache of interned keyword strings. */
+static inline int
+_pybindgen_fastcall_bind(const char *funcname, PyObject *const *args, Py_ssize_t nargs,
+                         PyObject *kwnames, const char *const *keywords, PyObject **interned,
+                         Py_ssize_t nparams, Py_ssize_t nrequired, PyObject **out)
+{
+    Py_ssize_t i, k, nkw;
+
+    if (nargs > nparams) {
+        PyErr_Format(PyExc_TypeError, "%s() takes at most %zd arguments (%zd given)",
+                     funcname, nparams, nargs);
+        return -1;
+    }
+    for (i = 0; i < nargs; i++)
+        out[i] = args[i];
+    for (; i < nparams; i++)
+        out[i] = NULL;
+    nkw = (kwnames == NULL ? 0 : PyTuple_GET_SIZE(kwnames));
+    if (nkw == 0)
+        goto check_required;
+    if (keywords == NULL) {
+        PyErr_Format(PyExc_TypeError, "%s() takes no keyword arguments", funcname);
+        return -1;
+    }
+    if (interned[0] == NULL) {
+        /* in reverse order, so that interned[0] is only set when complete */
+        for (i = nparams - 1; i >= 0; i--) {
+            if (interned[i] == NULL && (interned[i] = PyUnicode_InternFromString(keywords[i])) == NULL)
+                return -1;
+        }
+    }
+    for (k = 0; k < nkw; k++) {
+        PyObject *key = PyTuple_GET_ITEM(kwnames, k);
+        for (i = 0; i < nparams; i++) {
+            if (key == interned[i])
+                break;
+        }
+        if (i == nparams) {
+            for (i = 0; i < nparams; i++) {
+                if (PyUnicode_Compare(key, interned[i]) == 0)
+                    break;
+            }
+        }
+        if (i == nparams) {
+            PyErr_Format(PyExc_TypeError, "%s() got an unexpected keyword argument '%U'", funcname, key);
+            return -1;
+        }
+        if (out[i] != NULL) {
+            PyErr_Format(PyExc_TypeError, "%s() got multiple values for argument '%s'", funcname, keywords[i]);
+            return -1;
+        }
+        out[i] = args[nargs + k];
+    }
+check_required:
+    for (i = 0; i < nrequired; i++) {
+        if (out[i] == NULL) {
+            PyErr_Format(PyExc_TypeError, "%s() missing required argument '%s' (pos %zd)",
+                         funcname, keywords != NULL ? keywords[i] : "", i + 1);
+            return -1;
+        }
+    }
+    return 0;
+}
+#endif
+
+
+#ifndef _PyBindGenBufferExporter_defined_
+#define _PyBindGenBufferExporter_defined_
+#if PY_VERSION_HEX >= 0x03000000
+/* Exports a block of C/C++ memory through the buffer protocol, holding
+   a reference to the Python object that owns the memory. */
+typedef struct {
+    PyObject_HEAD
+    PyObject *owner;
+    void *buf;
+    Py_ssize_t shape;
+    Py_ssize_t itemsize;
+    const char *format;
+    int readonly;
+} _PyBindGenBufferExporter;
+
+static int
+_pybindgen_buffer_exporter_getbuffer(PyObject *obj, Py_buffer *view, int flags)
+{
+    _PyBindGenBufferExporter *self = (_PyBindGenBufferExporter *) obj;
+
+    if ((flags & PyBUF_WRITABLE) && self->readonly) {
+        PyErr_SetString(PyExc_BufferError, "buffer is read-only");
+        view->obj = NULL;
+        return -1;
+    }
+    view->obj = obj;
+    Py_INCREF(obj);
+    view->buf = self->buf;
+    view->len = self->shape * self->itemsize;
+    view->readonly = self->readonly;
+    view->itemsize = self->itemsize;
+    view->format = ((flags & PyBUF_FORMAT) ? (char *) self->format : NULL);
+    view->ndim = 1;
+    view->shape = ((flags & PyBUF_ND) ? &self->shape : NULL);
+    view->strides = ((flags & PyBUF_STRIDES) == PyBUF_STRIDES ? &self->itemsize : NULL);
+    view->suboffsets = NULL;
+    view->internal = NULL;
+    return 0;
+}
+
+static void
+_pybindgen_buffer_exporter_dealloc(PyObject *obj)
+{
+    Py_XDECREF(((_PyBindGenBufferExporter *) obj)->owner);
+    PyObject_Del(obj);
+}
+
+static PyBufferProcs _PyBindGenBufferExporter_as_buffer = {
+    (getbufferproc) _pybindgen_buffer_exporter_getbuffer,
+    (releasebufferproc) NULL
+};
+
+static PyTypeObject _PyBindGenBufferExporter_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    (char *) "pybindgen.BufferExporter",      /* tp_name */
+    sizeof(_PyBindGenBufferExporter),         /* tp_basicsize */
+    0,                                        /* tp_itemsize */
+    (destructor) _pybindgen_buffer_exporter_dealloc, /* tp_dealloc */
+    0,                                        /* tp_print / tp_vectorcall_offset */
+    0,                                        /* tp_getattr */
+    0,                                        /* tp_setattr */
+    0,                                        /* tp_compare / tp_as_async */
+    0,                                        /* tp_repr */
+    0,                                        /* tp_as_number */
+    0,                                        /* tp_as_sequence */
+    0,                                        /* tp_as_mapping */
+    0,                                        /* tp_hash */
+    0,                                        /* tp_call */
+    0,                                        /* tp_str */
+    0,                                        /* tp_getattro */
+    0,                                        /* tp_setattro */
+    &_PyBindGenBufferExporter_as_buffer,      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                       /* tp_flags */
+};
+#endif
+
+/* Returns a new memoryview of 'nitems' items of the memory at 'buf'
+   (None if 'buf' is NULL); 'owner', if not NULL, is kept alive for as
+   long as the memory is exported. */
+static inline PyObject *
+_pybindgen_memoryview_from_memory(PyObject *owner, void *buf, Py_ssize_t nitems,
+                                  Py_ssize_t itemsize, const char *format, int readonly)
+{
+#if PY_VERSION_HEX >= 0x03000000
+    _PyBindGenBufferExporter *exporter;
+    PyObject *view;
+#endif
+
+    if (buf == NULL) {
+        Py_INCREF(Py_None);
+        return Py_None;
+    }
+#if PY_VERSION_HEX >= 0x03000000
+    if (!(_PyBindGenBufferExporter_Type.tp_flags & Py_TPFLAGS_READY)) {
+        if (PyType_Ready(&_PyBindGenBufferExporter_Type) < 0)
+            return NULL;
+    }
+    exporter = PyObject_New(_PyBindGenBufferExporter, &_PyBindGenBufferExporter_Type);
+    if (exporter == NULL)
+        return NULL;
+    Py_XINCREF(owner);
+    exporter->owner = owner;
+    exporter->buf = buf;
+    exporter->shape = nitems;
+    exporter->itemsize = itemsize;
+    exporter->format = format;
+    exporter->readonly = readonly;
+    view = PyMemoryView_FromObject((PyObject *) exporter);
+    Py_DECREF(exporter);
+    return view;
+#else
+    (void) owner; (void) format;
+    if (readonly)
+        return PyBuffer_FromMemory(buf, nitems * itemsize);
+    return PyBuffer_FromReadWriteMemory(buf, nitems * itemsize);
+#endif
+}
+#endif
+
+
+#if PY_VERSION_HEX >= 0x03000000 && !defined(_PyBindGenUFunc_defined_)
+#define _PyBindGenUFunc_defined_
+/* NumPy ufunc support, without a build time dependency on NumPy: the
+   ufunc C API table is looked up when the first ufunc is created. */
+typedef void (*_PyBindGenUFuncLoop)(char **args, const Py_intptr_t *dimensions,
+                                    const Py_intptr_t *steps, void *data);
+typedef PyObject *(*_PyBindGenUFuncFromFuncAndData)(_PyBindGenUFuncLoop *loops, void **data, char *types,
+                                                    int ntypes, int nin, int nout, int identity,
+                                                    const char *name, const char *doc, int unused);
+
+/* Returns a new ufunc with the given loops, or NULL, with no exception
+   set, if NumPy is not available. */
+static inline PyObject *
+_pybindgen_ufunc_new(_PyBindGenUFuncLoop *loops, void **data, char *types, int ntypes,
+                     int nin, int nout, const char *name, const char *doc)
+{
+    static void **ufunc_api = NULL;
+    static const char *const umath_modules[] = {
+        "numpy._core._multiarray_umath",  /* NumPy >= 2.0 */
+        "numpy.core._multiarray_umath",
+        NULL
+    };
+    PyObject *module, *capsule;
+    int i;
+
+    for (i = 0; ufunc_api == NULL && umath_modules[i] != NULL; i++) {
+        module = PyImport_ImportModule(umath_modules[i]);
+        if (module == NULL) {
+            PyErr_Clear();
+            continue;
+        }
+        capsule = PyObject_GetAttrString(module, "_UFUNC_API");
+        Py_DECREF(module);
+        if (capsule == NULL) {
+            PyErr_Clear();
+            continue;
+        }
+        ufunc_api = (void **) PyCapsule_GetPointer(capsule, NULL);
+        Py_DECREF(capsule);
+        if (ufunc_api == NULL)
+            PyErr_Clear();
+    }
+    if (ufunc_api == NULL)
+        return NULL;
+    /* PyUFunc_FromFuncAndData is entry 1 of the API table; -1 is PyUFunc_None */
+    return ((_PyBindGenUFuncFromFuncAndData) ufunc_api[1])(loops, data, types, ntypes, nin, nout, -1,
+                                                           name, doc, 0);
+}
+#endif
+
+
+#ifndef _PyBindGenAddWard_defined_
+#define _PyBindGenAddWard_defined_
+/* Keeps 'ward' alive for as long as 'custodian' is alive, by adding
+   it to the custodian's __wards__ list. */
+static inline void
+_pybindgen_add_ward(PyObject *custodian, PyObject *ward)
+{
+    PyObject *wards = PyObject_GetAttrString(custodian, (char *) "__wards__");
+    if (wards == NULL) {
+        PyErr_Clear();
+        wards = PyList_New(0);
+        if (wards == NULL)
+            return;
+        PyObject_SetAttrString(custodian, (char *) "__wards__", wards);
+    }
+    if (ward && !PySequence_Contains(wards, ward))
+        PyList_Append(wards, ward);
+    Py_DECREF(wards);
+}
+#endif
+
+#if defined(__cplusplus) && !defined(_PyBindGenContainerConverters_defined_)
+#define _PyBindGenContainerConverters_defined_
+#include <utility>
+/* Ways of adding a value to a container, named after the method. */
+struct _PyBindGenContainerAdd_push_back {
+    template <typename Container, typename Item>
+    static void add(Container &container, const Item &item) { container.push_back(item); }
+};
+struct _PyBindGenContainerAdd_push {
+    template <typename Container, typename Item>
+    static void add(Container &container, const Item &item) { container.push(item); }
+};
+struct _PyBindGenContainerAdd_insert {
+    template <typename Container, typename Item>
+    static void add(Container &container, const Item &item) { container.insert(item); }
+};
+
+/* Fills a container from a list, converting each item with 'convert';
+   returns 0, with an exception set, if an item cannot be converted. */
+template <typename Add, typename Container, typename Item>
+static int
+_pybindgen_list_to_container(PyObject *arg, Container *container, int (*convert)(PyObject *, Item *))
+{
+    container->clear();
+    Py_ssize_t size = PyList_Size(arg);
+    for (Py_ssize_t i = 0; i < size; i++) {
+        Item item;
+        if (!convert(PyList_GET_ITEM(arg, i), &item)) {
+            return 0;
+        }
+        Add::add(*container, item);
+    }
+    return 1;
+}
+
+/* Fills a mapping from a list of (key, value) tuples. */
+template <typename Add, typename Container, typename Key, typename Value>
+static int
+_pybindgen_list_to_mapping(PyObject *arg, Container *container,
+                           int (*convert_key)(PyObject *, Key *), int (*convert_value)(PyObject *, Value *))
+{
+    container->clear();
+    Py_ssize_t size = PyList_Size(arg);
+    for (Py_ssize_t i = 0; i < size; i++) {
+        PyObject *tup = PyList_GET_ITEM(arg, i);
+        if (!PyTuple_Check(tup) || PyTuple_Size(tup) != 2) {
+            PyErr_SetString(PyExc_TypeError, "items must be tuples with two elements");
+            return 0;
+        }
+        std::pair< Key, Value > item;
+        if (!convert_key(PyTuple_GET_ITEM(tup, 0), &item.first)) {
+            return 0;
+        }
+        if (!convert_value(PyTuple_GET_ITEM(tup, 1), &item.second)) {
+            return 0;
+        }
+        Add::add(*container, item);
+    }
+    return 1;
+}
+#endif
+
+#include "bar.h"
+#include <ostream>
+#include <sstream>
+#include <typeinfo>
+/* --- forward declarations --- */
+
+
+typedef struct {
+    PyObject_HEAD
+    ::boost::shared_ptr< Foo > obj;
+    PyBindGenWrapperFlags flags:8;
+} PyFoo;
+
+
+extern PyTypeObject PyFoo_Type;
+extern PyTypeObject PyFooMeta_Type;
+int PyFooMeta_Type__tp_setattro(PyObject *type, PyObject *name, PyObject *value);
+
+
+
+#include <map>
+#include <string>
+#include <typeinfo>
+#if __cplusplus >= 201103L
+# include <unordered_map>
+#endif
+#if defined(__GNUC__) && __GNUC__ >= 3 && !defined(__clang__)
+# include <cxxabi.h>
+#endif
+
+#define PBG_TYPEMAP_DEBUG 0
+
+namespace pybindgen {
+
+class TypeMap
+{
+   std::map<std::string, PyTypeObject *> m_map;
+
+   // lookup_wrapper results, keyed by type_info address; a NULL
+   // wrapper means no registered wrapper was found, i.e. the fallback
+   // wrapper is to be used.  Cleared whenever a wrapper is registered.
+#if __cplusplus >= 201103L
+   typedef std::unordered_map<const std::type_info *, PyTypeObject *> Cache;
+#else
+   typedef std::map<const std::type_info *, PyTypeObject *> Cache;
+#endif
+   Cache m_cache;
+
+   PyTypeObject * find_wrapper(const char *type_name) const
+   {
+       std::map<std::string, PyTypeObject *>::const_iterator iter = m_map.find(type_name);
+       return (iter == m_map.end())? NULL : iter->second;
+   }
+
+public:
+
+   TypeMap() {}
+
+   void register_wrapper(const std::type_info &cpp_type_info, PyTypeObject *python_wrapper)
+   {
+
+#if PBG_TYPEMAP_DEBUG
+   std::cerr << "register_wrapper(this=" << this << ", type_name=" << cpp_type_info.name()
+             << ", python_wrapper=" << python_wrapper->tp_name << ")" << std::endl;
+#endif
+
+       m_map[std::string(cpp_type_info.name())] = python_wrapper;
+       m_cache.clear();
+   }
+
+   PyTypeObject * lookup_wrapper(const std::type_info &cpp_type_info, PyTypeObject *fallback_wrapper)
+   {
+
+#if PBG_TYPEMAP_DEBUG
+   std::cerr << "lookup_wrapper(this=" << this << ", type_name=" << cpp_type_info.name() << ")" << std::endl;
+#endif
+
+       PyTypeObject *python_wrapper;
+       Cache::const_iterator iter = m_cache.find(&cpp_type_info);
+       if (iter != m_cache.end()) {
+           python_wrapper = iter->second;
+       } else {
+           python_wrapper = resolve_wrapper(cpp_type_info);
+           m_cache[&cpp_type_info] = python_wrapper;
+       }
+       return python_wrapper? python_wrapper : fallback_wrapper;
+   }
+
+
+
+private:
+
+   PyTypeObject * resolve_wrapper(const std::type_info &cpp_type_info) const
+   {
+       PyTypeObject *python_wrapper = find_wrapper(cpp_type_info.name());
+       if (python_wrapper)
+           return python_wrapper;
+       else {
+#if defined(__GNUC__) && __GNUC__ >= 3 && !defined(__clang__)
+
+           // Get closest (in the single inheritance tree provided by cxxabi.h)
+           // registered python wrapper.
+           const abi::__si_class_type_info *_typeinfo =
+               dynamic_cast<const abi::__si_class_type_info*> (&cpp_type_info);
+#if PBG_TYPEMAP_DEBUG
+          std::cerr << "  -> looking at C++ type " << _typeinfo->name() << std::endl;
+#endif
+           while (_typeinfo && (python_wrapper = find_wrapper(_typeinfo->name())) == 0) {
+               _typeinfo = dynamic_cast<const abi::__si_class_type_info*> (_typeinfo->__base_type);
+#if PBG_TYPEMAP_DEBUG
+               std::cerr << "  -> looking at C++ type " << _typeinfo->name() << std::endl;
+#endif
+           }
+
+#if PBG_TYPEMAP_DEBUG
+          if (python_wrapper) {
+              std::cerr << "  -> found match " << std::endl;
+          } else {
+              std::cerr << "  -> return fallback wrapper" << std::endl;
+          }
+#endif
+
+           return python_wrapper;
+
+#else // non gcc 3+ compilers can only match against explicitly registered classes, not hidden subclasses
+           return NULL;
+#endif
+       }
+   }
+};
+
+}
+
+
+extern pybindgen::TypeMap PyFoo__typeid_map;
+
+
+typedef struct {
+    PyObject_HEAD
+    ClassThatTakesFoo *obj;
+    PyObject *inst_dict;
+    PyBindGenWrapperFlags flags:8;
+} PyClassThatTakesFoo;
+
+
+extern PyTypeObject PyClassThatTakesFoo_Type;
+
+class PyClassThatTakesFoo__PythonHelper : public ClassThatTakesFoo
+{
+public:
+    PyObject *m_pyself;
+
+    /* interned python names of the virtual methods, see generate() */
+    static PyObject *_pybindgen_method_names[1];
+
+    /* bitmasks of the virtual methods overridden by python classes */
+    struct _PyBindGenOverridesEntry {
+        PyTypeObject *type;
+        unsigned int version;
+        unsigned long overrides[1];
+    };
+    static _PyBindGenOverridesEntry _pybindgen_overrides_cache[8];
+
+    /* Returns true if the python object overrides the virtual method
+       number 'index', i.e. if it has to be called from C++ */
+    bool _pybindgen_overrides(unsigned int index) const
+    {
+        static const char *names[1] = {"get_modified_foo"};
+        PyTypeObject *type = Py_TYPE(m_pyself);
+        _PyBindGenOverridesEntry *entry =
+            &_pybindgen_overrides_cache[((size_t) type / sizeof(void *)) % 8];
+        _PyBindGenOverridesEntry computed;
+        PyObject *dict;
+
+        if (entry->type != type
+            || entry->version != type->tp_version_tag
+            || !PyType_HasFeature(type, Py_TPFLAGS_VALID_VERSION_TAG)) {
+            unsigned int i;
+            memset(&computed, 0, sizeof(computed));
+            for (i = 0; i < 1; i++) {
+                PyObject *attr = PyObject_GetAttrString((PyObject *) type, (char *) names[i]);
+                if (attr == NULL) {
+                    PyErr_Clear();
+                } else if (Py_TYPE(attr) != &PyMethodDescr_Type && !PyCFunction_Check(attr)) {
+                    computed.overrides[i / 32] |= (1UL << (i % 32));
+                }
+                Py_XDECREF(attr);
+            }
+            /* the lookups above assign the version tag, if possible */
+            if (PyType_HasFeature(type, Py_TPFLAGS_VALID_VERSION_TAG)) {
+                computed.type = type;
+                computed.version = type->tp_version_tag;
+                *entry = computed;
+            } else {
+                entry = &computed;
+            }
+        }
+        if (entry->overrides[index / 32] & (1UL << (index % 32))) {
+            return true;
+        }
+        /* an instance attribute may still override the method */
+        if (type->tp_dictoffset == 0) {
+            return false;
+        }
+        if (type->tp_dictoffset < 0) {
+            return true;
+        }
+        dict = *(PyObject **) ((char *) m_pyself + type->tp_dictoffset);
+        if (dict == NULL || PyDict_Size(dict) == 0) {
+            return false;
+        }
+        if (_pybindgen_method_names[index] == NULL) {
+            return true;
+        }
+        return PyDict_GetItem(dict, _pybindgen_method_names[index]) != NULL;
+    }
+
+    PyClassThatTakesFoo__PythonHelper(boost::shared_ptr< Foo > foo)
+        : ClassThatTakesFoo(foo), m_pyself(NULL)
+        {}
+
+
+    void set_pyobj(PyObject *pyobj)
+    {
+        Py_XDECREF(m_pyself);
+        Py_INCREF(pyobj);
+        m_pyself = pyobj;
+    }
+
+    virtual ~PyClassThatTakesFoo__PythonHelper()
+    {
+        Py_CLEAR(m_pyself);
+    }
+
+
+    virtual boost::shared_ptr< Foo > get_modified_foo(boost::shared_ptr< Foo > foo) const;
+};
+
+/* --- module functions --- */
+
+
+PyObject *
+_wrap_bar_function_that_takes_foo(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    PyFoo *foo;
+    ::boost::shared_ptr< Foo > foo_ptr;
+    const char *keywords[] = {"foo", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!", (char **) keywords, &PyFoo_Type, &foo)) {
+        return NULL;
+    }
+    if (foo) { foo_ptr = foo->obj; }
+    function_that_takes_foo(foo_ptr);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+PyObject * _wrap_bar_function_that_takes_foo(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+
+
+PyObject *
+_wrap_bar_function_that_returns_foo(PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    boost::shared_ptr< Foo > retval;
+    PyFoo *py_Foo;
+    PyTypeObject *wrapper_type = 0;
+
+    retval = function_that_returns_foo();
+    if (!(retval)) {
+        Py_INCREF(Py_None);
+        return Py_None;
+    }
+    wrapper_type = PyFoo__typeid_map.lookup_wrapper(typeid((*retval)), &PyFoo_Type);
+    py_Foo = PyObject_New(PyFoo, wrapper_type);
+    new(&py_Foo->obj) ::boost::shared_ptr< Foo >;
+    py_Foo->obj = retval;
+    py_Foo->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    #if PY_VERSION_HEX >= 0x03000000
+    py_retval = (PyObject *) py_Foo;
+    #else
+    py_retval = Py_BuildValue((char *) "N", py_Foo);
+    #endif
+    return py_retval;
+}
+PyObject * _wrap_bar_function_that_returns_foo(PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs));
+
+static PyMethodDef bar_functions[] = {
+    {(char *) "function_that_takes_foo", (PyCFunction) _wrap_bar_function_that_takes_foo, METH_KEYWORDS|METH_VARARGS, "function_that_takes_foo(foo)\n\ntype: foo: boost::shared_ptr< Foo >" },
+    {(char *) "function_that_returns_foo", (PyCFunction) _wrap_bar_function_that_returns_foo, METH_NOARGS, "function_that_returns_foo()\n\n" },
+    {NULL, NULL, 0, NULL}
+};
+/* --- classes --- */
+
+
+
+pybindgen::TypeMap PyFoo__typeid_map;
+
+static PyObject* _wrap_PyFoo__get_instance_count(PyObject * PYBINDGEN_UNUSED(obj), void * PYBINDGEN_UNUSED(closure))
+{
+    PyObject *py_retval;
+
+    #if PY_VERSION_HEX >= 0x03000000
+    py_retval = PyLong_FromLong((long) Foo::instance_count);
+    #else
+    py_retval = Py_BuildValue((char *) "i", Foo::instance_count);
+    #endif
+    return py_retval;
+}
+static int _wrap_PyFoo__set_instance_count(PyFoo * PYBINDGEN_UNUSED(dummy), PyObject *value, void * PYBINDGEN_UNUSED(closure))
+{
+    PyObject *py_retval;
+
+    py_retval = Py_BuildValue((char *) "(O)", value);
+    if (!PyArg_ParseTuple(py_retval, (char *) "i", &Foo::instance_count)) {
+        Py_DECREF(py_retval);
+        return -1;
+    }
+    Py_DECREF(py_retval);
+    return 0;
+}
+static PyGetSetDef FooMeta__getsets[] = {
+    {
+        (char*) "instance_count", /* attribute name */
+        (getter) _wrap_PyFoo__get_instance_count, /* C function to get the attribute */
+        (setter) _wrap_PyFoo__set_instance_count, /* C function to set the attribute */
+        NULL, /* optional doc string */
+        NULL /* optional additional data for getter and setter */
+    },
+    { NULL, NULL, NULL, NULL, NULL }
+};
+
+int
+PyFooMeta_Type__tp_setattro(PyObject *type, PyObject *name, PyObject *value)
+{
+    int res = PyObject_GenericSetAttr(type, name, value);
+    /* like type.__setattr__, invalidate the caches of the class attributes */
+    if (res == 0) {
+        PyType_Modified((PyTypeObject *) type);
+    }
+    return res;
+}
+
+
+PyTypeObject PyFooMeta_Type = {
+        PyVarObject_HEAD_INIT(NULL, 0)
+	(char *) "FooMeta",		        /* tp_name */
+	0,					/* tp_basicsize */
+	0,					/* tp_itemsize */
+	0,	 				/* tp_dealloc */
+	0,					/* tp_print */
+	0,					/* tp_getattr */
+	0,					/* tp_setattr */
+	0,					/* tp_compare */
+	0,					/* tp_repr */
+	0,					/* tp_as_number */
+	0,					/* tp_as_sequence */
+	0,		       			/* tp_as_mapping */
+	0,					/* tp_hash */
+	0,					/* tp_call */
+	0,					/* tp_str */
+	0,					/* tp_getattro */
+	0,					/* tp_setattro */
+	0,					/* tp_as_buffer */
+	Py_TPFLAGS_DEFAULT|Py_TPFLAGS_HAVE_GC|Py_TPFLAGS_BASETYPE, /* tp_flags */
+ 	0,					/* tp_doc */
+	0,					/* tp_traverse */
+ 	0,					/* tp_clear */
+	0,					/* tp_richcompare */
+	0,					/* tp_weaklistoffset */
+	0,					/* tp_iter */
+	0,					/* tp_iternext */
+	0,					/* tp_methods */
+	0,					/* tp_members */
+	FooMeta__getsets,				/* tp_getset */
+	0,					/* tp_base */
+	0,					/* tp_dict */
+	0,	                                /* tp_descr_get */
+	0,  		                        /* tp_descr_set */
+	0,					/* tp_dictoffset */
+	0,					/* tp_init */
+	0,					/* tp_alloc */
+	0,					/* tp_new */
+	0,               			/* tp_free */
+        0,                                      /* tp_is_gc */
+        0,                                      /* tp_bases */
+        0,                                      /* tp_mro */
+        0,                                      /* tp_cache */
+        0,                                      /* tp_subclasses */
+        0,                                      /* tp_weaklist */
+        0                                       /* tp_del */
+};
+
+
+
+static int
+_wrap_PyFoo__tp_init__0(PyFoo *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+{
+    const char *datum;
+    Py_ssize_t datum_len;
+    const char *keywords[] = {"datum", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#", (char **) keywords, &datum, &datum_len)) {
+        {
+            PyObject *exc_type, *traceback;
+            PyErr_Fetch(&exc_type, return_exception, &traceback);
+            Py_XDECREF(exc_type);
+            Py_XDECREF(traceback);
+        }
+        return -1;
+    }
+    self->obj.reset (new Foo(std::string(datum, datum_len)));
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
+}
+
+static int
+_wrap_PyFoo__tp_init__0__may_match(PyObject *args, PyObject *kwargs)
+{
+    #if PY_VERSION_HEX >= 0x03000000
+    Py_ssize_t nargs = PyTuple_GET_SIZE(args);
+    Py_ssize_t nkwargs = (kwargs == NULL ? 0 : PyDict_Size(kwargs));
+    Py_ssize_t nkwfound = 0;
+    PyObject *obj;
+
+    if (nargs + nkwargs < 1 || nargs + nkwargs > 1) {
+        return 0;
+    }
+    obj = (nargs > 0 ? PyTuple_GET_ITEM(args, 0) : NULL);
+    if (obj == NULL && nkwargs > 0 && (obj = PyDict_GetItemString(kwargs, "datum")) != NULL) {
+        nkwfound++;
+    }
+    if (obj == NULL) {
+        return 0;
+    }
+    return (nkwfound == nkwargs);
+    #else
+    return 1;
+    #endif
+}
+
+static int
+_wrap_PyFoo__tp_init__1(PyFoo *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+{
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        {
+            PyObject *exc_type, *traceback;
+            PyErr_Fetch(&exc_type, return_exception, &traceback);
+            Py_XDECREF(exc_type);
+            Py_XDECREF(traceback);
+        }
+        return -1;
+    }
+    self->obj.reset (new Foo());
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
+}
+
+static int
+_wrap_PyFoo__tp_init__1__may_match(PyObject *args, PyObject *kwargs)
+{
+    #if PY_VERSION_HEX >= 0x03000000
+    Py_ssize_t nargs = PyTuple_GET_SIZE(args);
+    Py_ssize_t nkwargs = (kwargs == NULL ? 0 : PyDict_Size(kwargs));
+    return (nargs == 0 && nkwargs == 0);
+    #else
+    return 1;
+    #endif
+}
+
+int _wrap_PyFoo__tp_init(PyFoo *self, PyObject *args, PyObject *kwargs)
+{
+    int retval;
+    PyObject *error_list;
+    PyObject *exceptions[2] = {0,};
+    if (_wrap_PyFoo__tp_init__0__may_match(args, kwargs)) {
+        retval = _wrap_PyFoo__tp_init__0(self, args, kwargs, &exceptions[0]);
+        if (!exceptions[0]) {
+            Py_XDECREF(exceptions[1]);
+            return retval;
+        }
+    }
+    if (_wrap_PyFoo__tp_init__1__may_match(args, kwargs)) {
+        retval = _wrap_PyFoo__tp_init__1(self, args, kwargs, &exceptions[1]);
+        if (!exceptions[1]) {
+            Py_XDECREF(exceptions[0]);
+            return retval;
+        }
+    }
+    if (!exceptions[0]) {
+        retval = _wrap_PyFoo__tp_init__0(self, args, kwargs, &exceptions[0]);
+        if (!exceptions[0]) {
+            Py_XDECREF(exceptions[1]);
+            return retval;
+        }
+    }
+    if (!exceptions[1]) {
+        retval = _wrap_PyFoo__tp_init__1(self, args, kwargs, &exceptions[1]);
+        if (!exceptions[1]) {
+            Py_XDECREF(exceptions[0]);
+            return retval;
+        }
+    }
+    error_list = PyList_New(2);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyList_SET_ITEM(error_list, 1, PyObject_Str(exceptions[1]));
+    Py_DECREF(exceptions[1]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return -1;
+}
+
+
+PyObject *
+_wrap_PyFoo_get_datum(PyFoo *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    std::string retval;
+
+    retval = self->obj->get_datum();
+    #if PY_VERSION_HEX >= 0x03000000
+    py_retval = PyUnicode_FromStringAndSize((retval).c_str(), (retval).size());
+    #else
+    py_retval = Py_BuildValue((char *) "s#", (retval).c_str(), (retval).size());
+    #endif
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyFoo_is_initialized(PyFoo *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    bool retval;
+
+    retval = self->obj->is_initialized();
+    #if PY_VERSION_HEX >= 0x03000000
+    py_retval = (PyObject *) PyBool_FromLong(retval);
+    #else
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    #endif
+    return py_retval;
+}
+
+static PyMethodDef PyFoo_methods[] = {
+    {(char *) "get_datum", (PyCFunction) _wrap_PyFoo_get_datum, METH_NOARGS, "get_datum()\n\n" },
+    {(char *) "is_initialized", (PyCFunction) _wrap_PyFoo_is_initialized, METH_NOARGS, "is_initialized()\n\n" },
+    {NULL, NULL, 0, NULL}
+};
+
+static void
+_wrap_PyFoo__tp_dealloc(PyFoo *self)
+{
+    self->obj.~shared_ptr< Foo >();
+    Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+
+
+static PyObject *
+_wrap_PyFoo__tp_str(PyFoo *self)
+{
+    std::ostringstream oss;
+    oss << *self->obj;
+    return PyUnicode_FromString(oss.str ().c_str ());
+}
+
+
+PyTypeObject PyFoo_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    (char *) "bar.Foo",            /* tp_name */
+    sizeof(PyFoo),                  /* tp_basicsize */
+    0,                                 /* tp_itemsize */
+    /* methods */
+    (destructor)_wrap_PyFoo__tp_dealloc,        /* tp_dealloc */
+    (printfunc)0,                      /* tp_print */
+    (getattrfunc)NULL,       /* tp_getattr */
+    (setattrfunc)NULL,       /* tp_setattr */
+#if PY_MAJOR_VERSION >= 3
+    NULL,
+#else
+    (cmpfunc)NULL,           /* tp_compare */
+#endif
+    (reprfunc)NULL,             /* tp_repr */
+    (PyNumberMethods*)NULL,     /* tp_as_number */
+    (PySequenceMethods*)NULL, /* tp_as_sequence */
+    (PyMappingMethods*)NULL,   /* tp_as_mapping */
+    (hashfunc)NULL,             /* tp_hash */
+    (ternaryfunc)NULL,          /* tp_call */
+    (reprfunc)_wrap_PyFoo__tp_str,              /* tp_str */
+    (getattrofunc)NULL,     /* tp_getattro */
+    (setattrofunc)NULL,     /* tp_setattro */
+    (PyBufferProcs*)NULL,  /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                      /* tp_flags */
+    "Foo(datum)\nFoo()",                        /* Documentation string */
+    (traverseproc)NULL,     /* tp_traverse */
+    (inquiry)NULL,             /* tp_clear */
+    (richcmpfunc)NULL,   /* tp_richcompare */
+    0,             /* tp_weaklistoffset */
+    (getiterfunc)NULL,          /* tp_iter */
+    (iternextfunc)NULL,     /* tp_iternext */
+    (struct PyMethodDef*)PyFoo_methods, /* tp_methods */
+    (struct PyMemberDef*)0,              /* tp_members */
+    0,                     /* tp_getset */
+    NULL,                              /* tp_base */
+    NULL,                              /* tp_dict */
+    (descrgetfunc)NULL,    /* tp_descr_get */
+    (descrsetfunc)NULL,    /* tp_descr_set */
+    0,                 /* tp_dictoffset */
+    (initproc)_wrap_PyFoo__tp_init,             /* tp_init */
+    (allocfunc)PyType_GenericAlloc,           /* tp_alloc */
+    (newfunc)PyType_GenericNew,               /* tp_new */
+    (freefunc)0,             /* tp_free */
+    (inquiry)NULL,             /* tp_is_gc */
+    NULL,                              /* tp_bases */
+    NULL,                              /* tp_mro */
+    NULL,                              /* tp_cache */
+    NULL,                              /* tp_subclasses */
+    NULL,                              /* tp_weaklist */
+    (destructor) NULL                  /* tp_del */
+};
+
+
+
+PyObject *PyClassThatTakesFoo__PythonHelper::_pybindgen_method_names[1];
+PyClassThatTakesFoo__PythonHelper::_PyBindGenOverridesEntry PyClassThatTakesFoo__PythonHelper::_pybindgen_overrides_cache[8];
+
+
+boost::shared_ptr< Foo >
+PyClassThatTakesFoo__PythonHelper::get_modified_foo(boost::shared_ptr< Foo > foo) const
+{
+    PyGILState_STATE __py_gil_state;
+    PyObject *py_method;
+    ClassThatTakesFoo *self_obj_before;
+    PyObject *py_retval;
+    boost::shared_ptr< Foo > retval;
+    PyFoo *py_Foo;
+    PyTypeObject *wrapper_type = 0;
+    PyFoo *tmp_Foo;
+
+    __py_gil_state = (PyEval_ThreadsInitialized() ? PyGILState_Ensure() : (PyGILState_STATE) 0);
+    #if PY_VERSION_HEX >= 0x03090000
+    py_method = NULL;
+    if (!_pybindgen_overrides(0)) {
+    #else
+    py_method = (_pybindgen_overrides(0) ? PyObject_GetAttrString(m_pyself, (char *) "get_modified_foo") : NULL); PyErr_Clear();
+    if (py_method == NULL || Py_TYPE(py_method) == &PyCFunction_Type) {
+    #endif
+        Py_XDECREF(py_method);
+        if (PyEval_ThreadsInitialized())
+            PyGILState_Release(__py_gil_state);
+        return ClassThatTakesFoo::get_modified_foo(foo);
+    }
+    self_obj_before = reinterpret_cast< PyClassThatTakesFoo* >(m_pyself)->obj;
+    reinterpret_cast< PyClassThatTakesFoo* >(m_pyself)->obj = const_cast< ClassThatTakesFoo* >((const ClassThatTakesFoo*) this);
+    wrapper_type = PyFoo__typeid_map.lookup_wrapper(typeid(*foo), &PyFoo_Type);
+    py_Foo = PyObject_New(PyFoo, wrapper_type);
+    new(&py_Foo->obj) ::boost::shared_ptr< Foo >;
+    py_Foo->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    py_Foo->obj = foo;
+    #if PY_VERSION_HEX >= 0x03090000
+    {
+        PyObject *py_args[3];
+        py_args[1] = m_pyself;
+        py_args[2] = (PyObject *) py_Foo;
+        if (py_args[2] == NULL) {
+            Py_XDECREF(py_args[2]);
+            py_retval = NULL;
+        } else {
+            py_retval = PyObject_VectorcallMethod(PyClassThatTakesFoo__PythonHelper::_pybindgen_method_names[0], py_args + 1, 2 | PY_VECTORCALL_ARGUMENTS_OFFSET, NULL);
+            Py_DECREF(py_args[2]);
+        }
+    }
+    #else
+    py_retval = PyObject_CallMethod(m_pyself, (char *) "get_modified_foo", (char *) "N", py_Foo);
+    #endif
+    if (py_retval == NULL) {
+        PyErr_Print();
+        reinterpret_cast< PyClassThatTakesFoo* >(m_pyself)->obj = self_obj_before;
+        Py_XDECREF(py_method);
+        if (PyEval_ThreadsInitialized())
+            PyGILState_Release(__py_gil_state);
+        return ClassThatTakesFoo::get_modified_foo(foo);
+    }
+    py_retval = Py_BuildValue((char*) "(N)", py_retval);
+    if (!PyArg_ParseTuple(py_retval, (char *) "O!", &PyFoo_Type, &tmp_Foo)) {
+        PyErr_Print();
+        Py_DECREF(py_retval);
+        reinterpret_cast< PyClassThatTakesFoo* >(m_pyself)->obj = self_obj_before;
+        Py_XDECREF(py_method);
+        if (PyEval_ThreadsInitialized())
+            PyGILState_Release(__py_gil_state);
+        return ClassThatTakesFoo::get_modified_foo(foo);
+    }
+    retval = tmp_Foo->obj;
+    Py_DECREF(py_retval);
+    reinterpret_cast< PyClassThatTakesFoo* >(m_pyself)->obj = self_obj_before;
+    Py_XDECREF(py_method);
+    if (PyEval_ThreadsInitialized())
+        PyGILState_Release(__py_gil_state);
+    return retval;
+}
+
+static int
+_wrap_PyClassThatTakesFoo__tp_init(PyClassThatTakesFoo *self, PyObject *args, PyObject *kwargs)
+{
+    PyFoo *foo;
+    ::boost::shared_ptr< Foo > foo_ptr;
+    const char *keywords[] = {"foo", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!", (char **) keywords, &PyFoo_Type, &foo)) {
+        return -1;
+    }
+    if (foo) { foo_ptr = foo->obj; }
+    if (Py_TYPE(self) != &PyClassThatTakesFoo_Type)
+    {
+        self->obj = new PyClassThatTakesFoo__PythonHelper(foo_ptr);
+        self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+        ((PyClassThatTakesFoo__PythonHelper*) self->obj)->set_pyobj((PyObject *)self);
+    } else {
+        // visibility: 'public'
+        self->obj = new ClassThatTakesFoo(foo_ptr);
+        self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    }
+    return 0;
+}
+
+
+PyObject *
+_wrap_PyClassThatTakesFoo_get_foo(PyClassThatTakesFoo *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    boost::shared_ptr< Foo > retval;
+    PyFoo *py_Foo;
+    PyTypeObject *wrapper_type = 0;
+
+    retval = self->obj->get_foo();
+    if (!(retval)) {
+        Py_INCREF(Py_None);
+        return Py_None;
+    }
+    wrapper_type = PyFoo__typeid_map.lookup_wrapper(typeid((*retval)), &PyFoo_Type);
+    py_Foo = PyObject_New(PyFoo, wrapper_type);
+    new(&py_Foo->obj) ::boost::shared_ptr< Foo >;
+    py_Foo->obj = retval;
+    py_Foo->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    #if PY_VERSION_HEX >= 0x03000000
+    py_retval = (PyObject *) py_Foo;
+    #else
+    py_retval = Py_BuildValue((char *) "N", py_Foo);
+    #endif
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyClassThatTakesFoo_get_modified_foo(PyClassThatTakesFoo *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    boost::shared_ptr< Foo > retval;
+    PyFoo *foo;
+    ::boost::shared_ptr< Foo > foo_ptr;
+    PyClassThatTakesFoo__PythonHelper *helper_class = dynamic_cast<PyClassThatTakesFoo__PythonHelper*> (self->obj);
+    const char *keywords[] = {"foo", NULL};
+    PyFoo *py_Foo;
+    PyTypeObject *wrapper_type = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!", (char **) keywords, &PyFoo_Type, &foo)) {
+        return NULL;
+    }
+    if (foo) { foo_ptr = foo->obj; }
+    retval = (helper_class == NULL)? (self->obj->get_modified_foo(foo_ptr)) : (self->obj->ClassThatTakesFoo::get_modified_foo(foo_ptr));
+    if (!(retval)) {
+        Py_INCREF(Py_None);
+        return Py_None;
+    }
+    wrapper_type = PyFoo__typeid_map.lookup_wrapper(typeid((*retval)), &PyFoo_Type);
+    py_Foo = PyObject_New(PyFoo, wrapper_type);
+    new(&py_Foo->obj) ::boost::shared_ptr< Foo >;
+    py_Foo->obj = retval;
+    py_Foo->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    #if PY_VERSION_HEX >= 0x03000000
+    py_retval = (PyObject *) py_Foo;
+    #else
+    py_retval = Py_BuildValue((char *) "N", py_Foo);
+    #endif
+    return py_retval;
+}
+
+static PyMethodDef PyClassThatTakesFoo_methods[] = {
+    {(char *) "get_foo", (PyCFunction) _wrap_PyClassThatTakesFoo_get_foo, METH_NOARGS, "get_foo()\n\n" },
+    {(char *) "get_modified_foo", (PyCFunction) _wrap_PyClassThatTakesFoo_get_modified_foo, METH_KEYWORDS|METH_VARARGS, "get_modified_foo(foo)\n\ntype: foo: boost::shared_ptr< Foo >" },
+    {NULL, NULL, 0, NULL}
+};
+
+static void
+PyClassThatTakesFoo__tp_clear(PyClassThatTakesFoo *self)
+{
+    Py_CLEAR(self->inst_dict);
+        ClassThatTakesFoo *tmp = self->obj;
+    self->obj = NULL;
+    if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {
+        delete tmp;
+    }
+}
+
+
+static int
+PyClassThatTakesFoo__tp_traverse(PyClassThatTakesFoo *self, visitproc visit, void *arg)
+{
+    Py_VISIT(self->inst_dict);
+
+    if (self->obj && typeid(*self->obj).name() == typeid(PyClassThatTakesFoo__PythonHelper).name() )
+        Py_VISIT((PyObject *) self);
+
+    return 0;
+}
+
+
+static void
+_wrap_PyClassThatTakesFoo__tp_dealloc(PyClassThatTakesFoo *self)
+{
+    PyClassThatTakesFoo__tp_clear(self);
+    Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+PyTypeObject PyClassThatTakesFoo_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    (char *) "bar.ClassThatTakesFoo",            /* tp_name */
+    sizeof(PyClassThatTakesFoo),                  /* tp_basicsize */
+    0,                                 /* tp_itemsize */
+    /* methods */
+    (destructor)_wrap_PyClassThatTakesFoo__tp_dealloc,        /* tp_dealloc */
+    (printfunc)0,                      /* tp_print */
+    (getattrfunc)NULL,       /* tp_getattr */
+    (setattrfunc)NULL,       /* tp_setattr */
+#if PY_MAJOR_VERSION >= 3
+    NULL,
+#else
+    (cmpfunc)NULL,           /* tp_compare */
+#endif
+    (reprfunc)NULL,             /* tp_repr */
+    (PyNumberMethods*)NULL,     /* tp_as_number */
+    (PySequenceMethods*)NULL, /* tp_as_sequence */
+    (PyMappingMethods*)NULL,   /* tp_as_mapping */
+    (hashfunc)NULL,             /* tp_hash */
+    (ternaryfunc)NULL,          /* tp_call */
+    (reprfunc)NULL,              /* tp_str */
+    (getattrofunc)NULL,     /* tp_getattro */
+    (setattrofunc)NULL,     /* tp_setattro */
+    (PyBufferProcs*)NULL,  /* tp_as_buffer */
+    Py_TPFLAGS_BASETYPE|Py_TPFLAGS_DEFAULT|Py_TPFLAGS_HAVE_GC,                      /* tp_flags */
+    "ClassThatTakesFoo(foo)",                        /* Documentation string */
+    (traverseproc)PyClassThatTakesFoo__tp_traverse,     /* tp_traverse */
+    (inquiry)PyClassThatTakesFoo__tp_clear,             /* tp_clear */
+    (richcmpfunc)NULL,   /* tp_richcompare */
+    0,             /* tp_weaklistoffset */
+    (getiterfunc)NULL,          /* tp_iter */
+    (iternextfunc)NULL,     /* tp_iternext */
+    (struct PyMethodDef*)PyClassThatTakesFoo_methods, /* tp_methods */
+    (struct PyMemberDef*)0,              /* tp_members */
+    0,                     /* tp_getset */
+    NULL,                              /* tp_base */
+    NULL,                              /* tp_dict */
+    (descrgetfunc)NULL,    /* tp_descr_get */
+    (descrsetfunc)NULL,    /* tp_descr_set */
+    offsetof(PyClassThatTakesFoo, inst_dict),                 /* tp_dictoffset */
+    (initproc)_wrap_PyClassThatTakesFoo__tp_init,             /* tp_init */
+    (allocfunc)PyType_GenericAlloc,           /* tp_alloc */
+    (newfunc)PyType_GenericNew,               /* tp_new */
+    (freefunc)0,             /* tp_free */
+    (inquiry)NULL,             /* tp_is_gc */
+    NULL,                              /* tp_bases */
+    NULL,                              /* tp_mro */
+    NULL,                              /* tp_cache */
+    NULL,                              /* tp_subclasses */
+    NULL,                              /* tp_weaklist */
+    (destructor) NULL                  /* tp_del */
+};
+
+
+#if PY_VERSION_HEX >= 0x03000000
+static struct PyModuleDef bar_moduledef = {
+    PyModuleDef_HEAD_INIT,
+    "bar",
+    NULL,
+    -1,
+    bar_functions,
+};
+#endif
+
+
+#if PY_VERSION_HEX >= 0x03000000
+    #define MOD_ERROR NULL
+    #define MOD_INIT(name) PyObject* PyInit_##name(void)
+    #define MOD_RETURN(val) val
+#else
+    #define MOD_ERROR
+    #define MOD_INIT(name) void init##name(void)
+    #define MOD_RETURN(val)
+#endif
+#if defined(__cplusplus)
+extern "C"
+#endif
+#if defined(__GNUC__) && __GNUC__ >= 4
+__attribute__ ((visibility("default")))
+#endif
+
+
+MOD_INIT(bar)
+{
+    PyObject *m;
+    #if PY_VERSION_HEX >= 0x03000000
+    m = PyModule_Create(&bar_moduledef);
+    #else
+    m = Py_InitModule3((char *) "bar", bar_functions, NULL);
+    #endif
+    if (m == NULL) {
+        return MOD_ERROR;
+    }
+    PyModule_AddObject(m, (char *) "_PyFoo__typeid_map", PyCObject_FromVoidPtr(&PyFoo__typeid_map, NULL));
+    PyFoo__typeid_map.register_wrapper(typeid(Foo), &PyFoo_Type);
+    /* Register the 'Foo' class */
+
+    PyFooMeta_Type.tp_base = Py_TYPE(&PyBaseObject_Type);
+    /* Some fields need to be manually inheritted from the parent metaclass */
+    PyFooMeta_Type.tp_traverse = Py_TYPE(&PyBaseObject_Type)->tp_traverse;
+    PyFooMeta_Type.tp_clear = Py_TYPE(&PyBaseObject_Type)->tp_clear;
+    PyFooMeta_Type.tp_is_gc = Py_TYPE(&PyBaseObject_Type)->tp_is_gc;
+    /* PyType tp_setattro is too restrictive */
+    PyFooMeta_Type.tp_setattro = PyFooMeta_Type__tp_setattro;
+    PyType_Ready(&PyFooMeta_Type);
+
+    Py_TYPE(&PyFoo_Type) = &PyFooMeta_Type;
+    if (PyType_Ready(&PyFoo_Type)) {
+        return MOD_ERROR;
+    }
+    PyModule_AddObject(m, (char *) "Foo", (PyObject *) &PyFoo_Type);
+    #if PY_VERSION_HEX >= 0x03000000
+    PyClassThatTakesFoo__PythonHelper::_pybindgen_method_names[0] = PyUnicode_InternFromString("get_modified_foo");
+    if (PyErr_Occurred()) {
+        return MOD_ERROR;
+    }
+    #endif
+    /* Register the 'ClassThatTakesFoo' class */
+    if (PyType_Ready(&PyClassThatTakesFoo_Type)) {
+        return MOD_ERROR;
+    }
+    PyModule_AddObject(m, (char *) "ClassThatTakesFoo", (PyObject *) &PyClassThatTakesFoo_Type);
+    return MOD_RETURN(m);
+}
@@ -1,7 +1,7 @@
-from pybindgen.typehandlers.base import ReturnValue, Parameter
+from pybindgen.typehandlers.base import ReturnValue, Parameter, BufferParameter, BufferReturnValue
 from pybindgen.module import Module
 from pybindgen.function import Function
-from pybindgen.typehandlers.codesink import CodeSink, FileCodeSink
+from pybindgen.typehandlers.codesink import CodeSink, FileCodeSink, WriteIfChangedCodeSink, SpoolCodeSink
 from pybindgen.cppclass import CppMethod, CppClass, CppConstructor
 from pybindgen.enum import Enum
 from pybindgen.utils import write_preamble, param, retval
@@ -9,7 +9,7 @@ from .typehandlers.base import ForwardWrapperBase, ReverseWrapperBase, \
     TypeConfigurationError, NotSupportedError
 
 from pybindgen.typehandlers import codesink
-from pybindgen.pytypeobject import PyTypeObject
+from pybindgen.pytypeobject import PyTypeObject, PyTypeFreelist
 from .typehandlers.ctypeparser import TypeTraits
 from . import settings
 from . import utils
@@ -94,13 +94,41 @@ container_traits_list = {
     'unordered_map':	ContainerTraits(add_value_method='insert', is_mapping=True),
 }
 
+## struct module format characters of the element types for which
+## contiguous containers export the buffer protocol
+buffer_formats = {
+    'signed char': 'b',
+    'unsigned char': 'B',
+    'int8_t': 'b',
+    'uint8_t': 'B',
+    'short': 'h',
+    'unsigned short': 'H',
+    'int16_t': 'h',
+    'uint16_t': 'H',
+    'int': 'i',
+    'unsigned int': 'I',
+    'int32_t': 'i',
+    'uint32_t': 'I',
+    'long': 'l',
+    'unsigned long': 'L',
+    'long long': 'q',
+    'unsigned long long': 'Q',
+    'int64_t': 'q',
+    'uint64_t': 'Q',
+    'size_t': 'N',
+    'ssize_t': 'n',
+    'float': 'f',
+    'double': 'd',
+}
+
 # from wikipedia: """Deque is sometimes written dequeue, but this use
 # is generally deprecated in technical literature or technical writing
 # because dequeue is also a verb meaning "to remove from a queue" """.
 container_traits_list['dequeue'] = container_traits_list['deque']
 
 class Container(object):
-    def __init__(self, name, value_type, container_type, outer_class=None, custom_name=None):
+    def __init__(self, name, value_type, container_type, outer_class=None, custom_name=None,
+                 freelist_size=None):
         """
         :param name: C++ type name of the container, e.g. std::vector<int> or MyIntList
 
@@ -118,6 +146,11 @@ class Container(object):
 
         :param custom_name: alternative name to register with in the Python module
 
+        :param freelist_size: if not None, the maximum number of
+            deallocated container (and container iterator) wrapper
+            structures kept in a freelist for reuse (see
+            :class:`pybindgen.pytypeobject.PyTypeFreelist`)
+
         """
         if '<' in name or '::' in name:
             self.name = utils.mangle_name(name)
@@ -141,6 +174,9 @@ class Container(object):
         self.iter_pytype = PyTypeObject()
         self._iter_pystruct = None
 
+        self.freelist_size = freelist_size
+        self._freelists = None
+
         if self.container_traits.is_mapping:
             (key_type, value_type) = value_type
             self.key_type = utils.eval_retval(key_type, self)
@@ -198,6 +234,47 @@ class Container(object):
     def __repr__(self):
         return "<pybindgen.Container %r>" % self.full_name
 
+    def get_freelists(self):
+        """
+        Returns a (container, iterator) tuple of PyTypeFreelist
+        objects, or None if the container does not have freelists.
+        """
+        if not self.freelist_size:
+            return None
+        if self._freelists is None:
+            self._freelists = (PyTypeFreelist(self.pystruct, self.pytypestruct, self.freelist_size),
+                               PyTypeFreelist(self.iter_pystruct, self.iter_pytypestruct, self.freelist_size,
+                                              is_gc=True))
+        return self._freelists
+
+    def _get_allocation_expression(self):
+        if self.get_freelists() is not None:
+            return self.get_freelists()[0].get_new_expression('&' + self.pytypestruct)
+        return "PyObject_New(%s, &%s)" % (self.pystruct, self.pytypestruct)
+
+    def get_new_expression(self):
+        """
+        Returns a C expression that allocates a new container wrapper
+        structure (the obj field is left uninitialized).
+        """
+        if self.get_buffer_format() is not None:
+            return "_wrap_%s__new()" % (self.pystruct,)
+        return self._get_allocation_expression()
+
+    def get_buffer_format(self):
+        """
+        Returns the buffer protocol format of the container elements,
+        or None if the container does not export the buffer protocol.
+        Only vectors of arithmetic types (see buffer_formats) are
+        supported, since other containers are not contiguous.
+        """
+        if self.container_traits is not container_traits_list['vector'] or self.key_type is not None:
+            return None
+        ctype = str(self.value_type.ctype)
+        if ctype.startswith('std::'):
+            ctype = ctype[len('std::'):]
+        return buffer_formats.get(ctype, None)
+
     def get_module(self):
         """Get the Module object this type belongs to"""
         return self._module
@@ -292,12 +369,17 @@ class Container(object):
         """
 
         # container pystruct
+        if self.get_buffer_format() is not None:
+            ## number of buffer views
+            buffer_fields = "    Py_ssize_t exports;\n"
+        else:
+            buffer_fields = ""
         code_sink.writeln('''
 typedef struct {
     PyObject_HEAD
     %s *obj;
-} %s;
-    ''' % (self.full_name, self.pystruct))
+%s} %s;
+    ''' % (self.full_name, buffer_fields, self.pystruct))
 
         # container iterator pystruct
         code_sink.writeln('''
@@ -311,6 +393,20 @@ typedef struct {
         code_sink.writeln()
         code_sink.writeln('extern PyTypeObject %s;' % (self.pytypestruct,))
         code_sink.writeln('extern PyTypeObject %s;' % (self.iter_pytypestruct,))
+        if self.get_freelists() is not None:
+            for freelist in self.get_freelists():
+                freelist.generate_forward_declarations(code_sink)
+        if self.get_buffer_format() is not None:
+            code_sink.writeln('''
+static inline %(PYSTRUCT)s *
+_wrap_%(PYSTRUCT)s__new(void)
+{
+    %(PYSTRUCT)s *self = %(ALLOC)s;
+    if (self != NULL) {
+        self->exports = 0;
+    }
+    return self;
+}''' % dict(PYSTRUCT=self.pystruct, ALLOC=self._get_allocation_expression()))
         code_sink.writeln()
 
         this_type_converter = self.module.get_root().get_python_to_c_type_converter_function_name(
@@ -372,8 +468,79 @@ typedef struct {
         self._generate_destructor(code_sink)
         self._generate_iter_methods(code_sink)
         self._generate_container_constructor(code_sink)
+        if self.get_buffer_format() is not None:
+            self._generate_buffer_methods(code_sink)
+        if self.get_freelists() is not None:
+            container_freelist, iter_freelist = self.get_freelists()
+            container_freelist.generate(code_sink, module, self.pytype)
+            iter_freelist.generate(code_sink, module, self.iter_pytype)
         self._generate_type_structure(code_sink, docstring)
 
+    def _generate_buffer_methods(self, code_sink):
+        """
+        Generates the buffer protocol functions, exporting the
+        container elements as a writable one-dimensional buffer.  The
+        container cannot be resized (re-initialized) while buffer views
+        are alive; C++ code that keeps a reference to the container
+        must not resize it either, since the views point to its
+        elements.  Each view has its own shape, kept in view->internal.
+        """
+        subst_vars = {
+            'PYSTRUCT': self.pystruct,
+            'ITEM_CTYPE': self.value_type.ctype,
+            'FORMAT': self.get_buffer_format(),
+            }
+        code_sink.writeln(r'''
+static int
+_wrap_%(PYSTRUCT)s__bf_getbuffer(%(PYSTRUCT)s *self, Py_buffer *view, int flags)
+{
+    if (view == NULL) {
+        PyErr_SetString(PyExc_BufferError, "NULL view in getbuffer");
+        return -1;
+    }
+    if (self->obj == NULL) {
+        PyErr_SetString(PyExc_BufferError, "container not initialized");
+        return -1;
+    }
+    view->internal = PyMem_Malloc(sizeof(Py_ssize_t));
+    if (view->internal == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    *(Py_ssize_t *) view->internal = (Py_ssize_t) self->obj->size();
+    view->obj = (PyObject *) self;
+    Py_INCREF(self);
+    view->buf = (self->obj->empty() ? (void *) self->obj : (void *) &(*self->obj)[0]);
+    view->itemsize = sizeof(%(ITEM_CTYPE)s);
+    view->len = *(Py_ssize_t *) view->internal * view->itemsize;
+    view->readonly = 0;
+    view->format = ((flags & PyBUF_FORMAT) ? (char *) "%(FORMAT)s" : NULL);
+    view->ndim = 1;
+    view->shape = ((flags & PyBUF_ND) ? (Py_ssize_t *) view->internal : NULL);
+    view->strides = ((flags & PyBUF_STRIDES) == PyBUF_STRIDES ? &view->itemsize : NULL);
+    view->suboffsets = NULL;
+    self->exports++;
+    return 0;
+}
+
+static void
+_wrap_%(PYSTRUCT)s__bf_releasebuffer(%(PYSTRUCT)s *self, Py_buffer *view)
+{
+    PyMem_Free(view->internal);
+    view->internal = NULL;
+    self->exports--;
+}
+
+static PyBufferProcs %(PYSTRUCT)s__py_buffer_procs = {
+#if PY_VERSION_HEX < 0x03000000
+    NULL, NULL, NULL, NULL,
+#endif
+    (getbufferproc) _wrap_%(PYSTRUCT)s__bf_getbuffer,
+    (releasebufferproc) _wrap_%(PYSTRUCT)s__bf_releasebuffer
+};
+''' % subst_vars)
+        self.pytype.slots.setdefault("tp_as_buffer", "&%s__py_buffer_procs" % (self.pystruct,))
+
     def _generate_type_structure(self, code_sink, docstring):
         """generate the type structure"""
 
@@ -474,12 +641,16 @@ static void
             'ITER_PYTYPESTRUCT': self.iter_pytypestruct,
             'CTYPE': self.full_name,
             }
+        if self.get_freelists() is not None:
+            subst_vars['ITER_NEW'] = self.get_freelists()[1].get_new_expression('&' + self.iter_pytypestruct)
+        else:
+            subst_vars['ITER_NEW'] = 'PyObject_GC_New(%s, &%s)' % (self.iter_pystruct, self.iter_pytypestruct)
         # -- container --
         code_sink.writeln(r'''
 static PyObject*
 %(CONTAINER_ITER_FUNC)s(%(PYSTRUCT)s *self)
 {
-    %(ITER_PYSTRUCT)s *iter = PyObject_GC_New(%(ITER_PYSTRUCT)s, &%(ITER_PYTYPESTRUCT)s);
+    %(ITER_PYSTRUCT)s *iter = %(ITER_NEW)s;
     Py_INCREF(self);
     iter->container = self;
     iter->iterator = new %(CTYPE)s::iterator(self->obj->begin());
@@ -527,7 +698,15 @@ static PyObject*
             'ITEM_CTYPE': self.value_type.ctype,
             'CONTAINER_CONVERTER_FUNC_NAME': this_type_converter,
             'ADD_VALUE': self.container_traits.add_value_method,
+            'CHECK_EXPORTS': '',
             }
+        if self.get_buffer_format() is not None:
+            subst_vars['CHECK_EXPORTS'] = r'''
+    if (self->exports > 0) {
+        PyErr_SetString(PyExc_BufferError, "cannot re-initialize a container with exported buffers");
+        return -1;
+    }
+'''
 
         if self.key_type is None:
 
@@ -539,15 +718,8 @@ int %(CONTAINER_CONVERTER_FUNC_NAME)s(PyObject *arg, %(CTYPE)s *container)
     if (PyObject_IsInstance(arg, (PyObject*) &%(PYTYPESTRUCT)s)) {
         *container = *((%(PYSTRUCT)s*)arg)->obj;
     } else if (PyList_Check(arg)) {
-        container->clear();
-        Py_ssize_t size = PyList_Size(arg);
-        for (Py_ssize_t i = 0; i < size; i++) {
-            %(ITEM_CTYPE)s item;
-            if (!%(ITEM_CONVERTER)s(PyList_GET_ITEM(arg, i), &item)) {
-                return 0;
-            }
-            container->%(ADD_VALUE)s(item);
-        }
+        return _pybindgen_list_to_container< _PyBindGenContainerAdd_%(ADD_VALUE)s, %(CTYPE)s, %(ITEM_CTYPE)s >
+            (arg, container, %(ITEM_CONVERTER)s);
     } else {
         PyErr_SetString(PyExc_TypeError, "parameter must be None, a %(PYTHON_NAME)s instance, or a list of %(ITEM_CTYPE)s");
         return 0;
@@ -571,23 +743,8 @@ int %(CONTAINER_CONVERTER_FUNC_NAME)s(PyObject *arg, %(CTYPE)s *container)
     if (PyObject_IsInstance(arg, (PyObject*) &%(PYTYPESTRUCT)s)) {
         *container = *((%(PYSTRUCT)s*)arg)->obj;
     } else if (PyList_Check(arg)) {
-        container->clear();
-        Py_ssize_t size = PyList_Size(arg);
-        for (Py_ssize_t i = 0; i < size; i++) {
-            PyObject *tup = PyList_GET_ITEM(arg, i);
-            if (!PyTuple_Check(tup) || PyTuple_Size(tup) != 2) {
-                PyErr_SetString(PyExc_TypeError, "items must be tuples with two elements");
-                return 0;
-            }
-            std::pair< %(KEY_CTYPE)s, %(ITEM_CTYPE)s > item;
-            if (!%(KEY_CONVERTER)s(PyTuple_GET_ITEM(tup, 0), &item.first)) {
-                return 0;
-            }
-            if (!%(ITEM_CONVERTER)s(PyTuple_GET_ITEM(tup, 1), &item.second)) {
-                return 0;
-            }
-            container->%(ADD_VALUE)s(item);
-        }
+        return _pybindgen_list_to_mapping< _PyBindGenContainerAdd_%(ADD_VALUE)s, %(CTYPE)s, %(KEY_CTYPE)s, %(ITEM_CTYPE)s >
+            (arg, container, %(KEY_CONVERTER)s, %(ITEM_CONVERTER)s);
     } else {
         PyErr_SetString(PyExc_TypeError, "parameter must be None, a %(PYTHON_NAME)s instance, or a list of %(ITEM_CTYPE)s");
         return 0;
@@ -608,7 +765,7 @@ static int
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "|O", (char **) keywords, &arg)) {
         return -1;
     }
-
+%(CHECK_EXPORTS)s
     self->obj = new %(CTYPE)s;
 
     if (arg == NULL)
@@ -693,8 +850,8 @@ class ContainerParameter(ContainerParameterBase):
         self.py_name = wrapper.declarations.declare_variable(
             self.container_type.pystruct+'*', 'py_'+self.container_type.name)
         wrapper.before_call.write_code(
-            "%s = PyObject_New(%s, %s);" %
-            (self.py_name, self.container_type.pystruct, '&'+self.container_type.pytypestruct))
+            "%s = %s;" %
+            (self.py_name, self.container_type.get_new_expression()))
 
         wrapper.before_call.write_code("%s->obj = new %s(%s);" % (self.py_name, self.container_type.full_name, self.value))
 
@@ -728,8 +885,8 @@ class ContainerRefParameter(ContainerParameterBase):
             py_name = wrapper.declarations.declare_variable(
                 self.container_type.pystruct+'*', 'py_'+self.container_type.name)
             wrapper.after_call.write_code(
-                "%s = PyObject_New(%s, %s);" %
-                (py_name, self.container_type.pystruct, '&'+self.container_type.pytypestruct))
+                "%s = %s;" %
+                (py_name, self.container_type.get_new_expression()))
             wrapper.after_call.write_code("%s->obj = new %s(%s);" % (py_name, self.container_type.full_name, container_tmp_var))
             wrapper.build_params.add_parameter("N", [py_name])
 
@@ -740,8 +897,8 @@ class ContainerRefParameter(ContainerParameterBase):
         self.py_name = wrapper.declarations.declare_variable(
             self.container_type.pystruct+'*', 'py_'+self.container_type.name)
         wrapper.before_call.write_code(
-            "%s = PyObject_New(%s, %s);" %
-            (self.py_name, self.container_type.pystruct, '&'+self.container_type.pytypestruct))
+            "%s = %s;" %
+            (self.py_name, self.container_type.get_new_expression()))
 
         if self.direction & Parameter.DIRECTION_IN:
             wrapper.before_call.write_code("%s->obj = new %s(%s);" % (self.py_name, self.container_type.full_name, self.name))
@@ -800,8 +957,8 @@ class ContainerPtrParameter(ContainerParameterBase):
                 self.container_type.pystruct+'*', 'py_'+self.container_type.name)
 
             wrapper.after_call.write_code(
-                "%s = PyObject_New(%s, %s);" %
-                (py_name, self.container_type.pystruct, '&'+self.container_type.pytypestruct))
+                "%s = %s;" %
+                (py_name, self.container_type.get_new_expression()))
 
             wrapper.after_call.write_code("%s->obj = %s;" % (py_name, container_tmp_var))
 
@@ -855,8 +1012,8 @@ class ContainerReturnValue(ContainerReturnValueBase):
         self.py_name = py_name
 
         wrapper.after_call.write_code(
-            "%s = PyObject_New(%s, %s);" %
-            (py_name, self.container_type.pystruct, '&'+self.container_type.pytypestruct))
+            "%s = %s;" %
+            (py_name, self.container_type.get_new_expression()))
         wrapper.after_call.write_code("%s->obj = new %s(%s);" % (self.py_name, self.container_type.full_name, self.value))
         wrapper.build_params.add_parameter("N", [py_name], prepend=True)
 
@@ -117,16 +117,7 @@ class CToPythonConverter(ForwardWrapperBase):
         code_sink.indent()
 
 
-        params = self.build_params.get_parameters()
-        if params:
-            if params == ['""']:
-                self.after_call.write_code('Py_INCREF(Py_None);')
-                self.after_call.write_code('py_retval = Py_None;')
-            else:
-                assert params[0][0] == '"'
-                params[0] = "(char *) " + params[0]
-                self.after_call.write_code('py_retval = Py_BuildValue(%s);' %
-                                           (', '.join(params),))
+        self.write_build_value()
 
         ## cleanup and return
         self.after_call.write_cleanup()
@@ -276,6 +276,19 @@ class PyMetaclass(object):
         """
         Generate the metaclass to code_sink and register it in the module.
         """
+        code_sink.writeln('''
+int
+%(pytypestruct)s__tp_setattro(PyObject *type, PyObject *name, PyObject *value)
+{
+    int res = PyObject_GenericSetAttr(type, name, value);
+    /* like type.__setattr__, invalidate the caches of the class attributes */
+    if (res == 0) {
+        PyType_Modified((PyTypeObject *) type);
+    }
+    return res;
+}
+''' % dict(pytypestruct=self.pytypestruct))
+
         code_sink.writeln('''
 PyTypeObject %(pytypestruct)s = {
         PyVarObject_HEAD_INIT(NULL, 0)
@@ -335,7 +348,7 @@ PyTypeObject %(pytypestruct)s = {
 %(pytypestruct)s.tp_clear = %(parent_metaclass)s->tp_clear;
 %(pytypestruct)s.tp_is_gc = %(parent_metaclass)s->tp_is_gc;
 /* PyType tp_setattro is too restrictive */
-%(pytypestruct)s.tp_setattro = PyObject_GenericSetAttr;
+%(pytypestruct)s.tp_setattro = %(pytypestruct)s__tp_setattro;
 PyType_Ready(&%(pytypestruct)s);
 """ % dict(pytypestruct=self.pytypestruct, parent_metaclass=self.parent_metaclass_expr))
         
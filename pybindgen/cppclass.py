@@ -24,7 +24,7 @@ from pybindgen.cppattribute import CppInstanceAttributeGetter, CppInstanceAttrib
     CppStaticAttributeGetter, CppStaticAttributeSetter, \
     PyGetSetDef, PyMetaclass
 
-from pybindgen.pytypeobject import PyTypeObject, PyNumberMethods, PySequenceMethods
+from pybindgen.pytypeobject import PyTypeObject, PyNumberMethods, PySequenceMethods, PyTypeFreelist
 from pybindgen.cppcustomattribute import CppCustomInstanceAttributeGetter, CppCustomInstanceAttributeSetter
 
 from pybindgen import settings
@@ -241,7 +241,7 @@ class SmartPointerPolicy(MemoryPolicy):
     pointer_template = None # class should fill this or create descriptor/getter
 
 def default_instance_creation_function(cpp_class, code_block, lvalue,
-                                       parameters, construct_type_name):
+                                       parameters, construct_type_name, py_wrapper=None):
     """
     Default "instance creation function"; it is called whenever a new
     C++ class instance needs to be created; this default
@@ -254,12 +254,21 @@ def default_instance_creation_function(cpp_class, code_block, lvalue,
     :param construct_type_name: actual name of type to be constructed (it is
                           not always the class name, sometimes it's
                           the python helper class)
+    :param py_wrapper: python wrapper expression whose obj field is
+                       lvalue, if any; only given for classes with
+                       inline storage, whose objects can then be
+                       constructed inside the wrapper
     """
     assert lvalue
     assert not lvalue.startswith('None')
     if cpp_class.incomplete_type:
         raise CodeGenerationError("%s cannot be constructed (incomplete type)"
                                   % cpp_class.full_name)
+    if py_wrapper is not None and construct_type_name == cpp_class.full_name:
+        ## construct the object inside the python wrapper itself
+        code_block.write_code(
+            "%s = %s;" % (lvalue, cpp_class.get_inline_new_expression(py_wrapper, parameters)))
+        return
     code_block.write_code(
         "%s = new %s(%s);" % (lvalue, construct_type_name, parameters))
 
@@ -269,6 +278,10 @@ class CppHelperClass(object):
     forwarding virtual methods from C++ to Python.
     """
 
+    ## number of python classes whose overridden virtual methods are
+    ## remembered at the same time, see _generate_virtual_overrides_support()
+    OVERRIDES_CACHE_SIZE = 8
+
     def __init__(self, class_):
         """
         :param class_: original CppClass wrapper object
@@ -282,6 +295,130 @@ class CppHelperClass(object):
         self.post_generation_code = []
         self.virtual_methods = []
 
+    def get_virtual_override_names(self):
+        """
+        Returns the list of Python method names that can override
+        virtual methods of the class; the position of a name in the
+        list is its bit in the helper class overrides bitmask.
+        """
+        names = []
+        for virtual_proxy in self.virtual_proxies:
+            name = virtual_proxy.get_python_method_name()
+            if name not in names:
+                names.append(name)
+        return names
+
+    def _generate_virtual_overrides_support(self, code_sink):
+        """
+        Generates the helper class members that find out which
+        virtual methods are overridden by the python class of
+        m_pyself.  The bitmask of the overridden methods is computed
+        once per python class, and kept in a small table shared by
+        all the instances of the helper class, indexed by the python
+        type; it is recomputed when the class is modified (i.e. when
+        its type version tag changes).
+        """
+        names = self.get_virtual_override_names()
+        if not names:
+            return
+        nwords = (len(names) + 31) // 32
+        code_sink.writeln("""
+/* interned python names of the virtual methods, see generate() */
+static PyObject *_pybindgen_method_names[%(NNAMES)i];
+
+/* bitmasks of the virtual methods overridden by python classes */
+struct _PyBindGenOverridesEntry {
+    PyTypeObject *type;
+    unsigned int version;
+    unsigned long overrides[%(NWORDS)i];
+};
+static _PyBindGenOverridesEntry _pybindgen_overrides_cache[%(CACHE_SIZE)i];
+
+/* Returns true if the python object overrides the virtual method
+   number 'index', i.e. if it has to be called from C++ */
+bool _pybindgen_overrides(unsigned int index) const
+{
+    static const char *names[%(NNAMES)i] = {%(NAMES)s};
+    PyTypeObject *type = Py_TYPE(m_pyself);
+    _PyBindGenOverridesEntry *entry =
+        &_pybindgen_overrides_cache[((size_t) type / sizeof(void *)) %% %(CACHE_SIZE)i];
+    _PyBindGenOverridesEntry computed;
+    PyObject *dict;
+
+    if (entry->type != type
+        || entry->version != type->tp_version_tag
+        || !PyType_HasFeature(type, Py_TPFLAGS_VALID_VERSION_TAG)) {
+        unsigned int i;
+        memset(&computed, 0, sizeof(computed));
+        for (i = 0; i < %(NNAMES)i; i++) {
+            PyObject *attr = PyObject_GetAttrString((PyObject *) type, (char *) names[i]);
+            if (attr == NULL) {
+                PyErr_Clear();
+            } else if (Py_TYPE(attr) != &PyMethodDescr_Type && !PyCFunction_Check(attr)) {
+                computed.overrides[i / 32] |= (1UL << (i %% 32));
+            }
+            Py_XDECREF(attr);
+        }
+        /* the lookups above assign the version tag, if possible */
+        if (PyType_HasFeature(type, Py_TPFLAGS_VALID_VERSION_TAG)) {
+            computed.type = type;
+            computed.version = type->tp_version_tag;
+            *entry = computed;
+        } else {
+            entry = &computed;
+        }
+    }
+    if (entry->overrides[index / 32] & (1UL << (index %% 32))) {
+        return true;
+    }
+    /* an instance attribute may still override the method */
+    if (type->tp_dictoffset == 0) {
+        return false;
+    }
+    if (type->tp_dictoffset < 0) {
+        return true;
+    }
+    dict = *(PyObject **) ((char *) m_pyself + type->tp_dictoffset);
+    if (dict == NULL || PyDict_Size(dict) == 0) {
+        return false;
+    }
+    if (_pybindgen_method_names[index] == NULL) {
+        return true;
+    }
+    return PyDict_GetItem(dict, _pybindgen_method_names[index]) != NULL;
+}
+""" % dict(NWORDS=nwords, NNAMES=len(names), CACHE_SIZE=self.OVERRIDES_CACHE_SIZE,
+           NAMES=', '.join(['"%s"' % name for name in names])))
+
+    def get_method_name_expression(self, name):
+        """
+        Returns a C expression for the interned python string of the
+        given virtual method name (see get_virtual_override_names);
+        the expression is NULL before python 3.
+        """
+        return "%s::_pybindgen_method_names[%i]" % (
+            self.name, self.get_virtual_override_names().index(name))
+
+    def _generate_method_names(self, code_sink):
+        """
+        Defines the array of interned virtual method names, and
+        generates the code to fill it in at module initialization.
+        Also defines the table of overridden methods bitmasks.
+        """
+        names = self.get_virtual_override_names()
+        if not names:
+            return
+        code_sink.writeln("PyObject *%s::_pybindgen_method_names[%i];" % (self.name, len(names)))
+        code_sink.writeln("%s::_PyBindGenOverridesEntry %s::_pybindgen_overrides_cache[%i];\n"
+                          % (self.name, self.name, self.OVERRIDES_CACHE_SIZE))
+        after_init = self.class_.module.after_init
+        after_init.write_code("#if PY_VERSION_HEX >= 0x03000000")
+        for name in names:
+            after_init.write_code('%s = PyUnicode_InternFromString("%s");'
+                                  % (self.get_method_name_expression(name), name))
+        after_init.write_error_check("PyErr_Occurred()")
+        after_init.write_code("#endif")
+
     def add_virtual_method(self, method):
         assert method.is_virtual
         assert method.class_ is not None
@@ -379,6 +516,9 @@ class CppHelperClass(object):
         code_sink.indent()
         code_sink.writeln("PyObject *m_pyself;")
 
+        if not self.class_.import_from_module:
+            self._generate_virtual_overrides_support(code_sink)
+
         if not self.class_.import_from_module:
             ## replicate the parent constructors in the helper class
             implemented_constructor_signatures = []
@@ -422,16 +562,12 @@ void set_pyobj(PyObject *pyobj)
             for parent_caller in self.virtual_parent_callers.values():
                 #parent_caller.class_ = self.class_
                 parent_caller.helper_class = self
-                parent_caller.reset_code_generation_state()
                 ## test code generation
                 try:
-                    try:
-                        utils.call_with_error_handling(parent_caller.generate,
-                                                       (NullCodeSink(),), {}, parent_caller)
-                    except utils.SkipWrapper:
-                        continue
-                finally:
-                    parent_caller.reset_code_generation_state()
+                    utils.call_with_error_handling(parent_caller.generate,
+                                                   (NullCodeSink(),), {}, parent_caller)
+                except utils.SkipWrapper:
+                    continue
 
                 code_sink.writeln()
                 parent_caller.generate_class_declaration(code_sink)
@@ -484,6 +620,8 @@ void set_pyobj(PyObject *pyobj)
         if self.class_.import_from_module:
             return
 
+        self._generate_method_names(code_sink)
+
         ## write the parent callers (_name)
         method_defs = []
         for name, parent_caller in self.virtual_parent_callers.items():
@@ -542,7 +680,9 @@ class CppClass(object):
                  docstring=None,
                  custom_name=None,
                  import_from_module=None,
-                 destructor_visibility='public'
+                 destructor_visibility='public',
+                 freelist_size=None,
+                 inline_storage=False
                  ):
         """
         :param name: class name
@@ -601,6 +741,24 @@ class CppClass(object):
 
         :param import_from_module: if not None, the type is imported
                     from a foreign Python module with the given name.
+
+        :param freelist_size: if not None, the maximum number of
+                    deallocated wrapper structures that are kept in a
+                    freelist, to be reused by new wrappers of this
+                    class (see :class:`pybindgen.pytypeobject.PyTypeFreelist`).
+
+        :param inline_storage: if True, C++ objects created by the
+                    wrappers (by the constructors, when returning by
+                    value, or when copying) are constructed inside
+                    the python wrapper structure itself, instead of
+                    being allocated separately with new; objects that
+                    the wrapper does not create (e.g. returned by
+                    pointer) are still referenced by pointer.  Only
+                    valid for classes without a memory policy and with
+                    a public destructor.  Instance creation functions
+                    (see set_instance_creation_function) of such
+                    classes receive an additional py_wrapper keyword
+                    argument.
         """
         assert outer_class is None or isinstance(outer_class, CppClass)
         self.incomplete_type = incomplete_type
@@ -615,6 +773,9 @@ class CppClass(object):
         self.import_from_module = import_from_module
         assert destructor_visibility in ['public', 'private', 'protected']
         self.destructor_visibility = destructor_visibility
+        self.freelist_size = freelist_size
+        self._freelist = None
+        self.inline_storage = inline_storage
 
         self.custom_name = custom_name
         if custom_template_class_name:
@@ -717,6 +878,14 @@ class CppClass(object):
             else:
                 self.memory_policy = memory_policy
 
+        if self.inline_storage:
+            if self.memory_policy is not None:
+                raise TypeConfigurationError("class %s: inline storage cannot be used with a memory policy"
+                                             % (self.name,))
+            if self.incomplete_type or self.destructor_visibility != 'public' or self.is_singleton:
+                raise TypeConfigurationError("class %s: inline storage requires a complete type"
+                                             " with a public destructor" % (self.name,))
+
         if automatic_type_narrowing is None:
             if not self.bases:
                 self.automatic_type_narrowing = settings.automatic_type_narrowing
@@ -1091,11 +1260,22 @@ class CppClass(object):
                 return cls.post_instance_creation_function
         return None
 
-    def write_create_instance(self, code_block, lvalue, parameters, construct_type_name=None):
+    def write_create_instance(self, code_block, lvalue, parameters, construct_type_name=None, py_wrapper=None):
+        """
+        Writes the code that creates a new instance of the class.
+
+        :param py_wrapper: python wrapper expression whose obj field is
+                           lvalue, if the instance is created for a
+                           python wrapper (see inline_storage)
+        """
         instance_creation_func = self.get_instance_creation_function()
         if construct_type_name is None:
             construct_type_name = self.get_construct_name()
-        instance_creation_func(self, code_block, lvalue, parameters, construct_type_name)
+        if self.inline_storage and py_wrapper is not None:
+            instance_creation_func(self, code_block, lvalue, parameters, construct_type_name,
+                                   py_wrapper=py_wrapper)
+        else:
+            instance_creation_func(self, code_block, lvalue, parameters, construct_type_name)
 
     def write_post_instance_creation_code(self, code_block, lvalue, parameters, construct_type_name=None):
         post_instance_creation_func = self.get_post_instance_creation_function()
@@ -1323,6 +1503,9 @@ class CppClass(object):
 #include <map>
 #include <string>
 #include <typeinfo>
+#if __cplusplus >= 201103L
+# include <unordered_map>
+#endif
 #if defined(__GNUC__) && __GNUC__ >= 3 && !defined(__clang__)
 # include <cxxabi.h>
 #endif
@@ -1335,6 +1518,22 @@ class TypeMap
 {
    std::map<std::string, PyTypeObject *> m_map;
 
+   // lookup_wrapper results, keyed by type_info address; a NULL
+   // wrapper means no registered wrapper was found, i.e. the fallback
+   // wrapper is to be used.  Cleared whenever a wrapper is registered.
+#if __cplusplus >= 201103L
+   typedef std::unordered_map<const std::type_info *, PyTypeObject *> Cache;
+#else
+   typedef std::map<const std::type_info *, PyTypeObject *> Cache;
+#endif
+   Cache m_cache;
+
+   PyTypeObject * find_wrapper(const char *type_name) const
+   {
+       std::map<std::string, PyTypeObject *>::const_iterator iter = m_map.find(type_name);
+       return (iter == m_map.end())? NULL : iter->second;
+   }
+
 public:
 
    TypeMap() {}
@@ -1348,12 +1547,9 @@ public:
 #endif
 
        m_map[std::string(cpp_type_info.name())] = python_wrapper;
+       m_cache.clear();
    }
 
-''')
-
-            if settings.gcc_rtti_abi_complete:
-                code_sink.writeln('''
    PyTypeObject * lookup_wrapper(const std::type_info &cpp_type_info, PyTypeObject *fallback_wrapper)
    {
 
@@ -1361,7 +1557,26 @@ public:
    std::cerr << "lookup_wrapper(this=" << this << ", type_name=" << cpp_type_info.name() << ")" << std::endl;
 #endif
 
-       PyTypeObject *python_wrapper = m_map[cpp_type_info.name()];
+       PyTypeObject *python_wrapper;
+       Cache::const_iterator iter = m_cache.find(&cpp_type_info);
+       if (iter != m_cache.end()) {
+           python_wrapper = iter->second;
+       } else {
+           python_wrapper = resolve_wrapper(cpp_type_info);
+           m_cache[&cpp_type_info] = python_wrapper;
+       }
+       return python_wrapper? python_wrapper : fallback_wrapper;
+   }
+
+''')
+
+            if settings.gcc_rtti_abi_complete:
+                code_sink.writeln('''
+private:
+
+   PyTypeObject * resolve_wrapper(const std::type_info &cpp_type_info) const
+   {
+       PyTypeObject *python_wrapper = find_wrapper(cpp_type_info.name());
        if (python_wrapper)
            return python_wrapper;
        else {
@@ -1374,7 +1589,7 @@ public:
 #if PBG_TYPEMAP_DEBUG
           std::cerr << "  -> looking at C++ type " << _typeinfo->name() << std::endl;
 #endif
-           while (_typeinfo && (python_wrapper = m_map[std::string(_typeinfo->name())]) == 0) {
+           while (_typeinfo && (python_wrapper = find_wrapper(_typeinfo->name())) == 0) {
                _typeinfo = dynamic_cast<const abi::__si_class_type_info*> (_typeinfo->__base_type);
 #if PBG_TYPEMAP_DEBUG
                std::cerr << "  -> looking at C++ type " << _typeinfo->name() << std::endl;
@@ -1389,10 +1604,10 @@ public:
           }
 #endif
 
-           return python_wrapper? python_wrapper : fallback_wrapper;
+           return python_wrapper;
 
 #else // non gcc 3+ compilers can only match against explicitly registered classes, not hidden subclasses
-           return fallback_wrapper;
+           return NULL;
 #endif
        }
    }
@@ -1402,15 +1617,11 @@ public:
 ''')
             else:
                 code_sink.writeln('''
-   PyTypeObject * lookup_wrapper(const std::type_info &cpp_type_info, PyTypeObject *fallback_wrapper)
-   {
-
-#if PBG_TYPEMAP_DEBUG
-   std::cerr << "lookup_wrapper(this=" << this << ", type_name=" << cpp_type_info.name() << ")" << std::endl;
-#endif
+private:
 
-       PyTypeObject *python_wrapper = m_map[cpp_type_info.name()];
-       return python_wrapper? python_wrapper : fallback_wrapper;
+   PyTypeObject * resolve_wrapper(const std::type_info &cpp_type_info) const
+   {
+       return find_wrapper(cpp_type_info.name());
    }
 };
 
@@ -1460,6 +1671,9 @@ public:
         elif method.visibility == 'public':
             if name == '__call__': # needs special handling
                 method.force_parse = method.PARSE_TUPLE_AND_KEYWORDS
+            elif name in self.valid_sequence_methods:
+                ## sequence slots call the wrapper with an args tuple
+                method.fastcall = False
 
             try:
                 overload = self.methods[name]
@@ -1474,6 +1688,18 @@ public:
             except utils.SkipWrapper:
                 return
 
+            if isinstance(method, CppMethod) and method.batch:
+                batch_method = method.get_batch_wrapper()
+                batch_method.custom_name = name + '_batch'
+                batch_method.class_ = self
+                try:
+                    batch_overload = self.methods[batch_method.custom_name]
+                except KeyError:
+                    batch_overload = CppOverloadedMethod(batch_method.custom_name)
+                    batch_overload.pystruct = self.pystruct
+                    self.methods[batch_method.custom_name] = batch_overload
+                utils.call_with_error_handling(batch_overload.add, (batch_method,), {}, batch_method)
+
 
             # Grr! I hate C++.  Overloading + inheritance = disaster!
             # So I ended up coding something which C++ does not in
@@ -1820,6 +2046,25 @@ public:
         else:
             pointer_type = self.full_name + " *"
 
+        if self.inline_storage:
+            ## storage for the C++ object, suitably aligned; over-aligned
+            ## types can only be honoured with C++11 alignas
+            code_sink.writeln("#include <new>")
+            storage = ('''    union {
+#if __cplusplus >= 201103L
+        alignas(%(CLASS)s) char data[sizeof(%(CLASS)s)];
+#else
+        char data[sizeof(%(CLASS)s)];
+#endif
+        double align_double;
+        long double align_long_double;
+        PY_LONG_LONG align_long_long;
+        void *align_pointer;
+    } obj_storage;
+''' % dict(CLASS=self.full_name))
+        else:
+            storage = ''
+
         if self.allow_subclassing:
             code_sink.writeln('''
 typedef struct {
@@ -1827,8 +2072,8 @@ typedef struct {
     %sobj;
     PyObject *inst_dict;
     PyBindGenWrapperFlags flags:8;
-} %s;
-    ''' % (pointer_type, self.pystruct))
+%s} %s;
+    ''' % (pointer_type, storage, self.pystruct))
 
         else:
 
@@ -1837,11 +2082,14 @@ typedef struct {
     PyObject_HEAD
     %sobj;
     PyBindGenWrapperFlags flags:8;
-} %s;
-    ''' % (pointer_type, self.pystruct))
+%s} %s;
+    ''' % (pointer_type, storage, self.pystruct))
 
         code_sink.writeln()
 
+        if self.inline_storage:
+            self._generate_inline_storage_functions(code_sink)
+
         if self.import_from_module:
             code_sink.writeln('extern PyTypeObject *_%s;' % (self.pytypestruct,))
             code_sink.writeln('#define %s (*_%s)' % (self.pytypestruct, self.pytypestruct))
@@ -1849,9 +2097,14 @@ typedef struct {
             code_sink.writeln('extern PyTypeObject %s;' % (self.pytypestruct,))
             if not self.static_attributes.empty():
                 code_sink.writeln('extern PyTypeObject Py%s_Type;' % (self.metaclass_name,))
+                code_sink.writeln('int Py%s_Type__tp_setattro(PyObject *type, PyObject *name, PyObject *value);'
+                                  % (self.metaclass_name,))
 
         code_sink.writeln()
 
+        if self.get_freelist() is not None:
+            self.get_freelist().generate_forward_declarations(code_sink)
+
         if self.helper_class is not None:
             self._inherit_helper_class_parent_virtuals()
             for hook in self._get_all_helper_class_hooks():
@@ -2035,6 +2288,9 @@ typedef struct {
         if self.container_traits is not None:
             self.container_traits.generate(code_sink, module)
 
+        if self.get_freelist() is not None:
+            self.get_freelist().generate(code_sink, module, self.pytype)
+
         self._generate_type_structure(code_sink, self.docstring)
 
     def _generate_number_methods(self, code_sink):
@@ -2267,6 +2523,7 @@ typedef struct {
                 else:
                     constructor = overload.wrapper_actual_name
                     code_sink.writeln()
+                    self._generate_constructor_vectorcall(code_sink, overload)
             else:
                 constructor = None
                 have_constructor = False
@@ -2288,6 +2545,25 @@ typedef struct {
                                           or constructor))
         return have_constructor
 
+    def _generate_constructor_vectorcall(self, code_sink, overload):
+        """generate the vectorcall entry point of the class type, if wanted"""
+        if len(overload.wrappers) != 1 or 'tp_new' in self.slots:
+            return
+        constructor = overload.wrappers[0]
+        if getattr(constructor, 'NEEDS_OVERLOADING_INTERFACE', False):
+            return
+        if not constructor.wants_vectorcall():
+            return
+        vectorcall = constructor.generate_vectorcall(code_sink)
+        self.module.header.writeln("#if PY_VERSION_HEX >= 0x03090000\n"
+                                   "PyObject *%s(PyObject *type, PyObject *const *args, size_t nargsf,"
+                                   " PyObject *kwnames);\n"
+                                   "#endif" % vectorcall)
+        self.module.after_init.write_code("#if PY_VERSION_HEX >= 0x03090000")
+        self.module.after_init.write_code("%s.tp_vectorcall = (vectorcallfunc) %s;"
+                                          % (self.pytypestruct, vectorcall))
+        self.module.after_init.write_code("#endif")
+
     def _generate_copy_method(self, code_sink):
         construct_name = self.get_construct_name()
         copy_wrapper_name = '_wrap_%s__copy__' % self.pystruct
@@ -2302,7 +2578,10 @@ static PyObject*\n%s(%s *self, PyObject *PYBINDGEN_UNUSED(_args))
 
         py_copy = declarations.declare_variable("%s*" % self.pystruct, "py_copy")
         self.write_allocate_pystruct(code_block, py_copy)
-        code_block.write_code("%s->obj = new %s(*self->obj);" % (py_copy, construct_name))
+        if self.inline_storage:
+            code_block.write_code("%s->obj = %s;" % (py_copy, self.get_inline_new_expression(py_copy, '*self->obj')))
+        else:
+            code_block.write_code("%s->obj = new %s(*self->obj);" % (py_copy, construct_name))
         if self.allow_subclassing:
             code_block.write_code("%s->inst_dict = NULL;" % py_copy)
         code_block.write_code("%s->flags = PYBINDGEN_WRAPPER_FLAG_NONE;" % py_copy)
@@ -2440,7 +2719,19 @@ static PyObject*\n%s(%s *self, PyObject *PYBINDGEN_UNUSED(_args))
                     raise CodeGenerationError("Cannot finish generating class %s: "
                                               "type is incomplete, but no free/unref_function defined"
                                               % self.full_name)
-                if self.destructor_visibility == 'public':
+                if self.destructor_visibility == 'public' and self.inline_storage:
+                    delete_code = ("    %s *tmp = self->obj;\n"
+                                   "    bool tmp_is_inline = %s;\n"
+                                   "    self->obj = NULL;\n"
+                                   "    if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {\n"
+                                   "        if (tmp_is_inline) {\n"
+                                   "            _wrap_%s__destroy_inline_obj(tmp);\n"
+                                   "        } else {\n"
+                                   "            delete tmp;\n"
+                                   "        }\n"
+                                   "    }" % (self.full_name, self.get_inline_check_expression('self'),
+                                             self.pystruct))
+                elif self.destructor_visibility == 'public':
                     delete_code = ("    %s *tmp = self->obj;\n"
                                    "    self->obj = NULL;\n"
                                    "    if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {\n"
@@ -2643,11 +2934,75 @@ if (!PyObject_IsInstance((PyObject*) other, (PyObject*) &%s)) {
             'PyModule_AddObject(m, (char *) \"%s\", (PyObject *) &%s);' % (
                 alias, self.pytypestruct))
 
+    def _generate_inline_storage_functions(self, code_sink):
+        """
+        Generates the functions that check for, and destroy, C++
+        objects stored inside the wrapper structure.  The size check
+        is needed because wrappers of C++ subclasses may be narrowed
+        to python types whose structure lacks the storage; the
+        alignment check because the python allocator does not honour
+        the alignment of over-aligned types.
+        """
+        code_sink.writeln('''
+static inline bool
+_wrap_%(PYSTRUCT)s__has_inline_storage(%(PYSTRUCT)s *self)
+{
+#if __cplusplus >= 201103L
+    if ((size_t) &self->obj_storage %% alignof(%(CLASS)s) != 0)
+        return false;
+#endif
+    return (size_t) Py_TYPE(self)->tp_basicsize >= offsetof(%(PYSTRUCT)s, obj_storage) + sizeof(self->obj_storage);
+}
+
+static inline bool
+_wrap_%(PYSTRUCT)s__obj_is_inline(%(PYSTRUCT)s *self)
+{
+    return (void *) self->obj == (void *) &self->obj_storage && _wrap_%(PYSTRUCT)s__has_inline_storage(self);
+}
+
+static inline void
+_wrap_%(PYSTRUCT)s__destroy_inline_obj(%(CLASS)s *obj)
+{
+    typedef %(CLASS)s pybindgen_obj_type;
+    obj->~pybindgen_obj_type();
+}
+''' % dict(PYSTRUCT=self.pystruct, CLASS=self.full_name))
+
+    def get_inline_new_expression(self, py_name, parameters):
+        """
+        Returns a C++ expression that creates a new object from the
+        given constructor parameters, inside the storage of wrapper
+        py_name if it has one (else with new).
+        """
+        assert self.inline_storage
+        return ("(_wrap_%s__has_inline_storage(%s) ? new (&%s->obj_storage) %s(%s) : new %s(%s))"
+                % (self.pystruct, py_name, py_name, self.full_name, parameters, self.full_name, parameters))
+
+    def get_inline_check_expression(self, py_name):
+        """
+        Returns a C++ boolean expression that is true if the object of
+        wrapper py_name is stored inside the wrapper.
+        """
+        assert self.inline_storage
+        return "_wrap_%s__obj_is_inline(%s)" % (self.pystruct, py_name)
+
+    def get_freelist(self):
+        """
+        Returns the PyTypeFreelist of the class, or None if the class
+        does not have a freelist.
+        """
+        if not self.freelist_size or self.import_from_module:
+            return None
+        if self._freelist is None:
+            self._freelist = PyTypeFreelist(self.pystruct, self.pytypestruct, self.freelist_size,
+                                            is_gc=bool(self.allow_subclassing))
+        return self._freelist
+
     def write_allocate_pystruct(self, code_block, lvalue, wrapper_type=None):
         """
         Generates code to allocate a python wrapper structure, using
-        PyObject_New or PyObject_GC_New, plus some additional strcture
-        initialization that may be needed.
+        PyObject_New or PyObject_GC_New (or the class freelist), plus
+        some additional strcture initialization that may be needed.
         """
         if self.allow_subclassing:
             new_func = 'PyObject_GC_New'
@@ -2655,8 +3010,12 @@ if (!PyObject_IsInstance((PyObject*) other, (PyObject*) &%s)) {
             new_func = 'PyObject_New'
         if wrapper_type is None:
             wrapper_type = '&'+self.pytypestruct
-        code_block.write_code("%s = %s(%s, %s);" %
-                              (lvalue, new_func, self.pystruct, wrapper_type))
+        freelist = self.get_freelist()
+        if freelist is not None:
+            code_block.write_code("%s = %s;" % (lvalue, freelist.get_new_expression(wrapper_type)))
+        else:
+            code_block.write_code("%s = %s(%s, %s);" %
+                                  (lvalue, new_func, self.pystruct, wrapper_type))
         if self.allow_subclassing:
             code_block.write_code(
                 "%s->inst_dict = NULL;" % (lvalue,))
@@ -2742,7 +3101,8 @@ def common_shared_object_return(value, py_name, cpp_class, code_block,
                             raise CodeGenerationError("Class {0} cannot be copied".format(cpp_class.full_name))
                         cpp_class.write_create_instance(code_block,
                                                              "%s->obj" % py_name,
-                                                             value_value)
+                                                             value_value,
+                                                             py_wrapper=py_name)
                         code_block.write_code(
                             "%s->flags = PYBINDGEN_WRAPPER_FLAG_NONE;" % (py_name,))
                         cpp_class.write_post_instance_creation_code(code_block,
@@ -3024,7 +3384,8 @@ class CppClassParameter(CppClassParameterBase):
 
         self.cpp_class.write_create_instance(wrapper.before_call,
                                              "%s->obj" % self.py_name,
-                                             self.value)
+                                             self.value,
+                                             py_wrapper=self.py_name)
         self.cpp_class.wrapper_registry.write_register_new_wrapper(wrapper.before_call, self.py_name,
                                                                    "%s->obj" % self.py_name)
         self.cpp_class.write_post_instance_creation_code(wrapper.before_call,
@@ -3138,7 +3499,8 @@ class CppClassRefParameter(CppClassParameterBase):
 
             self.cpp_class.write_create_instance(wrapper.before_call,
                                                  "%s->obj" % self.py_name,
-                                                 '')
+                                                 '',
+                                                 py_wrapper=self.py_name)
             self.cpp_class.wrapper_registry.write_register_new_wrapper(wrapper.before_call, self.py_name,
                                                                        "%s->obj" % self.py_name)
             self.cpp_class.write_post_instance_creation_code(wrapper.before_call,
@@ -3181,7 +3543,8 @@ class CppClassRefParameter(CppClassParameterBase):
                 raise CodeGenerationError("Class {0} cannot be copied".format(self.cpp_class.full_name))
             self.cpp_class.write_create_instance(wrapper.before_call,
                                                  "%s->obj" % self.py_name,
-                                                 self.value)
+                                                 self.value,
+                                                 py_wrapper=self.py_name)
             self.cpp_class.wrapper_registry.write_register_new_wrapper(wrapper.before_call, self.py_name,
                                                                        "%s->obj" % self.py_name)
             self.cpp_class.write_post_instance_creation_code(wrapper.before_call,
@@ -3216,7 +3579,8 @@ class CppClassRefParameter(CppClassParameterBase):
                 wrapper.after_call.indent()
                 self.cpp_class.write_create_instance(wrapper.after_call,
                                                      "%s->obj" % self.py_name,
-                                                     self.value)
+                                                     self.value,
+                                                     py_wrapper=self.py_name)
                 self.cpp_class.wrapper_registry.write_register_new_wrapper(wrapper.after_call, self.py_name,
                                                                            "%s->obj" % self.py_name)
                 self.cpp_class.write_post_instance_creation_code(wrapper.after_call,
@@ -3263,7 +3627,8 @@ class CppClassReturnValue(CppClassReturnValueBase):
             raise CodeGenerationError("Class {0} cannot be copied".format(self.cpp_class.full_name))
         self.cpp_class.write_create_instance(wrapper.after_call,
                                              "%s->obj" % py_name,
-                                             self.value)
+                                             self.value,
+                                             py_wrapper=py_name)
         self.cpp_class.wrapper_registry.write_register_new_wrapper(wrapper.after_call, py_name,
                                                                    "%s->obj" % py_name)
         self.cpp_class.write_post_instance_creation_code(wrapper.after_call,
@@ -3341,7 +3706,8 @@ class CppClassRefReturnValue(CppClassReturnValueBase):
                 raise CodeGenerationError("Class {0} cannot be copied".format(self.cpp_class.full_name))
             self.cpp_class.write_create_instance(wrapper.after_call,
                                                  "%s->obj" % py_name,
-                                                 self.value)
+                                                 self.value,
+                                                 py_wrapper=py_name)
             self.cpp_class.wrapper_registry.write_register_new_wrapper(wrapper.after_call, py_name,
                                                                        "%s->obj" % py_name)
             self.cpp_class.write_post_instance_creation_code(wrapper.after_call,
@@ -3476,6 +3842,21 @@ class CppClassPtrParameter(CppClassParameterBase):
                     'O!', ['&'+self.cpp_class.pytypestruct, '&'+self.py_name], self.name, optional=bool(self.default_value))
                 wrapper.before_call.write_code("%s = (%s ? %s->obj : NULL);" % (value_ptr, self.py_name, self.py_name))
 
+        inline_copy = None
+        if self.transfer_ownership and self.cpp_class.inline_storage:
+            ## an object stored inside the wrapper cannot be given
+            ## away; give a copy instead
+            if not self.cpp_class.has_copy_constructor:
+                raise CodeGenerationError("Class %s has inline storage and cannot be copied"
+                                          % self.cpp_class.full_name)
+            inline_copy = wrapper.declarations.declare_variable("bool", "%s_inline_copy" % self.name, "false")
+            wrapper.before_call.write_code("if (%s && %s) {" % (value_ptr, self.cpp_class.get_inline_check_expression(self.py_name)))
+            wrapper.before_call.indent()
+            wrapper.before_call.write_code("%s = new %s(*%s);" % (value_ptr, self.cpp_class.full_name, value_ptr))
+            wrapper.before_call.write_code("%s = true;" % inline_copy)
+            wrapper.before_call.unindent()
+            wrapper.before_call.write_code("}")
+
         value = self.transformation.transform(self, wrapper.declarations, wrapper.before_call, value_ptr)
         wrapper.call_params.append(value)
 
@@ -3492,6 +3873,11 @@ class CppClassPtrParameter(CppClassParameterBase):
                     self.cpp_class.wrapper_registry.write_unregister_wrapper(wrapper.after_call,
                                                                             '%s' % self.py_name,
                                                                             '%s->obj' % self.py_name)
+                if inline_copy is not None:
+                    wrapper.after_call.write_code('if (%s) {' % inline_copy)
+                    wrapper.after_call.write_code('    _wrap_%s__destroy_inline_obj(%s->obj);'
+                                                  % (self.cpp_class.pystruct, self.py_name))
+                    wrapper.after_call.write_code('}')
                 wrapper.after_call.write_code('%s->obj = NULL;' % self.py_name)
                 wrapper.after_call.unindent()
                 wrapper.after_call.write_code('}')
@@ -3554,7 +3940,8 @@ class CppClassPtrParameter(CppClassParameterBase):
                             raise CodeGenerationError("Class {0} cannot be copied".format(self.cpp_class.full_name))
                         self.cpp_class.write_create_instance(wrapper.before_call,
                                                              "%s->obj" % self.py_name,
-                                                             '*'+self.value)
+                                                             '*'+self.value,
+                                                             py_wrapper=self.py_name)
                         self.cpp_class.write_post_instance_creation_code(wrapper.before_call,
                                                                          "%s->obj" % self.py_name,
                                                                          '*'+self.value)
@@ -3587,7 +3974,8 @@ class CppClassPtrParameter(CppClassParameterBase):
                             wrapper.after_call.indent()
                             self.cpp_class.write_create_instance(wrapper.after_call,
                                                                  "%s->obj" % self.py_name,
-                                                                 '*'+value)
+                                                                 '*'+value,
+                                                                 py_wrapper=self.py_name)
                             self.cpp_class.write_post_instance_creation_code(wrapper.after_call,
                                                                              "%s->obj" % self.py_name,
                                                                              '*'+value)
@@ -3821,6 +4209,9 @@ class CppClassPtrReturnValue(CppClassReturnValueBase):
                                                                      "%s" % self.value,
                                                                      '*'+value)
                 else:
+                    if self.cpp_class.inline_storage:
+                        raise CodeGenerationError("Class %s has inline storage and cannot be copied"
+                                                  % self.cpp_class.full_name)
                     # value = pyobj->obj; pyobj->obj = NULL;
                     wrapper.after_call.write_code(
                         "%s = %s;" % (self.value, value))
@@ -3874,21 +4265,7 @@ def scan_custodians_and_wards(wrapper):
 
 
 def _add_ward(code_block, custodian, ward):
-    wards = code_block.declare_variable(
-        'PyObject*', 'wards')
-    code_block.write_code(
-        "%(wards)s = PyObject_GetAttrString(%(custodian)s, (char *) \"__wards__\");"
-        % vars())
-    code_block.write_code(
-        "if (%(wards)s == NULL) {\n"
-        "    PyErr_Clear();\n"
-        "    %(wards)s = PyList_New(0);\n"
-        "    PyObject_SetAttrString(%(custodian)s, (char *) \"__wards__\", %(wards)s);\n"
-        "}" % vars())
-    code_block.write_code(
-        "if (%(ward)s && !PySequence_Contains(%(wards)s, %(ward)s))\n"
-        "    PyList_Append(%(wards)s, %(ward)s);" % dict(wards=wards, ward=ward))
-    code_block.add_cleanup_code("Py_DECREF(%s);" % wards)
+    code_block.write_code("_pybindgen_add_ward(%s, %s);" % (custodian, ward))
 
 
 def _get_custodian_or_ward(wrapper, num):
@@ -25,7 +25,8 @@ class CppMethod(ForwardWrapperBase):
                  template_parameters=(), is_virtual=None, is_const=False,
                  unblock_threads=None, is_pure_virtual=False,
                  custom_template_method_name=None, visibility='public',
-                 custom_name=None, deprecated=False, docstring=None, throw=()):
+                 custom_name=None, deprecated=False, docstring=None, throw=(), fastcall=None,
+                 batch=False):
         """
         Create an object the generates code to wrap a C++ class method.
 
@@ -72,6 +73,20 @@ class CppMethod(ForwardWrapperBase):
 
         :param throw: list of C++ exceptions that the function may throw
         :type throw: list of L{CppException}
+
+        :param fastcall: if True (False), force (forbid) generation of
+          the wrapper with the METH_FASTCALL calling convention; if
+          None, the module default is used, see
+          L{pybindgen.settings.fastcall}.
+
+        :param batch: if True, a companion wrapper named <name>_batch
+          is also generated, which takes a sequence of argument tuples
+          and calls the method once per item, converting all arguments
+          first and then running the calls in a tight loop (with the
+          GIL released once for all calls when unblock_threads is
+          set); see L{pybindgen.typehandlers.base.ForwardWrapperBase.generate_batch}.
+          For instance methods, each item starts with the instance the
+          method is called on, and the batch wrapper is a static method.
         """
         self.stack_where_defined = traceback.extract_stack()
 
@@ -119,6 +134,8 @@ class CppMethod(ForwardWrapperBase):
             "return NULL;", "return NULL;",
             unblock_threads=unblock_threads)
         self.deprecated = deprecated
+        self.fastcall = fastcall
+        self.batch = batch
 
         for t in throw:
             assert isinstance(t, CppException)
@@ -220,13 +237,28 @@ class CppMethod(ForwardWrapperBase):
                          is_pure_virtual=self.is_pure_virtual,
                          is_const=self.is_const,
                          visibility=self.visibility,
-                         custom_name=self.custom_name)
+                         custom_name=self.custom_name,
+                         fastcall=self.fastcall)
         meth._class = self._class
         meth.docstring = self.docstring
         meth.wrapper_base_name = self.wrapper_base_name
         meth.wrapper_actual_name = self.wrapper_actual_name
         return meth
 
+    def get_batch_wrapper(self):
+        """Creates the companion batch wrapper of this method (see the batch option)"""
+        meth = BatchCppMethod(self.method_name,
+                              self.return_value,
+                              [copy(param) for param in self.parameters],
+                              is_static=self.is_static,
+                              template_parameters=self.template_parameters,
+                              is_virtual=self.is_virtual,
+                              is_pure_virtual=self.is_pure_virtual,
+                              is_const=self.is_const,
+                              unblock_threads=self.unblock_threads)
+        meth.throw = list(self.throw)
+        return meth
+
     def set_class(self, class_):
         """set the class object this method belongs to"""
         self._class = class_
@@ -237,6 +269,11 @@ class CppMethod(ForwardWrapperBase):
         return self._class
     class_ = property(get_class, set_class)
 
+    def _get_fastcall_module(self):
+        if self.class_ is None:
+            return None
+        return self.class_.module
+
     def generate_call(self, class_=None):
         "virtual method implementation; do not call"
         #assert isinstance(class_, CppClass)
@@ -345,7 +382,18 @@ class CppMethod(ForwardWrapperBase):
 #         else:
 #             extra = ''
 
-        if 'METH_VARARGS' in flags:
+        if 'METH_FASTCALL' in flags:
+            assert not extra_wrapper_params, \
+                "extra_wrapper_params can only be used with full varargs/kwargs wrappers"
+            self_param = "%s *%s" % (self._get_pystruct(), _self_name)
+            self.wrapper_args = [self_param, "PyObject *const *args", "Py_ssize_t nargs",
+                                 "PyObject *kwnames"]
+        elif 'METH_O' in flags:
+            assert not extra_wrapper_params, \
+                "extra_wrapper_params can only be used with full varargs/kwargs wrappers"
+            self_param = "%s *%s" % (self._get_pystruct(), _self_name)
+            self.wrapper_args = [self_param, "PyObject *arg"]
+        elif 'METH_VARARGS' in flags:
             if 'METH_KEYWORDS' in flags:
                 self.wrapper_args = ["%s *%s" % (self._get_pystruct(), _self_name),
                                      "PyObject *args", "PyObject *kwargs"]
@@ -385,15 +433,11 @@ class CppMethod(ForwardWrapperBase):
         Returns the corresponding PyMethodDef entry string.
         """
 
-        if self.throw: # Bug #780945
+        if self.throw and self.return_value.REQUIRES_ASSIGNMENT_CONSTRUCTOR: # Bug #780945
             self.return_value.REQUIRES_ASSIGNMENT_CONSTRUCTOR = False
             self.reset_code_generation_state()
 
-        class_ = self.class_
-        #assert isinstance(class_, CppClass)
-        tmp_sink = codesink.MemoryCodeSink()
-
-        self.generate_body(tmp_sink, gen_call_params=[class_])
+        self.get_generation_result()
 
         if wrapper_name is None:
             self.wrapper_actual_name = self.wrapper_base_name
@@ -401,9 +445,10 @@ class CppMethod(ForwardWrapperBase):
             self.wrapper_actual_name = wrapper_name
 
         self.get_wrapper_signature(self.wrapper_actual_name, extra_wrapper_params)
-        self.write_open_wrapper(code_sink)#, add_static=self.static_decl)
-        tmp_sink.flush_to(code_sink)
-        self.write_close_wrapper(code_sink)
+        self.write_generation_result(code_sink)
+
+    def _get_gen_call_params(self):
+        return [self.class_]
 
     def get_py_method_def_flags(self):
         "Get the PyMethodDef flags suitable for this method"
@@ -464,6 +509,36 @@ class CppMethod(ForwardWrapperBase):
                  params, const, pure_virtual))
 
 
+class BatchCppMethod(CppMethod):
+    """
+    Companion wrapper of a method added with batch=True, which calls
+    the method once for each item of a sequence of argument tuples.
+    """
+
+    def generate(self, code_sink, wrapper_name=None, extra_wrapper_params=()):
+        assert not extra_wrapper_params
+        if wrapper_name is None:
+            self.wrapper_actual_name = self.wrapper_base_name
+        else:
+            self.wrapper_actual_name = wrapper_name
+        if self.is_static:
+            self.generate_batch(code_sink, gen_call_params=[self.class_])
+        else:
+            self.generate_batch(code_sink, self.class_.pystruct, self.class_.pytypestruct,
+                                gen_call_params=[self.class_])
+
+    def get_py_method_def_flags(self):
+        return ['METH_VARARGS', 'METH_KEYWORDS', 'METH_STATIC']
+
+    def generate_docstring(self, name):
+        if self.is_static:
+            args = [p.name for p in self.parameters]
+        else:
+            args = ['self'] + [p.name for p in self.parameters]
+        return "{0}(items)\\n\\ncalls {1}({2}) for each item of a sequence".format(
+            name, self.method_name, ", ".join(args))
+
+
 class CppOverloadedMethod(overloading.OverloadedWrapper):
     "Support class for overloaded methods"
     RETURN_TYPE = 'PyObject *'
@@ -539,7 +614,8 @@ class CppConstructor(ForwardWrapperBase):
     wrapper is used as the python class __init__ method.
     """
 
-    def __init__(self, parameters, unblock_threads=None, visibility='public', deprecated=False, throw=()):
+    def __init__(self, parameters, unblock_threads=None, visibility='public', deprecated=False, throw=(),
+                 fastcall=None):
         """
 
         :param parameters: the constructor parameters
@@ -564,6 +640,8 @@ class CppConstructor(ForwardWrapperBase):
             force_parse=ForwardWrapperBase.PARSE_TUPLE_AND_KEYWORDS,
             unblock_threads=unblock_threads)
         self.deprecated = deprecated
+        self.fastcall = fastcall
+        self._generating_vectorcall = False
         assert visibility in ['public', 'protected', 'private']
         self.visibility = visibility
         self.wrapper_base_name = None
@@ -626,6 +704,7 @@ class CppConstructor(ForwardWrapperBase):
         parameters, so they can be modified at will.
         """
         meth = type(self)([copy(param) for param in self.parameters])
+        meth.fastcall = self.fastcall
         meth._class = self._class
         meth.wrapper_base_name = self.wrapper_base_name
         meth.wrapper_actual_name = self.wrapper_actual_name
@@ -641,6 +720,33 @@ class CppConstructor(ForwardWrapperBase):
         return self._class
     class_ = property(get_class, set_class)
 
+    def _get_fastcall_module(self):
+        if self._class is None:
+            return None
+        return self._class.module
+
+    def _get_fastcall_name(self):
+        return self._class.name
+
+    def uses_fastcall(self):
+        ## tp_init always takes an args tuple and kwargs dict; the
+        ## METH_FASTCALL flavour of the wrapper is only generated for
+        ## the class vectorcall slot, see generate_vectorcall()
+        return self._generating_vectorcall
+
+    def wants_vectorcall(self):
+        """
+        Returns True if a vectorcall entry point should be generated
+        for this constructor, i.e. the METH_FASTCALL calling
+        convention is enabled for the constructor or its module.
+        """
+        module = self._get_fastcall_module()
+        if module is None:
+            return False
+        if self.fastcall is not None:
+            return self.fastcall
+        return module.get_fastcall()
+
     def generate_call(self, class_=None):
         "virtual method implementation; do not call"
         if class_ is None:
@@ -652,7 +758,8 @@ class CppConstructor(ForwardWrapperBase):
 
         #assert isinstance(class_, CppClass)
         if class_.helper_class is None:
-            class_.write_create_instance(self.before_call, "self->obj", ", ".join(self.call_params))
+            class_.write_create_instance(self.before_call, "self->obj", ", ".join(self.call_params),
+                                         py_wrapper="self")
             class_.write_post_instance_creation_code(self.before_call, "self->obj", ", ".join(self.call_params))
             self.before_call.write_code("self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;")
         else:
@@ -684,7 +791,8 @@ class CppConstructor(ForwardWrapperBase):
                                             'cannot be constructed");' % class_.name)
                 self.before_call.write_code('return -1;')
             else:
-                class_.write_create_instance(self.before_call, "self->obj", ", ".join(self.call_params))
+                class_.write_create_instance(self.before_call, "self->obj", ", ".join(self.call_params),
+                                             py_wrapper="self")
                 self.before_call.write_code("self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;")
                 class_.write_post_instance_creation_code(self.before_call, "self->obj", ", ".join(self.call_params))
 
@@ -728,11 +836,8 @@ class CppConstructor(ForwardWrapperBase):
                 raise utils.SkipWrapper("Class %r has a protected constructor and no helper class"
                                         " -> cannot generate a constructor for it" % self._class.full_name)
 
-        #assert isinstance(class_, CppClass)
-        tmp_sink = codesink.MemoryCodeSink()
-
         assert self._class is not None
-        self.generate_body(tmp_sink, gen_call_params=[self._class])
+        self.get_generation_result()
 
         assert ((self.parse_params.get_parameters() == ['""'])
                 or self.parse_params.get_keywords() is not None), \
@@ -751,10 +856,69 @@ class CppConstructor(ForwardWrapperBase):
                              "PyObject *args", "PyObject *kwargs"]
         self.wrapper_args.extend(extra_wrapper_params)
 
-        self.write_open_wrapper(code_sink)
+        self.write_generation_result(code_sink, 'return 0;')
+
+    def _get_gen_call_params(self):
+        return [self._class]
+
+    def generate_vectorcall(self, code_sink):
+        """
+        Generates a METH_FASTCALL flavour of the constructor, plus a
+        vectorcall entry point for the class type object that
+        allocates a new instance and initializes it with it.  Must be
+        called after generate().
+
+        :param code_sink: a CodeSink instance that will receive the generated code
+        :returns: the vectorcall function name.
+        """
+        assert self._class is not None
+        init_name = "%s__fastcall" % self.wrapper_base_name
+        vectorcall_name = "_wrap_%s__tp_vectorcall" % self._class.pystruct
+
+        tmp_sink = codesink.MemoryCodeSink()
+        self.reset_code_generation_state()
+        self._generating_vectorcall = True
+        try:
+            self.generate_body(tmp_sink, gen_call_params=[self._class])
+        finally:
+            self._generating_vectorcall = False
+            self.reset_code_generation_state()
+
+        code_sink.writeln("#if PY_VERSION_HEX >= 0x03090000")
+        code_sink.writeln("static int")
+        code_sink.writeln("%s(%s *self, PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames)"
+                          % (init_name, self._class.pystruct))
+        code_sink.writeln('{')
+        code_sink.indent()
         tmp_sink.flush_to(code_sink)
         code_sink.writeln('return 0;')
-        self.write_close_wrapper(code_sink)
+        code_sink.unindent()
+        code_sink.writeln('}')
+        code_sink.writeln()
+        code_sink.writeln("PyObject *")
+        code_sink.writeln("%s(PyObject *type, PyObject *const *args, size_t nargsf, PyObject *kwnames)"
+                          % vectorcall_name)
+        code_sink.writeln('{')
+        code_sink.indent()
+        code_sink.writeln("PyObject *self = ((PyTypeObject *) type)->tp_alloc((PyTypeObject *) type, 0);")
+        code_sink.writeln("if (self == NULL) {")
+        code_sink.indent()
+        code_sink.writeln("return NULL;")
+        code_sink.unindent()
+        code_sink.writeln("}")
+        code_sink.writeln("if (%s((%s *) self, args, PyVectorcall_NARGS(nargsf), kwnames) < 0) {"
+                          % (init_name, self._class.pystruct))
+        code_sink.indent()
+        code_sink.writeln("Py_DECREF(self);")
+        code_sink.writeln("return NULL;")
+        code_sink.unindent()
+        code_sink.writeln("}")
+        code_sink.writeln("return self;")
+        code_sink.unindent()
+        code_sink.writeln('}')
+        code_sink.writeln("#endif")
+        code_sink.writeln()
+        return vectorcall_name
 
     def generate_docstring(self, name):
         return "{0}({1})".format(name, ', '.join([p.name for p in self.parameters]))
@@ -895,27 +1059,25 @@ class CppVirtualMethodParentCaller(CppMethod):
     #    self._class = class_
 
     def generate_declaration(self, code_sink, extra_wrapper_parameters=()):
-        ## We need to fake generate the code (and throw away the
-        ## result) only in order to obtain correct method signature.
-        self.reset_code_generation_state()
-        self.generate(codesink.NullCodeSink(), extra_wrapper_params=extra_wrapper_parameters)
-        assert isinstance(self.wrapper_return, str)
-        assert isinstance(self.wrapper_actual_name, str)
-        assert isinstance(self.wrapper_args, list)
-        code_sink.writeln('%s %s(%s);' % (self.wrapper_return, self.wrapper_actual_name, ', '.join(self.wrapper_args)))
-        self.reset_code_generation_state()
+        ## The signature depends on the generated code; it is
+        ## recorded when the wrapper function is generated
+        wrapper_return, wrapper_actual_name, wrapper_args = \
+            self.get_declaration_prototype(extra_wrapper_parameters)
+        assert isinstance(wrapper_return, str)
+        assert isinstance(wrapper_actual_name, str)
+        assert isinstance(wrapper_args, list)
+        code_sink.writeln('%s %s(%s);' % (wrapper_return, wrapper_actual_name, ', '.join(wrapper_args)))
 
     def generate_class_declaration(self, code_sink, extra_wrapper_parameters=()):
-        ## We need to fake generate the code (and throw away the
-        ## result) only in order to obtain correct method signature.
-        self.reset_code_generation_state()
-        self.generate(codesink.NullCodeSink(), extra_wrapper_params=extra_wrapper_parameters)
-        assert isinstance(self.wrapper_return, str)
-        assert isinstance(self.wrapper_actual_name, str)
-        assert isinstance(self.wrapper_args, list)
-        dummy_cls, name = self.wrapper_actual_name.split('::')
-        code_sink.writeln('static %s %s(%s);' % (self.wrapper_return, name, ', '.join(self.wrapper_args)))
-        self.reset_code_generation_state()
+        ## The signature depends on the generated code; it is
+        ## recorded when the wrapper function is generated
+        wrapper_return, wrapper_actual_name, wrapper_args = \
+            self.get_declaration_prototype(extra_wrapper_parameters)
+        assert isinstance(wrapper_return, str)
+        assert isinstance(wrapper_actual_name, str)
+        assert isinstance(wrapper_args, list)
+        dummy_cls, name = wrapper_actual_name.split('::')
+        code_sink.writeln('static %s %s(%s);' % (wrapper_return, name, ', '.join(wrapper_args)))
 
     def generate_parent_caller_method(self, code_sink):
         ## generate a '%s__parent_caller' method (static methods
@@ -1022,22 +1184,69 @@ class CppVirtualMethodProxy(ReverseWrapperBase):
         return self._helper_class
     helper_class = property(get_helper_class, set_helper_class)
 
+    def get_python_method_name(self):
+        "Get the name of the python method that overrides the virtual method"
+        if settings._get_deprecated_virtuals():
+            return '_' + self.method_name
+        else:
+            return self.method_name
 
     def generate_python_call(self):
         """code to call the python method"""
-        if settings._get_deprecated_virtuals():
-            params = ['m_pyself', '(char *) "_%s"' % self.method_name]
-        else:
-            params = ['m_pyself', '(char *) "%s"' % self.method_name]
+        python_name = self.get_python_method_name()
+        params = ['m_pyself', '(char *) "%s"' % python_name]
         build_params = self.build_params.get_parameters()
         if build_params[0][0] == '"':
             build_params[0] = '(char *) ' + build_params[0]
         params.extend(build_params)
+        self.before_call.write_code("#if PY_VERSION_HEX >= 0x03090000")
+        self._generate_vectorcall(python_name)
+        self.before_call.write_code("#else")
         self.before_call.write_code('py_retval = PyObject_CallMethod(%s);'
                                     % (', '.join(params),))
+        self.before_call.write_code("#endif")
         self.before_call.write_error_check('py_retval == NULL', failure_cleanup='PyErr_Print();')
         self.before_call.add_cleanup_code('Py_DECREF(py_retval);')
 
+    def _generate_vectorcall(self, python_name):
+        """
+        Generates the python 3.9+ version of the call: the arguments
+        are converted directly into a stack array, and the method is
+        called with PyObject_VectorcallMethod (which avoids creating
+        the bound method object and the arguments tuple).
+        """
+        conversions = self.build_params.get_conversions()
+        nargs = len(conversions) + 1
+        ## slot 0 is reserved for PY_VECTORCALL_ARGUMENTS_OFFSET
+        block = self.before_call
+        block.write_code("{")
+        block.indent()
+        block.write_code("PyObject *py_args[%i];" % (nargs + 1,))
+        block.write_code("py_args[1] = m_pyself;")
+        for index, (expression, dummy) in enumerate(conversions):
+            block.write_code("py_args[%i] = %s;" % (index + 2, expression))
+        owned = ["py_args[%i]" % (index + 2)
+                 for index, (dummy, new_reference) in enumerate(conversions) if new_reference]
+        if conversions:
+            block.write_code("if (%s) {" % ' || '.join(["py_args[%i] == NULL" % (index + 2)
+                                                        for index in range(len(conversions))]))
+            block.indent()
+            for arg in owned:
+                block.write_code("Py_XDECREF(%s);" % arg)
+            block.write_code("py_retval = NULL;")
+            block.unindent()
+            block.write_code("} else {")
+            block.indent()
+        block.write_code("py_retval = PyObject_VectorcallMethod(%s, py_args + 1, %i | PY_VECTORCALL_ARGUMENTS_OFFSET, NULL);"
+                         % (self._helper_class.get_method_name_expression(python_name), nargs))
+        for arg in owned:
+            block.write_code("Py_DECREF(%s);" % arg)
+        if conversions:
+            block.unindent()
+            block.write_code("}")
+        block.unindent()
+        block.write_code("}")
+
     def generate_declaration(self, code_sink):
         if self.method.is_const:
             decl_post_modifiers = ' const'
@@ -1068,16 +1277,23 @@ class CppVirtualMethodProxy(ReverseWrapperBase):
         ## just chain to parent class and don't do anything else
         call_params = ', '.join([param.name for param in self.parameters])
         py_method = self.declarations.declare_variable('PyObject*', 'py_method')
-        if settings._get_deprecated_virtuals():
-            self.before_call.write_code('%s = PyObject_GetAttrString(m_pyself, (char *) "_%s"); PyErr_Clear();'
-                                        % (py_method, self.method_name))
-        else:
-            self.before_call.write_code('%s = PyObject_GetAttrString(m_pyself, (char *) "%s"); PyErr_Clear();'
-                                        % (py_method, self.method_name))
+        python_name = self.get_python_method_name()
+        override_index = self._helper_class.get_virtual_override_names().index(python_name)
+        ## skip the attribute lookup when the python class is known
+        ## not to override the method; with vectorcall (python 3.9+)
+        ## the method is looked up by the call itself
         self.before_call.add_cleanup_code('Py_XDECREF(%s);' % py_method)
-
+        self.before_call.write_code("#if PY_VERSION_HEX >= 0x03090000")
+        self.before_call.write_code('%s = NULL;' % py_method)
+        self.before_call.write_code(r'if (!_pybindgen_overrides(%i)) {' % override_index)
+        self.before_call.write_code("#else")
+        self.before_call.write_code(
+            '%s = (_pybindgen_overrides(%i) ? PyObject_GetAttrString(m_pyself, (char *) "%s") : NULL); PyErr_Clear();'
+            % (py_method, override_index, python_name))
         self.before_call.write_code(
             r'if (%s == NULL || Py_TYPE(%s) == &PyCFunction_Type) {' % (py_method, py_method))
+        self.before_call.write_code("#endif")
+
         if self.return_value.ctype == 'void':
             if not (self.method.is_pure_virtual or self.method.visibility == 'private'):
                 self.before_call.write_code(r'    %s::%s(%s);'
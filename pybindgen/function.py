@@ -13,8 +13,8 @@ else:
 
 from copy import copy
 
-from pybindgen.typehandlers.base import ForwardWrapperBase, ReturnValue
-from pybindgen.typehandlers import codesink
+from pybindgen.typehandlers.base import ForwardWrapperBase, ReturnValue, Parameter, \
+    TypeConfigurationError
 from pybindgen.cppexception import CppException
 
 from pybindgen import overloading
@@ -24,6 +24,47 @@ from pybindgen import utils
 import warnings
 import traceback
 
+
+## NumPy type numbers (NPY_TYPES enumeration, part of the NumPy ABI) of
+## the C types that can be used in ufunc loops
+ufunc_type_numbers = {
+    'signed char': 1,
+    'int8_t': 1,
+    'unsigned char': 2,
+    'uint8_t': 2,
+    'short': 3,
+    'short int': 3,
+    'int16_t': 3,
+    'unsigned short': 4,
+    'unsigned short int': 4,
+    'uint16_t': 4,
+    'int': 5,
+    'int32_t': 5,
+    'unsigned int': 6,
+    'uint32_t': 6,
+    'long': 7,
+    'long int': 7,
+    'unsigned long': 8,
+    'unsigned long int': 8,
+    'long long': 9,
+    'long long int': 9,
+    'int64_t': 9,
+    'unsigned long long': 10,
+    'unsigned long long int': 10,
+    'uint64_t': 10,
+    'float': 11,
+    'double': 12,
+    }
+
+## NumPy names 64-bit integers after the first of long and long long
+## that is 64 bits wide, so the type number of [u]int64_t loops depends
+## on the platform (NPY_LONG on LP64, NPY_LONGLONG on LLP64 and 32 bit)
+ufunc_type_number_expressions = {
+    'int64_t': '(sizeof(long) == 8 ? 7 : 9)',
+    'uint64_t': '(sizeof(long) == 8 ? 8 : 10)',
+    }
+
+
 class Function(ForwardWrapperBase):
     """
     Class that generates a wrapper to a C function.
@@ -31,7 +72,7 @@ class Function(ForwardWrapperBase):
 
     def __init__(self, function_name, return_value, parameters, docstring=None, unblock_threads=None,
                  template_parameters=(), custom_name=None, deprecated=False, foreign_cpp_namespace=None,
-                 throw=()):
+                 throw=(), fastcall=None, batch=False, as_ufunc=False):
         """
         :param function_name: name of the C function
         :param return_value: the function return value
@@ -55,6 +96,29 @@ class Function(ForwardWrapperBase):
 
         :param throw: list of C++ exceptions that the function may throw
         :type throw: list of L{CppException}
+
+        :param fastcall: if True (False), force (forbid) generation of
+          the wrapper with the METH_FASTCALL calling convention; if
+          None, the module default is used, see
+          L{pybindgen.settings.fastcall}.
+
+        :param batch: if True, a companion wrapper named <name>_batch
+          is also generated, which takes a sequence of argument tuples
+          and calls the function once per item, converting all arguments
+          first and then running the calls in a tight loop (with the
+          GIL released once for all calls when unblock_threads is
+          set); see L{pybindgen.typehandlers.base.ForwardWrapperBase.generate_batch}.
+
+        :param as_ufunc: if True, the function is also made available
+          as a NumPy ufunc, with broadcasting and strided array
+          support, under the same name; all parameters and the return
+          value must be of arithmetic types.  The ufunc is created at
+          module initialization, replacing the scalar function wrapper,
+          only if NumPy can be imported (no NumPy headers are needed at
+          build time).  Overloads of the same function become loops of
+          a single ufunc.  Functions that throw C++ exceptions (throw
+          parameter) cannot be ufuncs, since the loop has no way to
+          report them.
         """
         self.stack_where_defined = traceback.extract_stack()
 
@@ -79,6 +143,9 @@ class Function(ForwardWrapperBase):
             error_return="return NULL;",
             unblock_threads=unblock_threads)
         self.deprecated = deprecated
+        self.fastcall = fastcall
+        self.batch = batch
+        self.as_ufunc = as_ufunc
         self.foreign_cpp_namespace = foreign_cpp_namespace
         self._module = None
         function_name = utils.ascii(function_name)
@@ -124,9 +191,21 @@ class Function(ForwardWrapperBase):
         func.wrapper_actual_name = self.wrapper_actual_name
         func.throw = list(self.throw)
         func.custodians_and_wards = list(self.custodians_and_wards)
+        func.fastcall = self.fastcall
 
         return func
 
+    def get_batch_wrapper(self):
+        """Creates the companion batch wrapper of this function (see the batch option)"""
+        func = BatchFunction(self.function_name,
+                             self.return_value,
+                             [copy(param) for param in self.parameters],
+                             unblock_threads=self.unblock_threads,
+                             template_parameters=self.template_parameters,
+                             foreign_cpp_namespace=self.foreign_cpp_namespace)
+        func.throw = list(self.throw)
+        return func
+
     def add_custodian_and_ward(self, custodian, ward, postcall=None):
         """Add a custodian/ward relationship to the function wrapper
 
@@ -176,8 +255,11 @@ class Function(ForwardWrapperBase):
             module.prefix, self.mangled_name)
     module = property(get_module, set_module)
 
-    def generate_call(self):
-        "virtual method implementation; do not call"
+    def _get_fastcall_module(self):
+        return self._module
+
+    def _get_call_names(self):
+        """Returns the (namespace, template parameters) parts of the C function call"""
         if self.foreign_cpp_namespace:
             namespace = self.foreign_cpp_namespace + '::'
         elif self._module.cpp_namespace_prefix:
@@ -189,6 +271,11 @@ class Function(ForwardWrapperBase):
             template_params = '< %s >' % ', '.join(self.template_parameters)
         else:
             template_params = ''
+        return namespace, template_params
+
+    def generate_call(self):
+        "virtual method implementation; do not call"
+        namespace, template_params = self._get_call_names()
 
         if self.throw:
             self.before_call.write_code('try\n{')
@@ -225,6 +312,64 @@ class Function(ForwardWrapperBase):
         from . import cppclass
         cppclass.implement_parameter_custodians_precall(self)
 
+    def get_ufunc_types(self):
+        """
+        Returns the list of C types of the ufunc loop arguments (the
+        parameters followed by the return value), or raises
+        TypeConfigurationError if the function cannot be a ufunc loop.
+        """
+        if self.throw:
+            raise TypeConfigurationError("ufunc %r cannot throw C++ exceptions" % (self.function_name,))
+        ctypes = []
+        for param in self.parameters:
+            if param.direction != Parameter.DIRECTION_IN:
+                raise TypeConfigurationError("ufunc parameter %r must have direction IN" % (param.name,))
+            ctypes.append(str(param.type_traits.ctype_no_modifiers))
+        if self.return_value.ctype == 'void':
+            raise TypeConfigurationError("ufunc %r must return a value" % (self.function_name,))
+        ctypes.append(str(self.return_value.type_traits.ctype_no_modifiers))
+        ctypes = [(ctype[len('std::'):] if ctype.startswith('std::') else ctype) for ctype in ctypes]
+        for ctype in ctypes:
+            if ctype not in ufunc_type_numbers:
+                raise TypeConfigurationError("type %r cannot be used in the ufunc %r"
+                                             % (ctype, self.function_name))
+        if len(ctypes) < 2:
+            raise TypeConfigurationError("ufunc %r must have parameters" % (self.function_name,))
+        return ctypes
+
+    def generate_ufunc_loop(self, code_sink, loop_name):
+        """
+        Generates a NumPy ufunc inner loop function calling this
+        function for each element.
+
+        :param code_sink: a CodeSink instance that will receive the generated code
+        :param loop_name: name of the loop function
+        :returns: the list of NumPy type numbers of the loop arguments,
+          as C constant expressions
+        """
+        ctypes = self.get_ufunc_types()
+        namespace, template_params = self._get_call_names()
+        nin = len(ctypes) - 1
+        code_sink.writeln('static void')
+        code_sink.writeln('%s(char **args, const Py_intptr_t *dimensions, const Py_intptr_t *steps, '
+                          'void *PYBINDGEN_UNUSED(data))' % (loop_name,))
+        code_sink.writeln('{')
+        code_sink.indent()
+        code_sink.writeln('Py_intptr_t i;')
+        code_sink.writeln()
+        code_sink.writeln('for (i = 0; i < dimensions[0]; i++) {')
+        code_sink.indent()
+        call_args = ['*(%s *) (args[%i] + i*steps[%i])' % (ctype, num, num)
+                     for num, ctype in enumerate(ctypes[:-1])]
+        code_sink.writeln('*(%s *) (args[%i] + i*steps[%i]) = %s%s%s(%s);'
+                          % (ctypes[-1], nin, nin, namespace, self.function_name, template_params,
+                             ', '.join(call_args)))
+        code_sink.unindent()
+        code_sink.writeln('}')
+        code_sink.unindent()
+        code_sink.writeln('}')
+        return [ufunc_type_number_expressions.get(ctype, str(ufunc_type_numbers[ctype])) for ctype in ctypes]
+
     def _before_return_hook(self):
         "hook that post-processes parameters and check for custodian=<n> CppClass parameters"
         from . import cppclass
@@ -238,7 +383,7 @@ class Function(ForwardWrapperBase):
         :param wrapper_name: name of wrapper function
         """
 
-        if self.throw: # Bug #780945
+        if self.throw and self.return_value.REQUIRES_ASSIGNMENT_CONSTRUCTOR: # Bug #780945
             self.return_value.REQUIRES_ASSIGNMENT_CONSTRUCTOR = False
             self.reset_code_generation_state()
 
@@ -246,42 +391,43 @@ class Function(ForwardWrapperBase):
             self.wrapper_actual_name = self.wrapper_base_name
         else:
             self.wrapper_actual_name = wrapper_name
-        tmp_sink = codesink.MemoryCodeSink()
-        self.generate_body(tmp_sink)
 
         flags = self.get_py_method_def_flags()
         self.wrapper_args = []
+        if self.self_parameter_pystruct is None:
+            self_param = 'PyObject * PYBINDGEN_UNUSED(dummy)'
+        else:
+            self_param = '%s *self' % self.self_parameter_pystruct
         if 'METH_VARARGS' in flags:
-            if self.self_parameter_pystruct is None:
-                self_param = 'PyObject * PYBINDGEN_UNUSED(dummy)'
-            else:
-                self_param = '%s *self' % self.self_parameter_pystruct
             self.wrapper_args.append(self_param)
             self.wrapper_args.append("PyObject *args")
             if 'METH_KEYWORDS' in flags:
                 self.wrapper_args.append("PyObject *kwargs")
             else:
                 self.wrapper_args.append("PyObject *PYBINDGEN_UNUSED(_kwargs)")
+        elif 'METH_FASTCALL' in flags:
+            self.wrapper_args.append(self_param)
+            self.wrapper_args.extend(["PyObject *const *args", "Py_ssize_t nargs", "PyObject *kwnames"])
+        elif 'METH_O' in flags:
+            self.wrapper_args.append(self_param)
+            self.wrapper_args.append("PyObject *arg")
         else:
                 self.wrapper_args.append("PyObject *PYBINDGEN_UNUSED(_args)")
                 self.wrapper_args.append("PyObject *PYBINDGEN_UNUSED(_kwargs)")
         self.wrapper_args.extend(extra_wrapper_params)
         self.wrapper_return = "PyObject *"
-        self.write_open_wrapper(code_sink)
-        tmp_sink.flush_to(code_sink)
-        self.write_close_wrapper(code_sink)
+        self.write_generation_result(code_sink)
 
 
     def generate_declaration(self, code_sink, extra_wrapper_parameters=()):
-        ## We need to fake generate the code (and throw away the
-        ## result) only in order to obtain correct method signature.
-        self.reset_code_generation_state()
-        self.generate(codesink.NullCodeSink(), extra_wrapper_params=extra_wrapper_parameters)
-        assert isinstance(self.wrapper_return, string_types)
-        assert isinstance(self.wrapper_actual_name, string_types)
-        assert isinstance(self.wrapper_args, list)
-        code_sink.writeln('%s %s(%s);' % (self.wrapper_return, self.wrapper_actual_name, ', '.join(self.wrapper_args)))
-        self.reset_code_generation_state()
+        ## The signature depends on the generated code; it is
+        ## recorded when the wrapper function is generated
+        wrapper_return, wrapper_actual_name, wrapper_args = \
+            self.get_declaration_prototype(extra_wrapper_parameters)
+        assert isinstance(wrapper_return, string_types)
+        assert isinstance(wrapper_actual_name, string_types)
+        assert isinstance(wrapper_args, list)
+        code_sink.writeln('%s %s(%s);' % (wrapper_return, wrapper_actual_name, ', '.join(wrapper_args)))
 
     def get_py_method_def(self, name):
         """
@@ -311,6 +457,28 @@ class Function(ForwardWrapperBase):
         return string
 
 
+class BatchFunction(Function):
+    """
+    Companion wrapper of a function added with batch=True, which calls
+    the function once for each item of a sequence of argument tuples.
+    """
+
+    def generate(self, code_sink, wrapper_name=None, extra_wrapper_params=()):
+        assert not extra_wrapper_params
+        if wrapper_name is None:
+            self.wrapper_actual_name = self.wrapper_base_name
+        else:
+            self.wrapper_actual_name = wrapper_name
+        self.generate_batch(code_sink)
+
+    def get_py_method_def_flags(self):
+        return ['METH_VARARGS', 'METH_KEYWORDS']
+
+    def generate_docstring(self, name):
+        return "{0}(items)\\n\\ncalls {1}({2}) for each item of a sequence".format(
+            name, self.function_name, ", ".join([p.name for p in self.parameters]))
+
+
 class CustomFunctionWrapper(Function):
     """
     Adds a custom function wrapper.  The custom wrapper must be
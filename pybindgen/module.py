@@ -45,18 +45,23 @@ to create sub-modules for wrapping nested namespaces.  For instance::
 
 """
 
-from pybindgen.function import Function, OverloadedFunction, CustomFunctionWrapper
-from pybindgen.typehandlers.base import CodeBlock, DeclarationsScope, ReturnValue, TypeHandler
-from pybindgen.typehandlers.codesink import MemoryCodeSink, CodeSink, FileCodeSink, NullCodeSink
+from pybindgen.function import Function, OverloadedFunction, CustomFunctionWrapper, ufunc_type_numbers
+from pybindgen.typehandlers.base import CodeBlock, DeclarationsScope, ReturnValue, TypeHandler, TypeConfigurationError
+from pybindgen.typehandlers.codesink import MemoryCodeSink, CodeSink, FileCodeSink, NullCodeSink, \
+    WriteIfChangedCodeSink, SpoolCodeSink, WRITE_CHUNK_SIZE
 from pybindgen.cppclass import CppClass
 from pybindgen.cppexception import CppException
 from pybindgen.enum import Enum
 from pybindgen.container import Container
 from pybindgen.converter_functions import PythonToCConverter, CToPythonConverter
 from pybindgen import utils
+from pybindgen import settings
 import warnings
 import traceback
 import collections
+import hashlib
+import os.path
+import sys
 
 class MultiSectionFactory(object):
     """
@@ -105,6 +110,260 @@ class MultiSectionFactory(object):
         "" or <>.  For example, '"foomodule.h"'.
         """
         raise NotImplementedError
+    def assign_sections(self, module):
+        """
+        Called by L{Module.generate} before any code is generated, to
+        give the factory a chance to assign sections to the module
+        contents.  The default implementation does nothing.
+
+        :param module: the root L{Module} being generated
+        """
+        pass
+
+
+class BalancedMultiSectionFactory(MultiSectionFactory):
+    """
+    A L{MultiSectionFactory} that writes the generated code into a
+    directory, and that distributes the functions, classes,
+    containers, exceptions and enums not explicitly placed in a section
+    (see L{ModuleBase.begin_section}) across a number of sections of
+    roughly the same size, so that they compile in parallel in
+    similar times.
+
+    The size of each item is estimated from the number of wrappers it
+    generates and their parameters.  Each item has a home section,
+    chosen by hashing its name; it goes there unless that would make
+    the section larger than the average section size plus a
+    tolerance (BALANCE_TOLERANCE times the average, or the size of
+    the largest item if greater), in which case it goes to the next
+    section with room.  Hence adding, removing or changing an item seldom
+    moves other items to different sections.  Classes related by
+    inheritance or nesting always share a section.
+
+    The generated files are C{<base_name>.cc} (main file),
+    C{<base_name>.h} (common header) and C{<base_name>-section<N>.cc},
+    with N from 0 to num_sections-1; sections that turn out empty
+    still get a (trivial) file, so that the list of files to compile
+    does not depend on the module contents.
+
+    With write_if_changed=True, files whose contents did not change
+    are not rewritten (see L{WriteIfChangedCodeSink}), so that only
+    the sections affected by a change in the module are recompiled.
+    After L{close}, the names of the files are in the changed_files
+    and unchanged_files lists.
+    """
+
+    ## estimated size, in lines of code, of the generated items
+    CLASS_SIZE = 150
+    WRAPPER_SIZE = 25
+    PARAMETER_SIZE = 6
+    ATTRIBUTE_SIZE = 30
+    VIRTUAL_METHOD_SIZE = 40
+    CONTAINER_SIZE = 250
+    EXCEPTION_SIZE = 30
+    ENUM_SIZE = 10
+    ENUM_VALUE_SIZE = 2
+
+    ## how much larger than the average a section may grow
+    BALANCE_TOLERANCE = 0.25
+
+    def __init__(self, directory, base_name, num_sections=None, write_if_changed=False):
+        """
+        :param directory: directory where the files are written
+        :param base_name: base name of the generated files, e.g. 'foomodule'
+        :param num_sections: number of sections; defaults to the number of CPUs
+        :param write_if_changed: if True, only write the files whose contents changed
+        """
+        if num_sections is None:
+            try:
+                import multiprocessing
+                num_sections = multiprocessing.cpu_count()
+            except (ImportError, NotImplementedError):
+                num_sections = 1
+        if num_sections < 1:
+            raise ValueError("num_sections must be at least 1")
+        self.directory = directory
+        self.base_name = base_name
+        self.num_sections = num_sections
+        self.write_if_changed = write_if_changed
+        self.header_name = "%s.h" % base_name
+        self.main_sink = self._open_sink("%s.cc" % base_name)
+        self.header_sink = self._open_sink(self.header_name)
+        self.section_sinks = {}
+        self.section_sizes = [0]*num_sections
+        self.changed_files = []
+        self.unchanged_files = []
+
+    def _open_sink(self, file_name):
+        file_name = os.path.join(self.directory, file_name)
+        if self.write_if_changed:
+            return WriteIfChangedCodeSink(file_name)
+        else:
+            return FileCodeSink(open(file_name, "wt", WRITE_CHUNK_SIZE))
+
+    def get_section_names(self):
+        """Returns the names of the automatic sections"""
+        return ["%s-section%i" % (self.base_name, num) for num in range(self.num_sections)]
+
+    def get_file_names(self):
+        """
+        Returns the names of all source files generated, main file
+        first (the header file is not included).
+        """
+        names = ["%s.cc" % self.base_name] + ["%s.cc" % name for name in self.get_section_names()]
+        names.extend(["%s.cc" % name for name in sorted(self.section_sinks)
+                      if name not in self.get_section_names()])
+        return [os.path.join(self.directory, name) for name in names]
+
+    def get_section_code_sink(self, section_name):
+        if section_name == '__main__':
+            return self.main_sink
+        try:
+            return self.section_sinks[section_name]
+        except KeyError:
+            sink = self._open_sink("%s.cc" % section_name)
+            self.section_sinks[section_name] = sink
+            return sink
+
+    def get_main_code_sink(self):
+        return self.main_sink
+
+    def get_common_header_code_sink(self):
+        return self.header_sink
+
+    def get_common_header_include(self):
+        return '"%s"' % self.header_name
+
+    def _estimate_wrappers_size(self, wrappers):
+        return sum([self.WRAPPER_SIZE + self.PARAMETER_SIZE*len(getattr(wrapper, 'parameters', ()))
+                    for wrapper in wrappers])
+
+    def _estimate_class_size(self, class_):
+        size = self.CLASS_SIZE
+        size += self._estimate_wrappers_size(class_.constructors)
+        for overload in class_.methods.values():
+            size += self._estimate_wrappers_size(overload.wrappers)
+            size += self.VIRTUAL_METHOD_SIZE*len([wrapper for wrapper in overload.wrappers
+                                                  if getattr(wrapper, 'is_virtual', False)])
+        size += self.ATTRIBUTE_SIZE*(len(class_.instance_attributes.attributes)
+                                     + len(class_.static_attributes.attributes))
+        return size
+
+    def _get_anonymous_enum_name(self, enum, module_path):
+        """Returns a name for an anonymous enum, made of the name of
+        its scope and of its first value"""
+        if enum.outer_class is not None:
+            scope = enum.outer_class.full_name
+        else:
+            scope = module_path
+        values = [(value[0] if isinstance(value, tuple) else value) for value in enum.values]
+        return '%s::<enum %s>' % (scope, ''.join(values[:1]))
+
+    def _get_groups(self, module):
+        """
+        Returns a list of [size, items, name] groups of module
+        contents that are not yet in a section, in module order.  The
+        name of a group is the smallest name of its items.
+        """
+        groups = []
+        class_groups = {} # id(class) -> group
+        def class_group(class_):
+            return class_groups.get(id(class_))
+        def merge(group, other):
+            if group is other:
+                return group
+            group[0] += other[0]
+            group[1].extend(other[1])
+            group[2] = min(group[2], other[2])
+            for item in other[1]:
+                class_groups[id(item)] = group
+            groups.remove(other)
+            return group
+
+        def visit(mod):
+            module_path = '.'.join(mod.get_module_path())
+            for overload in mod.functions.values():
+                if overload.section == '__main__':
+                    groups.append([self._estimate_wrappers_size(overload.wrappers), [overload],
+                                   '%s.%s' % (module_path, overload.wrapper_name)])
+            for class_ in mod.classes:
+                if class_.section != '__main__' or class_.import_from_module:
+                    continue
+                group = [self._estimate_class_size(class_), [class_], class_.full_name]
+                groups.append(group)
+                class_groups[id(class_)] = group
+                for related in list(class_.bases) + [class_.outer_class]:
+                    if related is not None and class_group(related) is not None:
+                        group = merge(class_group(related), group)
+            for container in mod.containers:
+                if container.section == '__main__':
+                    groups.append([self.CONTAINER_SIZE, [container],
+                                   container.full_name or '%s.%s' % (module_path, container.name)])
+            for exc in mod.exceptions:
+                if exc.section == '__main__':
+                    groups.append([self.EXCEPTION_SIZE, [exc], exc.full_name])
+            for enum in mod.enums:
+                if enum.section == '__main__':
+                    groups.append([self.ENUM_SIZE + self.ENUM_VALUE_SIZE*len(enum.values), [enum],
+                                   enum.full_name or self._get_anonymous_enum_name(enum, module_path)])
+            for submodule in mod.submodules:
+                visit(submodule)
+        visit(module)
+        return groups
+
+    def assign_sections(self, module):
+        """
+        Distributes the module contents not yet in a section across
+        the automatic sections, see L{BalancedMultiSectionFactory}.
+        """
+        groups = self._get_groups(module)
+        if not groups:
+            return
+        average_size = float(sum(self.section_sizes) + sum([group[0] for group in groups]))/self.num_sections
+        max_size = average_size + max(average_size*self.BALANCE_TOLERANCE,
+                                      max([group[0] for group in groups]))
+        ## the order, like the home sections, depends only on the
+        ## names, not on the sizes, so that a change in one item
+        ## does not affect the placement of the others
+        keyed_groups = []
+        for index, (size, items, name) in enumerate(groups):
+            digest = hashlib.md5(name.encode('utf-8')).hexdigest()
+            keyed_groups.append((digest, index, size, items))
+        keyed_groups.sort()
+        section_names = self.get_section_names()
+        for digest, index, size, items in keyed_groups:
+            home = int(digest, 16) % self.num_sections
+            for offset in range(self.num_sections):
+                num = (home + offset) % self.num_sections
+                if self.section_sizes[num] + size <= max_size:
+                    break
+            else:
+                num = self.section_sizes.index(min(self.section_sizes))
+            self.section_sizes[num] += size
+            for item in items:
+                if isinstance(item, OverloadedFunction):
+                    for wrapper in item.wrappers:
+                        wrapper.section = section_names[num]
+                else:
+                    item.section = section_names[num]
+
+    def close(self):
+        for name in self.get_section_names():
+            if name not in self.section_sinks:
+                self.get_section_code_sink(name).writeln("#include %s" % self.get_common_header_include())
+        for sink in [self.header_sink, self.main_sink] + [self.section_sinks[name]
+                                                          for name in sorted(self.section_sinks)]:
+            if isinstance(sink, WriteIfChangedCodeSink):
+                changed = sink.close()
+                file_name = sink.file_name
+            else:
+                sink.file.close()
+                changed = True
+                file_name = sink.file.name
+            if changed:
+                self.changed_files.append(file_name)
+            else:
+                self.unchanged_files.append(file_name)
 
 
 class _SinkManager(object):
@@ -118,6 +377,19 @@ class _SinkManager(object):
         :returns: (body_code_sink, header_code_sink) 
         """
         raise NotImplementedError
+    def generate_wrapper(self, module, wrapper, generate, *args):
+        """
+        Generates the code of a module item (function, class,
+        container, exception or enum).
+
+        :param module: the module that contains the item
+        :param wrapper: the item
+        :param generate: callable that generates the item, called
+          with (body_code_sink, header_code_sink, *args)
+        :returns: the return value of generate
+        """
+        sink, header_sink = self.get_code_sink_for_wrapper(wrapper)
+        return generate(sink, header_sink, *args)
     def get_includes_code_sink(self):
         raise NotImplementedError
     def get_main_code_sink(self):
@@ -156,6 +428,193 @@ class _MultiSectionSinkManager(_SinkManager):
     def close(self):
         pass
 
+class _ParallelMergeSinkManager(_MultiSectionSinkManager):
+    """
+    Sink manager used by the parent process in parallel code
+    generation: instead of generating the items that worker processes
+    have already generated, it replays the code they recorded, in
+    module order, so that the output is the same as with serial
+    generation.
+    """
+    def __init__(self, multi_section_factory, records):
+        super(_ParallelMergeSinkManager, self).__init__(multi_section_factory)
+        self.records = records
+        self._next_index = 0
+
+    def generate_wrapper(self, module, wrapper, generate, *args):
+        index = self._next_index
+        self._next_index += 1
+        record = self.records.get(index)
+        root = module.get_root()
+        if record is None or [name for name in record.new_definitions
+                              if name in root.one_time_definitions]:
+            ## not generated by a worker, or generated by a worker
+            ## that did not know about a one-time definition (e.g. a
+            ## type converter function) already emitted by an item of
+            ## another worker: (re)generate it here
+            return super(_ParallelMergeSinkManager, self).generate_wrapper(module, wrapper, generate, *args)
+        for description, exception in record.errors:
+            ## the worker skipped the wrapper; the error handler of
+            ## this process decides whether that was right
+            if not settings.error_handler.handle_error(description, exception, None):
+                raise exception
+        sink, header_sink = self.get_code_sink_for_wrapper(wrapper)
+        for target, lines in [(sink, record.code),
+                              (header_sink, record.common_header),
+                              (self.get_main_code_sink(), record.main),
+                              (root.header, record.header),
+                              (root.body, record.body),
+                              (module.after_init.sink, record.after_init)]:
+            for line in lines:
+                target.writeln(line)
+        for name in record.new_definitions:
+            root.one_time_definitions[name] = None
+        return record.result
+
+
+class _ItemRecord(object):
+    """
+    The code generated for a module item by a parallel code
+    generation worker process (see L{_SectionsRecorderSinkManager}).
+    """
+    def __init__(self, code, common_header, main, header, body, after_init,
+                 new_definitions, result, errors):
+        ## lists of code lines written into each sink
+        self.code = code
+        self.common_header = common_header
+        self.main = main
+        self.header = header
+        self.body = body
+        self.after_init = after_init
+        ## names of the one-time definitions declared
+        self.new_definitions = new_definitions
+        ## return value of the generate function
+        self.result = result
+        ## (wrapper description, exception) of the errors that
+        ## settings.error_handler is to handle
+        self.errors = errors
+
+
+class _WrapperDescription(object):
+    """
+    Stands for a wrapper of a parallel code generation worker process
+    when its errors are passed to the error handler of the parent
+    process (wrapper objects cannot be sent between processes).
+    """
+    def __init__(self, wrapper):
+        self.description = str(wrapper)
+        self.representation = repr(wrapper)
+    def __str__(self):
+        return self.description
+    def __repr__(self):
+        return self.representation
+
+
+class _RecordingErrorHandler(settings.ErrorHandler):
+    """
+    Error handler used by parallel code generation worker processes:
+    records the errors, and skips the wrappers that caused them.  The
+    errors are only passed to the real error handler, which may have
+    side effects, by the parent process (see
+    L{_ParallelMergeSinkManager}), which aborts code generation if it
+    does not handle them.
+    """
+    def __init__(self):
+        super(_RecordingErrorHandler, self).__init__()
+        self.errors = []
+    def handle_error(self, wrapper, exception, traceback_):
+        self.errors.append((_WrapperDescription(wrapper), exception))
+        return True
+
+
+class _SectionsRecorderSinkManager(_SinkManager):
+    """
+    Sink manager used by parallel code generation worker processes:
+    generates only the items of the given sections, and records,
+    for each of them, the code written into each sink.  Items are
+    identified by their index in module generation order.
+    """
+    def __init__(self, sections):
+        super(_SectionsRecorderSinkManager, self).__init__()
+        self.sections = sections
+        self.section_sinks = {}
+        self.header_sink = MemoryCodeSink()
+        self.main_sink = MemoryCodeSink()
+        self.records = {} # index -> _ItemRecord
+        self._next_index = 0
+
+    def get_code_sink_for_wrapper(self, wrapper):
+        section = getattr(wrapper, "section", None)
+        try:
+            sink = self.section_sinks[section]
+        except KeyError:
+            sink = MemoryCodeSink()
+            self.section_sinks[section] = sink
+        return sink, self.header_sink
+
+    def generate_wrapper(self, module, wrapper, generate, *args):
+        index = self._next_index
+        self._next_index += 1
+        if getattr(wrapper, "section", None) not in self.sections:
+            return None
+        sink, header_sink = self.get_code_sink_for_wrapper(wrapper)
+        root = module.get_root()
+        sinks = [sink, header_sink, self.main_sink, root.header, root.body, module.after_init.sink]
+        starts = [sink_.get_position() for sink_ in sinks]
+        definitions = set(root.one_time_definitions)
+        error_handler = settings.error_handler
+        if error_handler is not None:
+            settings.error_handler = _RecordingErrorHandler()
+        try:
+            result = generate(sink, header_sink, *args)
+            errors = getattr(settings.error_handler, 'errors', [])
+        finally:
+            settings.error_handler = error_handler
+        lines = [sink_.get_lines(start) for sink_, start in zip(sinks, starts)]
+        new_definitions = [name for name in root.one_time_definitions if name not in definitions]
+        self.records[index] = _ItemRecord(*(lines + [new_definitions, result, errors]))
+        return result
+
+    def get_includes_code_sink(self):
+        return self.header_sink
+    def get_main_code_sink(self):
+        return self.main_sink
+    def close(self):
+        pass
+
+
+## state inherited by parallel code generation worker processes
+_parallel_generation = None
+
+def _generate_sections(sections):
+    """
+    Parallel code generation worker: generates the items of the given
+    sections and returns their records.
+    """
+    module, module_file_base_name = _parallel_generation
+    sink_manager = _SectionsRecorderSinkManager(sections)
+    module.do_generate(sink_manager, module_file_base_name)
+    return sink_manager.records
+
+def _get_fork_context():
+    """
+    Returns the multiprocessing module or context for creating
+    worker processes by forking, or None if not supported.
+    """
+    try:
+        import multiprocessing
+    except ImportError:
+        return None
+    if hasattr(multiprocessing, 'get_context'):
+        try:
+            return multiprocessing.get_context('fork')
+        except ValueError:
+            return None
+    if sys.platform == 'win32':
+        return None
+    return multiprocessing
+
+
 class _MonolithicSinkManager(_SinkManager):
     """
     Sink manager that deals with single-section monolithic code generation.
@@ -179,6 +638,26 @@ class _MonolithicSinkManager(_SinkManager):
         self.code_sink.flush_to(self.final_code_sink)
 
 
+class _StreamingMonolithicSinkManager(_MonolithicSinkManager):
+    """
+    Sink manager for monolithic code generation that writes the code
+    to a temporary spool file as it is generated, instead of keeping
+    it in memory; only the includes are kept in memory.  The spool is
+    copied after the includes into the final code sink at the end.
+    """
+    def __init__(self, code_sink):
+        super(_StreamingMonolithicSinkManager, self).__init__(code_sink)
+        encoding = None
+        if isinstance(code_sink, FileCodeSink):
+            encoding = getattr(code_sink.file, 'encoding', None)
+        self.code_sink = SpoolCodeSink(encoding)
+    def close(self):
+        try:
+            super(_StreamingMonolithicSinkManager, self).close()
+        finally:
+            self.code_sink.close()
+
+
 class ModuleBase(dict):
     """
     ModuleBase objects can be indexed dictionary style to access contained types.  Example::
@@ -210,7 +689,7 @@ class ModuleBase(dict):
 
     """
 
-    def __init__(self, name, parent=None, docstring=None, cpp_namespace=None):
+    def __init__(self, name, parent=None, docstring=None, cpp_namespace=None, fastcall=None):
         """
         Note: this is an abstract base class, see L{Module}
 
@@ -218,11 +697,19 @@ class ModuleBase(dict):
         :param parent: parent L{module<Module>} (i.e. the one that contains this submodule) or None if this is a root module
         :param docstring: docstring to use for this module
         :param cpp_namespace: C++ namespace prefix associated with this module
+        :param fastcall: default calling convention for the wrappers
+            of this module, see :attr:`fastcall`
         :return: a new module object
         """
         super(ModuleBase, self).__init__()
         self.parent = parent
         self.docstring = docstring
+
+        ## True to generate the functions, methods and constructors
+        ## of this module with the METH_FASTCALL calling convention;
+        ## None means inherit from the parent module or use
+        ## pybindgen.settings.fastcall
+        self.fastcall = fastcall
         self.submodules = []
         self.enums = []
         self.typedefs = [] # list of (wrapper, alias) tuples
@@ -270,6 +757,17 @@ class ModuleBase(dict):
 
         self._current_section = '__main__'
 
+    def get_fastcall(self):
+        """
+        Returns the effective default calling convention (True for
+        METH_FASTCALL) of the wrappers of this module.
+        """
+        if self.fastcall is not None:
+            return self.fastcall
+        if self.parent is not None:
+            return self.parent.get_fastcall()
+        return settings.fastcall
+
     def get_current_section(self):
         return self.get_root()._current_section
     current_section = property(get_current_section)
@@ -386,6 +884,10 @@ class ModuleBase(dict):
         wrapper.module = self
         wrapper.section = self.current_section
         overload.add(wrapper)
+        if wrapper.batch:
+            batch_wrapper = wrapper.get_batch_wrapper()
+            batch_wrapper.custom_name = name + '_batch'
+            self._add_function_obj(batch_wrapper)
 
     def add_function(self, *args, **kwargs):
         """
@@ -412,6 +914,16 @@ class ModuleBase(dict):
         self._add_function_obj(func)
         return func
 
+    def add_ufunc(self, *args, **kwargs):
+        """
+        Add a function to the module/namespace, made available as a
+        NumPy ufunc when NumPy is installed.  Same as add_function with
+        as_ufunc=True; see the documentation for
+        :meth:`Function.__init__` for information on accepted parameters.
+        """
+        kwargs['as_ufunc'] = True
+        return self.add_function(*args, **kwargs)
+
     def add_custom_function_wrapper(self, *args, **kwargs):
         """
         Add a function, using custom wrapper code, to the module/namespace. See the documentation for
@@ -644,6 +1156,20 @@ class ModuleBase(dict):
             submodule.generate_forward_declarations(code_sink)
         self._forward_declarations_declared = True
 
+    def get_sections(self):
+        """
+        Returns the set of section names of the module items
+        (functions, classes, containers, exceptions and enums),
+        including the items of sub-modules.
+        """
+        sections = set()
+        for item in (list(self.functions.values()) + self.classes + self.containers
+                     + self.exceptions + self.enums):
+            sections.add(getattr(item, 'section', None))
+        for submodule in self.submodules:
+            sections.update(submodule.get_sections())
+        return sections
+
     def get_module_path(self):
         """Get the full [module, submodule, submodule,...] path """
         names = [self.name]
@@ -674,6 +1200,79 @@ class ModuleBase(dict):
             parent = parent.parent
         return names
 
+    def _generate_function(self, sink, dummy_header_sink, func_name, overload, main_sink):
+        """(internal) Generates a function; returns its PyMethodDef entry, or None if skipped."""
+        sink.writeln()
+        try:
+            utils.call_with_error_handling(overload.generate, (sink,), {}, overload)
+        except utils.SkipWrapper:
+            return None
+        try:
+            utils.call_with_error_handling(overload.generate_declaration, (main_sink,), {}, overload)
+        except utils.SkipWrapper:
+            return None
+        sink.writeln()
+        return overload.get_py_method_def(func_name)
+
+    def _generate_item(self, sink, dummy_header_sink, item):
+        """(internal) Generates a class, container or exception."""
+        sink.writeln()
+        item.generate(sink, self)
+        sink.writeln()
+
+    def _generate_enum(self, sink, header_sink, enum):
+        """(internal) Generates an enum."""
+        sink.writeln()
+        enum.generate(sink)
+        enum.generate_declaration(header_sink, self)
+        sink.writeln()
+
+    def _generate_ufunc(self, code_sink, name, wrappers, module_var):
+        """
+        Generates the loops of a NumPy ufunc, one per function
+        overload, and the module initialization code that replaces the
+        function by the ufunc, if NumPy can be imported.
+
+        :param module_var: name of the variable holding this module's
+          python module object in the module init function
+        """
+        ufunc_name = "_wrap_%s_%s__ufunc" % (self.prefix, name)
+        ## NumPy uses the first loop to which the inputs can be
+        ## safely cast, so loops of smaller types must come first
+        wrappers = sorted(wrappers, key=lambda wrapper: [ufunc_type_numbers[ctype]
+                                                         for ctype in wrapper.get_ufunc_types()])
+        code_sink.writeln('#if PY_VERSION_HEX >= 0x03000000')
+        types = []
+        nin = None
+        for num, wrapper in enumerate(wrappers):
+            if nin is None:
+                nin = len(wrapper.parameters)
+            elif len(wrapper.parameters) != nin:
+                raise TypeConfigurationError("all overloads of the ufunc %r must have the same number of parameters"
+                                             % (name,))
+            types.extend(wrapper.generate_ufunc_loop(code_sink, "%s_loop%i" % (ufunc_name, num)))
+            code_sink.writeln()
+        code_sink.writeln('static _PyBindGenUFuncLoop %s_loops[] = {%s};'
+                          % (ufunc_name, ', '.join(["%s_loop%i" % (ufunc_name, num) for num in range(len(wrappers))])))
+        code_sink.writeln('static void *%s_data[] = {%s};' % (ufunc_name, ', '.join(['NULL'] * len(wrappers))))
+        code_sink.writeln('static char %s_types[] = {%s};' % (ufunc_name, ', '.join(types)))
+        code_sink.writeln('#endif')
+        code_sink.writeln()
+
+        docstring = wrappers[0].docstring
+        if docstring is None:
+            docstring = "%s(%s)" % (name, ", ".join([p.name for p in wrappers[0].parameters]))
+        ufunc = self.after_init.declare_variable('PyObject*', 'ufunc')
+        self.after_init.write_code('#if PY_VERSION_HEX >= 0x03000000')
+        self.after_init.write_code('%s = _pybindgen_ufunc_new(%s_loops, %s_data, %s_types, %i, %i, 1, "%s", "%s");'
+                                   % (ufunc, ufunc_name, ufunc_name, ufunc_name, len(wrappers), nin,
+                                      name, docstring))
+        self.after_init.write_error_check('%s == NULL && PyErr_Occurred()' % (ufunc,))
+        self.after_init.write_code('if (%s != NULL) {' % (ufunc,))
+        self.after_init.write_code('    PyModule_AddObject(%s, (char *) "%s", %s);' % (module_var, name, ufunc))
+        self.after_init.write_code('}')
+        self.after_init.write_code('#endif')
+
     def do_generate(self, out, module_file_base_name=None):
         """(internal) Generates the module."""
         assert isinstance(out, _SinkManager)
@@ -727,20 +1326,10 @@ class ModuleBase(dict):
             main_sink.writeln('/* --- module functions --- */')
             main_sink.writeln()
             for func_name, overload in self.functions.items():
-                sink, header_sink = out.get_code_sink_for_wrapper(overload)
-                sink.writeln()
-                try:
-                    utils.call_with_error_handling(overload.generate, (sink,), {}, overload)
-                except utils.SkipWrapper:
-                    continue
-                try:
-                    utils.call_with_error_handling(overload.generate_declaration, (main_sink,), {}, overload)
-                except utils.SkipWrapper:
-                    continue
-                
-                sink.writeln()
-                py_method_defs.append(overload.get_py_method_def(func_name))
-                del sink
+                py_method_def = out.generate_wrapper(self, overload, self._generate_function,
+                                                     func_name, overload, main_sink)
+                if py_method_def is not None:
+                    py_method_defs.append(py_method_def)
 
         ## generate the function table
         main_sink.writeln("static PyMethodDef %s_functions[] = {"
@@ -752,40 +1341,35 @@ class ModuleBase(dict):
         main_sink.unindent()
         main_sink.writeln("};")
 
+        ## generate the ufuncs
+        for func_name, overload in self.functions.items():
+            ufunc_wrappers = [wrapper for wrapper in overload.wrappers if getattr(wrapper, 'as_ufunc', False)]
+            if ufunc_wrappers:
+                utils.call_with_error_handling(self._generate_ufunc, (main_sink, func_name, ufunc_wrappers, m), {},
+                                               ufunc_wrappers[0])
+
         ## generate the classes
         if self.classes:
             main_sink.writeln('/* --- classes --- */')
             main_sink.writeln()
             for class_ in [c for c in self.classes if c.import_from_module]:
-                sink, header_sink = out.get_code_sink_for_wrapper(class_)
-                sink.writeln()
-                class_.generate(sink, self)
-                sink.writeln()
+                out.generate_wrapper(self, class_, self._generate_item, class_)
             for class_ in [c for c in self.classes if not c.import_from_module]:
-                sink, header_sink = out.get_code_sink_for_wrapper(class_)
-                sink.writeln()
-                class_.generate(sink, self)
-                sink.writeln()
+                out.generate_wrapper(self, class_, self._generate_item, class_)
 
         ## generate the containers
         if self.containers:
             main_sink.writeln('/* --- containers --- */')
             main_sink.writeln()
             for container in self.containers:
-                sink, header_sink = out.get_code_sink_for_wrapper(container)
-                sink.writeln()
-                container.generate(sink, self)
-                sink.writeln()
+                out.generate_wrapper(self, container, self._generate_item, container)
 
         ## generate the exceptions
         if self.exceptions:
             main_sink.writeln('/* --- exceptions --- */')
             main_sink.writeln()
             for exc in self.exceptions:
-                sink, header_sink = out.get_code_sink_for_wrapper(exc)
-                sink.writeln()
-                exc.generate(sink, self)
-                sink.writeln()
+                out.generate_wrapper(self, exc, self._generate_item, exc)
 
         # typedefs
         for (wrapper, alias) in self.typedefs:
@@ -798,11 +1382,7 @@ class ModuleBase(dict):
             main_sink.writeln('/* --- enumerations --- */')
             main_sink.writeln()
             for enum in self.enums:
-                sink, header_sink = out.get_code_sink_for_wrapper(enum)
-                sink.writeln()
-                enum.generate(sink)
-                enum.generate_declaration(header_sink, self)
-                sink.writeln()
+                out.generate_wrapper(self, enum, self._generate_enum, enum)
 
         ## register the submodules
         if self.submodules:
@@ -899,15 +1479,18 @@ __attribute__ ((visibility("default")))
 
 
 class Module(ModuleBase):
-    def __init__(self, name, docstring=None, cpp_namespace=None):
+    def __init__(self, name, docstring=None, cpp_namespace=None, fastcall=None):
         """
         :param name: module name
         :param docstring: docstring to use for this module
         :param cpp_namespace: C++ namespace prefix associated with this module
+        :param fastcall: if True, generate wrappers with the METH_FASTCALL calling convention
+                         (default: pybindgen.settings.fastcall)
         """
-        super(Module, self).__init__(name, docstring=docstring, cpp_namespace=cpp_namespace)
+        super(Module, self).__init__(name, docstring=docstring, cpp_namespace=cpp_namespace,
+                                     fastcall=fastcall)
 
-    def generate(self, out, module_file_base_name=None):
+    def generate(self, out, module_file_base_name=None, jobs=None, streaming=False):
         """Generates the module
 
         :type out: a file object, L{FileCodeSink}, or L{MultiSectionFactory}
@@ -916,18 +1499,85 @@ class Module(ModuleBase):
         This is useful when we want to produce a _foo module that will
         be imported into a foo module, to avoid making all types
         docstrings contain _foo.Xpto instead of foo.Xpto.
+
+        :param jobs: when generating into a L{MultiSectionFactory},
+        number of worker processes among which the sections are
+        divided.  Each worker process generates the code of the items
+        (functions, classes, etc.) of its sections, and the results
+        are merged in module order, so the generated code is the same
+        as with serial generation.  The worker processes are forked,
+        thus inheriting the module definition; on platforms that
+        cannot fork, the code is generated serially.  The errors of
+        the workers are passed to settings.error_handler in the
+        parent process, with a description of the wrapper (its str
+        and repr) instead of the wrapper itself, and no traceback.
+
+        :param streaming: when generating into a single file or code
+        sink, write the code to a temporary file as it is generated,
+        instead of keeping the whole module code in memory until the
+        end, and then copy it into the output (see L{SpoolCodeSink}).
+        This keeps the memory used for the generated code independent
+        of the size of the module.
         """
         if hasattr(out, 'write'):
             out = FileCodeSink(out)
         if isinstance(out, CodeSink):
-            sink_manager = _MonolithicSinkManager(out)
+            if streaming:
+                sink_manager = _StreamingMonolithicSinkManager(out)
+            else:
+                sink_manager = _MonolithicSinkManager(out)
         elif isinstance(out, MultiSectionFactory):
-            sink_manager = _MultiSectionSinkManager(out)
+            out.assign_sections(self)
+            records = None
+            if jobs is not None and jobs > 1:
+                records = self._generate_sections_in_parallel(jobs, module_file_base_name)
+            if records is None:
+                sink_manager = _MultiSectionSinkManager(out)
+            else:
+                sink_manager = _ParallelMergeSinkManager(out, records)
         else:
             raise TypeError
         self.do_generate(sink_manager, module_file_base_name)
         sink_manager.close()
 
+    def _generate_sections_in_parallel(self, jobs, module_file_base_name):
+        """
+        (internal) Generates the items of the module sections in
+        worker processes.  Returns the records of the generated items,
+        indexed by generation order, or None if worker processes
+        cannot be used.
+        """
+        global _parallel_generation
+        sections = sorted([section for section in self.get_sections()
+                           if section not in [None, '__main__']])
+        context = _get_fork_context()
+        if context is None or not sections:
+            return None
+        jobs = min(jobs, len(sections))
+        ## each worker must start from the module as it is now, hence
+        ## one task per (freshly forked) process
+        _parallel_generation = (self, module_file_base_name)
+        pool = context.Pool(jobs, maxtasksperchild=1)
+        try:
+            results = pool.map(_generate_sections, [sections[num::jobs] for num in range(jobs)], 1)
+            pool.close()
+        except Exception:
+            ## a worker failed, e.g. with an error not ignored by the
+            ## error handler: generate serially, so that the error is
+            ## reported by this process, as without workers
+            pool.terminate()
+            return None
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            _parallel_generation = None
+        records = {}
+        for result in results:
+            records.update(result)
+        return records
+
     def get_python_to_c_type_converter_function_name(self, value_type):
         """
         Internal API, do not use.
@@ -1007,12 +1657,14 @@ class Module(ModuleBase):
 
 
 class SubModule(ModuleBase):
-    def __init__(self, name, parent, docstring=None, cpp_namespace=None):
+    def __init__(self, name, parent, docstring=None, cpp_namespace=None, fastcall=None):
         """
         :param parent: parent L{module<Module>} (i.e. the one that contains this submodule)
         :param name: name of the submodule
         :param docstring: docstring to use for this module
         :param cpp_namespace: C++ namespace component associated with this module
+        :param fastcall: if not None, overrides the parent module calling convention default
         """
-        super(SubModule, self).__init__(name, parent, docstring=docstring, cpp_namespace=cpp_namespace)
+        super(SubModule, self).__init__(name, parent, docstring=docstring, cpp_namespace=cpp_namespace,
+                                        fastcall=fastcall)
 
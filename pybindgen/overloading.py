@@ -47,6 +47,125 @@ def vector_counter(vec):
             raise StopIteration
         yield list(values)
 
+_NB_SLOT_CHECK = ("(Py_TYPE(%(obj)s)->tp_as_number != NULL"
+                  " && (%(slots)s))")
+
+def _number_check(obj, slots, exclude_float=False):
+    slots_check = _NB_SLOT_CHECK % dict(
+        obj=obj, slots=' || '.join(["Py_TYPE(%s)->tp_as_number->%s != NULL" % (obj, slot)
+                                    for slot in slots]))
+    if exclude_float:
+        slots_check = "(!PyFloat_Check(%s) && %s)" % (obj, slots_check)
+    return "PyLong_Check(%s) || %s" % (obj, slots_check)
+
+
+def get_parse_unit_check(template, values, obj):
+    """
+    Returns a cheap C boolean expression that is false when
+    PyArg_ParseTuple (Python 3) would certainly reject the object
+    'obj' for the format unit 'template', or None if the unit has no
+    such check (in which case the object has to be tried).
+
+    >>> get_parse_unit_check('s', ['&s'], 'obj')
+    'PyUnicode_Check(obj)'
+    >>> get_parse_unit_check('O!', ['&PyFoo_Type', '&foo'], 'obj')
+    'PyObject_TypeCheck(obj, &PyFoo_Type)'
+    >>> get_parse_unit_check('O&', ['conv', '&foo'], 'obj') is None
+    True
+    """
+    if template in ('b', 'h', 'i', 'l'):
+        ## the signed integer units explicitly reject floats
+        return _number_check(obj, ['nb_index', 'nb_int'], exclude_float=True)
+    elif template in ('B', 'H', 'I', 'L'):
+        return _number_check(obj, ['nb_index', 'nb_int'])
+    elif template in ('k', 'K'):
+        return "PyLong_Check(%s)" % obj
+    elif template == 'n':
+        return _number_check(obj, ['nb_index'])
+    elif template in ('d', 'f'):
+        return "PyFloat_Check(%s) || %s" % (obj, _number_check(obj, ['nb_float', 'nb_index']))
+    elif template == 's':
+        return "PyUnicode_Check(%s)" % obj
+    elif template == 'z':
+        return "%s == Py_None || PyUnicode_Check(%s)" % (obj, obj)
+    elif template == 'c':
+        return ("(PyBytes_Check(%s) && PyBytes_GET_SIZE(%s) == 1)"
+                " || (PyByteArray_Check(%s) && PyByteArray_GET_SIZE(%s) == 1)"
+                % (obj, obj, obj, obj))
+    elif template == 'O!':
+        return "PyObject_TypeCheck(%s, %s)" % (obj, values[0])
+    else:
+        return None
+
+
+def generate_overload_check(code_sink, check_name, parse_params):
+    """
+    Generates a function that tells if an overload could accept the
+    given Python arguments, checking the number of arguments, the
+    keyword names, and the argument types with
+    get_parse_unit_check(), without raising any exception.  The
+    function returns 0 only if PyArg_ParseTupleAndKeywords would
+    certainly fail for the parameters.
+
+    :param code_sink: a CodeSink instance that will receive the generated code
+    :param check_name: name of the function to generate
+    :param parse_params: the ParseTupleParameters of the overload
+    """
+    items = parse_params.get_items()
+    nrequired = len([item for item in items if not item[3]])
+    code_sink.writeln("static int")
+    code_sink.writeln("%s(PyObject *args, PyObject *kwargs)" % check_name)
+    code_sink.writeln("{")
+    code_sink.indent()
+    code_sink.writeln("#if PY_VERSION_HEX >= 0x03000000")
+    code_sink.writeln("Py_ssize_t nargs = PyTuple_GET_SIZE(args);")
+    code_sink.writeln("Py_ssize_t nkwargs = (kwargs == NULL ? 0 : PyDict_Size(kwargs));")
+    if not items:
+        code_sink.writeln("return (nargs == 0 && nkwargs == 0);")
+    else:
+        code_sink.writeln("Py_ssize_t nkwfound = 0;")
+        code_sink.writeln("PyObject *obj;")
+        code_sink.writeln()
+        code_sink.writeln("if (nargs + nkwargs < %i || nargs + nkwargs > %i) {" % (nrequired, len(items)))
+        code_sink.indent()
+        code_sink.writeln("return 0;")
+        code_sink.unindent()
+        code_sink.writeln("}")
+        for index, (template, values, name, optional) in enumerate(items):
+            code_sink.writeln("obj = (nargs > %i ? PyTuple_GET_ITEM(args, %i) : NULL);" % (index, index))
+            code_sink.writeln("if (obj == NULL && nkwargs > 0 && (obj = PyDict_GetItemString(kwargs, \"%s\")) != NULL) {"
+                              % name)
+            code_sink.indent()
+            code_sink.writeln("nkwfound++;")
+            code_sink.unindent()
+            code_sink.writeln("}")
+            check = get_parse_unit_check(template, values, "obj")
+            if optional:
+                if check is not None:
+                    code_sink.writeln("if (obj != NULL && !(%s)) {" % check)
+                    code_sink.indent()
+                    code_sink.writeln("return 0;")
+                    code_sink.unindent()
+                    code_sink.writeln("}")
+            else:
+                if check is None:
+                    code_sink.writeln("if (obj == NULL) {")
+                else:
+                    code_sink.writeln("if (obj == NULL || !(%s)) {" % check)
+                code_sink.indent()
+                code_sink.writeln("return 0;")
+                code_sink.unindent()
+                code_sink.writeln("}")
+        ## keywords not matched above are unknown or repeat a
+        ## positional argument, which PyArg_ParseTupleAndKeywords rejects
+        code_sink.writeln("return (nkwfound == nkwargs);")
+    code_sink.writeln("#else")
+    code_sink.writeln("return 1;")
+    code_sink.writeln("#endif")
+    code_sink.unindent()
+    code_sink.writeln("}")
+
+
 class OverloadedWrapper(object):
     """
     An object that aggregates a set of wrapper objects; it generates
@@ -54,6 +173,12 @@ class OverloadedWrapper(object):
     i.e. tries to parse parameters according to each individual
     Function parameter list, and uses the first wrapper that doesn't
     generate parameter parsing error.
+
+    Wrappers that certainly cannot accept the arguments, judging from
+    the number of arguments, the keyword names and cheap type checks
+    on the arguments, are not tried at all; they are only called to
+    collect their error messages when no wrapper accepts the
+    arguments.
     """
 
     RETURN_TYPE = NotImplemented
@@ -163,7 +288,9 @@ class OverloadedWrapper(object):
 
             ## Generate the individual "low level" wrappers that handle a single prototype
             self.wrapper_actual_name = self.all_wrappers[0].wrapper_base_name
+            dispatch = ('METH_VARARGS' in flags and 'METH_KEYWORDS' in flags)
             delegate_wrappers = []
+            delegate_checks = []
             for number, wrapper in enumerate(self.all_wrappers):
                 ## enforce uniform method flags
                 wrapper.force_parse = wrapper.PARSE_TUPLE_AND_KEYWORDS
@@ -192,6 +319,21 @@ class OverloadedWrapper(object):
 
                 delegate_wrappers.append(wrapper.wrapper_actual_name)
 
+                ## generate the function checking if the wrapper could
+                ## accept the arguments, when its parameters are known
+                check_name = None
+                if dispatch and not getattr(wrapper, 'NEEDS_OVERLOADING_INTERFACE', False):
+                    try:
+                        have_names = (not wrapper.parse_params.get_items()
+                                      or wrapper.parse_params.get_keywords() is not None)
+                    except ValueError:
+                        have_names = False
+                    if have_names:
+                        check_name = "%s__may_match" % wrapper.wrapper_actual_name.replace('::', '__')
+                        code_sink.writeln()
+                        generate_overload_check(code_sink, check_name, wrapper.parse_params)
+                delegate_checks.append(check_name)
+
             ## if all wrappers did not generate, then the overload
             ## aggregator wrapper should not be generated either..
             if not delegate_wrappers:
@@ -212,7 +354,8 @@ class OverloadedWrapper(object):
             code_sink.writeln(self.RETURN_TYPE + ' retval;')
             code_sink.writeln('PyObject *error_list;')
             code_sink.writeln('PyObject *exceptions[%i] = {0,};' % len(delegate_wrappers))
-            for number, delegate_wrapper in enumerate(delegate_wrappers):
+
+            def write_delegate_call(number, delegate_wrapper):
                 ## call the delegate wrapper
                 args = ['self']
                 if 'METH_VARARGS' in flags:
@@ -222,15 +365,37 @@ class OverloadedWrapper(object):
                 args.append('&exceptions[%i]' % number)
                 code_sink.writeln("retval = %s(%s);" % (delegate_wrapper, ', '.join(args)))
                 ## if no parse exception, call was successful:
-                ## free previous exceptions and return the result
+                ## free other exceptions and return the result
                 code_sink.writeln("if (!exceptions[%i]) {" % number)
                 code_sink.indent()
-                for i in range(number):
-                    code_sink.writeln("Py_DECREF(exceptions[%i]);" % i)
+                for i in range(len(delegate_wrappers)):
+                    if i != number:
+                        code_sink.writeln("Py_XDECREF(exceptions[%i]);" % i)
                 code_sink.writeln("return retval;")
                 code_sink.unindent()
                 code_sink.writeln("}")
 
+            for number, delegate_wrapper in enumerate(delegate_wrappers):
+                check_name = delegate_checks[number]
+                if check_name is None:
+                    write_delegate_call(number, delegate_wrapper)
+                else:
+                    code_sink.writeln("if (%s(args, kwargs)) {" % check_name)
+                    code_sink.indent()
+                    write_delegate_call(number, delegate_wrapper)
+                    code_sink.unindent()
+                    code_sink.writeln("}")
+
+            ## Nothing matched; call the wrappers skipped above, so
+            ## that their error messages are collected
+            for number, delegate_wrapper in enumerate(delegate_wrappers):
+                if delegate_checks[number] is not None:
+                    code_sink.writeln("if (!exceptions[%i]) {" % number)
+                    code_sink.indent()
+                    write_delegate_call(number, delegate_wrapper)
+                    code_sink.unindent()
+                    code_sink.writeln("}")
+
             ## If the following generated code is reached it means
             ## that all of our delegate wrappers had parsing errors:
             ## raise an appropriate exception, free the previous
@@ -293,18 +458,15 @@ class OverloadedWrapper(object):
                  (docstring is None and "NULL" or ('"'+docstring+'"')))
 
     def generate_declaration(self, code_sink):
-        self.reset_code_generation_state()
-        self._compute_all_wrappers()
+        ## the wrapper bodies are generated only once, so this is
+        ## cheap after generate()
         self.generate(NullCodeSink())
         assert isinstance(self.wrapper_return, string_types)
         assert isinstance(self.wrapper_actual_name, string_types)
         assert isinstance(self.wrapper_args, list)
         code_sink.writeln("%s %s(%s);" % (self.wrapper_return, self.wrapper_actual_name, ', '.join(self.wrapper_args)))
-        self.reset_code_generation_state()
 
     def generate_class_declaration(self, code_sink):
-        self.reset_code_generation_state()
-        self._compute_all_wrappers()
         self.generate(NullCodeSink())
         assert isinstance(self.wrapper_return, string_types)
         assert isinstance(self.wrapper_actual_name, string_types)
@@ -317,8 +479,6 @@ class OverloadedWrapper(object):
                 name = wrapper.wrapper_actual_name.split('::')[-1]
                 code_sink.writeln("static %s %s(%s);" % (wrapper.wrapper_return, name, ', '.join(wrapper.wrapper_args)))
 
-        self.reset_code_generation_state()
-
     def reset_code_generation_state(self):
         self._compute_all_wrappers()
         for wrapper in self.all_wrappers:
@@ -558,3 +558,131 @@ static PyObject*
 
         code_sink.writeln(self.TEMPLATE % slots)
 
+
+
+class PyTypeFreelist(object):
+    """
+    Generates a bounded freelist of instance structures for a wrapper
+    type: deallocated instances of the exact type are kept, up to a
+    maximum number, and reused by the next allocations instead of
+    going through the python memory allocator.  The type tp_alloc and
+    tp_free slots are set to freelist aware functions, and an
+    allocation function for the generated code is provided (see
+    get_new_expression).  Freelist hits and misses are counted, and
+    can be read from python with the module function
+    _<pystruct>_freelist_info().
+    """
+
+    def __init__(self, pystruct, pytypestruct, size, is_gc=False):
+        """
+        :param pystruct: name of the instance structure
+        :param pytypestruct: name of the type structure
+        :param size: maximum number of instances kept in the freelist
+        :param is_gc: True if the type supports garbage collection
+        """
+        assert size > 0
+        self.pystruct = pystruct
+        self.pytypestruct = pytypestruct
+        self.size = size
+        self.is_gc = is_gc
+        self.new_function_name = "_wrap_%s__freelist_new" % (pystruct,)
+
+    def get_new_expression(self, type_expression):
+        """
+        Returns a C expression that allocates a new instance, like
+        PyObject_New (or PyObject_GC_New), given a type object pointer.
+        """
+        return "(%s *) %s(%s)" % (self.pystruct, self.new_function_name, type_expression)
+
+    def generate_forward_declarations(self, code_sink):
+        code_sink.writeln("PyObject *%s(PyTypeObject *type);" % (self.new_function_name,))
+        code_sink.writeln("extern PyMethodDef %s__freelist_info_def;" % (self.pystruct,))
+
+    def generate(self, code_sink, module, pytype):
+        """
+        Generates the freelist and its functions, and registers them in
+        the given PyTypeObject and module.
+        """
+        subst_vars = {
+            'PYSTRUCT': self.pystruct,
+            'PYTYPESTRUCT': self.pytypestruct,
+            'SIZE': self.size,
+            'NEW_FUNC': self.new_function_name,
+            'NEW': (self.is_gc and 'PyObject_GC_New' or 'PyObject_New'),
+            'TRACK': (self.is_gc and '\n        PyObject_GC_Track(self);' or ''),
+            'UNTRACK': (self.is_gc and '\n        PyObject_GC_UnTrack(self);' or ''),
+            }
+        code_sink.writeln(r'''
+static PyObject *%(PYSTRUCT)s__freelist[%(SIZE)i];
+static int %(PYSTRUCT)s__freelist_count = 0;
+static unsigned long %(PYSTRUCT)s__freelist_hits = 0;
+static unsigned long %(PYSTRUCT)s__freelist_misses = 0;
+
+static PyObject *
+_wrap_%(PYSTRUCT)s__freelist_pop(PyTypeObject *type)
+{
+    if (type != &%(PYTYPESTRUCT)s) {
+        return NULL;
+    }
+    if (%(PYSTRUCT)s__freelist_count == 0) {
+        %(PYSTRUCT)s__freelist_misses++;
+        return NULL;
+    }
+    %(PYSTRUCT)s__freelist_hits++;
+    return %(PYSTRUCT)s__freelist[--%(PYSTRUCT)s__freelist_count];
+}
+
+PyObject *
+%(NEW_FUNC)s(PyTypeObject *type)
+{
+    PyObject *self = _wrap_%(PYSTRUCT)s__freelist_pop(type);
+    if (self != NULL) {
+        return PyObject_Init(self, type);
+    }
+    return (PyObject *) %(NEW)s(%(PYSTRUCT)s, type);
+}
+
+static PyObject *
+_wrap_%(PYSTRUCT)s__tp_alloc(PyTypeObject *type, Py_ssize_t nitems)
+{
+    PyObject *self = _wrap_%(PYSTRUCT)s__freelist_pop(type);
+    if (self != NULL) {
+        memset((void *) self, 0, sizeof(%(PYSTRUCT)s));
+        PyObject_Init(self, type);%(TRACK)s
+        return self;
+    }
+    return PyType_GenericAlloc(type, nitems);
+}
+
+static void
+_wrap_%(PYSTRUCT)s__tp_free(void *self)
+{
+    if (Py_TYPE((PyObject *) self) == &%(PYTYPESTRUCT)s && %(PYSTRUCT)s__freelist_count < %(SIZE)i) {%(UNTRACK)s
+        %(PYSTRUCT)s__freelist[%(PYSTRUCT)s__freelist_count++] = (PyObject *) self;
+        return;
+    }
+    /* subclasses inherit tp_free */
+    if (PyType_IS_GC(Py_TYPE((PyObject *) self))) {
+        PyObject_GC_Del(self);
+    } else {
+        PyObject_Del(self);
+    }
+}
+
+static PyObject *
+_wrap_%(PYSTRUCT)s__freelist_info(PyObject *PYBINDGEN_UNUSED(dummy), PyObject *PYBINDGEN_UNUSED(args))
+{
+    return Py_BuildValue((char *) "{s:i,s:i,s:k,s:k}",
+                         "size", %(PYSTRUCT)s__freelist_count,
+                         "capacity", %(SIZE)i,
+                         "hits", %(PYSTRUCT)s__freelist_hits,
+                         "misses", %(PYSTRUCT)s__freelist_misses);
+}
+
+PyMethodDef %(PYSTRUCT)s__freelist_info_def = {(char *) "_%(PYSTRUCT)s_freelist_info", (PyCFunction) _wrap_%(PYSTRUCT)s__freelist_info, METH_NOARGS, NULL};
+''' % subst_vars)
+        pytype.slots.setdefault("tp_alloc", "_wrap_%s__tp_alloc" % (self.pystruct,))
+        pytype.slots.setdefault("tp_free", "_wrap_%s__tp_free" % (self.pystruct,))
+        module.after_init.write_code(
+            'PyModule_AddObject(m, (char *) "_%s_freelist_info", PyCFunction_New(&%s__freelist_info_def, NULL));'
+            % (self.pystruct, self.pystruct))
@@ -1,6 +1,6 @@
 # pylint: disable-msg=W0105
 
-from pybindgen.wrapper_registry import NullWrapperRegistry, StdMapWrapperRegistry
+from pybindgen.wrapper_registry import NullWrapperRegistry, StdMapWrapperRegistry, HashTableWrapperRegistry
 
 """
 
@@ -32,6 +32,37 @@ threads around the funcion call, i.e. allows other Python threads to
 run during the call.
 """
 
+fastcall = False
+"""
+Default calling convention of generated function, method and
+constructor wrappers, for modules that do not set their own
+(see :attr:`pybindgen.module.ModuleBase.fastcall`).  When True,
+wrappers are generated with METH_FASTCALL|METH_KEYWORDS (or METH_O
+and METH_NOARGS where possible) and convert their arguments inline
+instead of calling PyArg_ParseTupleAndKeywords; constructors are
+additionally exposed through the class vectorcall slot.  Note that
+METH_O wrappers (a single required parameter) only accept their
+argument positionally.  Requires Python 3.7 (3.9 for constructors) or
+later.
+"""
+
+goto_cleanup = False
+"""
+If True, the error checks of function, method and constructor
+wrappers jump with goto to a cleanup epilogue at the end of the
+wrapper, which shares the cleanup code of error exits, instead of
+repeating all pending cleanup actions at every error check.  This
+makes the generated code considerably smaller for wrappers of
+functions with many parameters that need cleanup.
+"""
+
+optimize_wrapper_bodies = False
+"""
+If True, the bodies of function, method and constructor wrappers are
+optimized before being written: consecutive error checks that exit
+the same way are merged into one, and the declarations of unused
+variables are removed (see :mod:`pybindgen.typehandlers.codeir`).
+"""
 
 error_handler = None
 """
@@ -96,6 +127,11 @@ class ErrorHandler(object):
         pybindgen to ignore the error and move on to the next wrapper.
         Returning False will cause pybindgen to allow the exception to
         propagate, thus aborting the code generation procedure.
+
+        When generating with several jobs (see Module.generate), the
+        errors of the worker processes are handled in the parent
+        process: wrapper is then an object whose str and repr are
+        those of the wrapper, and traceback_ is None.
         """
         raise NotImplementedError
 
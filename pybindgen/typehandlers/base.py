@@ -7,9 +7,11 @@ and base interfaces for wrapper generators.
 """
 
 from pybindgen.typehandlers import codesink
+from pybindgen.typehandlers import codeir
 import warnings
 from pybindgen.typehandlers import ctypeparser
 import sys
+import collections
 
 PY3 = (sys.version_info[0] >= 3)
 if PY3:
@@ -147,17 +149,37 @@ class CodeBlock(object):
         '''
         assert isinstance(declarations, DeclarationsScope)
         assert predecessor is None or isinstance(predecessor, CodeBlock)
-        self.sink = codesink.MemoryCodeSink()
+        self.sink = self._new_sink()
         self.predecessor = predecessor
         self._cleanup_actions = {}
         self._last_cleanup_position = 0
         self.error_return = error_return
         self.declarations = declarations
+        self.epilogue = None
 
     def clear(self):
         self._cleanup_actions = {}
         self._last_cleanup_position = 0
-        self.sink = codesink.MemoryCodeSink()
+        self.sink = self._new_sink()
+        self.epilogue = None
+
+    def _new_sink(self):
+        """Returns a new code sink for the block; IR nodes are only kept
+        if the wrapper bodies are to be optimized"""
+        from pybindgen import settings
+        if settings.optimize_wrapper_bodies:
+            return codeir.BodyCodeSink()
+        return codesink.MemoryCodeSink()
+
+    def set_epilogue(self, epilogue):
+        """
+        Make error checks jump to the given CleanupEpilogue, with goto,
+        instead of writing all the cleanup code inline; the epilogue
+        must then be generated at the end of the function.  Passing
+        None restores the inline mode.
+        """
+        assert epilogue is None or isinstance(epilogue, CleanupEpilogue)
+        self.epilogue = epilogue
 
     def declare_variable(self, type_, name, initializer=None, array=None):
         """
@@ -220,6 +242,10 @@ class CodeBlock(object):
                            true; this extra cleanup code comes before
                            all other cleanup code previously registered.
         '''
+        if isinstance(self.sink, codeir.BodyCodeSink):
+            self.sink.write_node(codeir.ErrorCheck(self.sink.indent_level, failure_expression,
+                                                   failure_cleanup, self._get_error_exit_code()))
+            return
         self.sink.writeln("if (%s) {" % (failure_expression,))
         self.sink.indent()
         if failure_cleanup is not None:
@@ -233,11 +259,144 @@ class CodeBlock(object):
         for cleanup_action in self.get_cleanup_code():
             self.sink.writeln(cleanup_action)
 
+    def _get_error_exit_code(self):
+        """Returns the list of statements that clean up and return an error"""
+        if self.epilogue is not None:
+            return ["goto %s;" % self.epilogue.get_exit_label(self.get_cleanup_code(),
+                                                             self.error_return)]
+        return self.get_cleanup_code() + [self.error_return]
+
     def write_error_return(self):
         '''Add a chunk of code that cleans up and returns an error.
         '''
-        self.write_cleanup()
-        self.sink.writeln(self.error_return)
+        for code in self._get_error_exit_code():
+            self.sink.writeln(code)
+
+
+class CleanupEpilogue(object):
+    """
+    Shared error exit code of a function, for code blocks in goto
+    mode (see CodeBlock.set_epilogue).  Each error check jumps to a
+    label in the epilogue, where the cleanup actions are stacked so
+    that error exits ending with the same cleanup actions fall through
+    into the same code, instead of every error check repeating all of
+    them.
+
+    >>> epilogue = CleanupEpilogue()
+    >>> block = CodeBlock("return NULL;", DeclarationsScope())
+    >>> block.set_epilogue(epilogue)
+    >>> cleanup1 = block.add_cleanup_code("clean1();")
+    >>> block.write_error_check("error1()")
+    >>> cleanup2 = block.add_cleanup_code("clean2();")
+    >>> block.write_error_check("error2()")
+    >>> cleanup2.cancel()
+    >>> cleanup3 = block.add_cleanup_code("clean3();")
+    >>> block.write_error_check("error3()", "error_clean();")
+    >>> block.write_cleanup()
+    >>> block.write_code("return Py_None;")
+    >>> epilogue.generate(block.sink)
+    >>> print(block.sink.flush().rstrip())
+    if (error1()) {
+        goto pybindgen_error0;
+    }
+    if (error2()) {
+        goto pybindgen_error1;
+    }
+    if (error3()) {
+        error_clean();
+        goto pybindgen_error2;
+    }
+    clean3();
+    clean1();
+    return Py_None;
+    pybindgen_error1:
+    clean2();
+    goto pybindgen_error0;
+    pybindgen_error2:
+    clean3();
+    pybindgen_error0:
+    clean1();
+    return NULL;
+    """
+
+    def __init__(self, label_prefix='pybindgen_error'):
+        self.label_prefix = label_prefix
+        self._exits = [] # (error_return, cleanup actions tuple)
+        self._labels = {}
+
+    def _new_label(self):
+        return "%s%i" % (self.label_prefix, len(self._labels))
+
+    def get_exit_label(self, cleanup_code, error_return):
+        """
+        Get the label of the error exit that runs the given cleanup
+        actions, in order, followed by error_return.
+        """
+        exit_ = (error_return, tuple(cleanup_code))
+        try:
+            return self._labels[exit_]
+        except KeyError:
+            label = self._labels[exit_] = self._new_label()
+            self._exits.append(exit_)
+            return label
+
+    def has_exits(self):
+        return bool(self._exits)
+
+    def generate(self, code_sink, fall_through=False):
+        """
+        Writes the epilogue code, if any error exits were requested.
+
+        :param fall_through: if True, the code before the epilogue
+           does not end with a return statement, and a jump over the
+           epilogue is generated
+        """
+        if not self._exits:
+            return
+        ## node (error_return, actions) runs actions[0], then its
+        ## parent node (error_return, actions[1:])
+        children = {}
+        roots = []
+        for node in self._exits:
+            while node[1]:
+                parent = (node[0], node[1][1:])
+                siblings = children.setdefault(parent, [])
+                if node in siblings:
+                    break
+                siblings.append(node)
+                node = parent
+            else:
+                if node not in roots:
+                    roots.append(node)
+        ## all but the last child have to jump to their parent
+        for node, siblings in children.items():
+            if len(siblings) > 1 and node not in self._labels:
+                self._labels[node] = self._new_label()
+
+        done_label = self.label_prefix + '_done'
+        if fall_through:
+            code_sink.writeln("goto %s;" % done_label)
+        for root in roots:
+            self._generate_node(code_sink, root, children)
+        if fall_through:
+            code_sink.writeln("%s:" % done_label)
+            code_sink.writeln(";")
+
+    def _generate_node(self, code_sink, node, children):
+        siblings = children.get(node, [])
+        for child in siblings[:-1]:
+            self._generate_node(code_sink, child, children)
+            code_sink.writeln("goto %s;" % self._labels[node])
+        if siblings:
+            self._generate_node(code_sink, siblings[-1], children)
+        label = self._labels.get(node)
+        if label is not None:
+            code_sink.writeln("%s:" % label)
+        error_return, actions = node
+        if actions:
+            code_sink.writeln(actions[0])
+        else:
+            code_sink.writeln(error_return)
 
 
 
@@ -303,6 +462,16 @@ class ParseTupleParameters(object):
     def is_empty(self):
         return self.get_parameters() == ['""']
 
+    def get_items(self):
+        """
+        returns the list of (param_template, param_values, param_name,
+        optional) tuples, in parsing order.  Used by wrappers that
+        convert each parameter inline instead of calling
+        PyArg_ParseTuple.
+        """
+        self.get_parameters() # validates the optional parameters order
+        return list(self._parse_tuple_items)
+
     def get_parameters(self):
         """
         returns a list of parameters to pass into a
@@ -364,13 +533,13 @@ class BuildValueParameters(object):
         >>> bld.get_parameters()
         ['"si"', 'hello', 123]
         """
-        self._build_value_items = [] # (template, param_value, cleanup_handle)
+        self._build_value_items = [] # (template, param_value, cleanup_handle, direct_conversion)
 
     def clear(self):
         self._build_value_items = []
 
     def add_parameter(self, param_template, param_values,
-                      prepend=False, cancels_cleanup=None):
+                      prepend=False, cancels_cleanup=None, direct_conversion=None):
         """
         Adds a new parameter to the Py_BuildValue (or similar) statement.
 
@@ -383,8 +552,13 @@ class BuildValueParameters(object):
                            that is removed after the call.  Typically
                            this is used for 'N' parameters, which
                            already consume an object reference
+        :param direct_conversion: optional C expression that creates
+                           the python 3 object (a new reference)
+                           directly, for use instead of the
+                           template when the format unit has no
+                           direct Python/C API equivalent
         """
-        item = (param_template, param_values, cancels_cleanup)
+        item = (param_template, param_values, cancels_cleanup, direct_conversion)
         if prepend:
             self._build_value_items.insert(0, item)
         else:
@@ -403,7 +577,7 @@ class BuildValueParameters(object):
         if force_tuple_creation:
             template.append('(')
         params = [None]
-        for (param_template, param_values, dummy) in self._build_value_items:
+        for (param_template, param_values, dummy, dummy) in self._build_value_items:
             template.append(param_template)
             params.extend(param_values)
         if force_tuple_creation:
@@ -414,7 +588,84 @@ class BuildValueParameters(object):
 
     def get_cleanups(self):
         """Get a list of handles to cleanup actions"""
-        return [cleanup for (dummy, dummy, cleanup) in self._build_value_items]
+        return [cleanup for (dummy, dummy, cleanup, dummy) in self._build_value_items]
+
+    def get_items(self):
+        """Get a list of (template, values) tuples, one per parameter"""
+        return [(param_template, list(param_values))
+                for (param_template, param_values, dummy, dummy) in self._build_value_items]
+
+    def get_conversions(self):
+        """
+        Get a list of (expression, new_reference) tuples, one per
+        parameter, with C expressions that create each python 3
+        object directly (see get_build_value_unit_conversion).
+
+        >>> bld = BuildValueParameters()
+        >>> bld.add_parameter('d', ['x'])
+        >>> bld.add_parameter('s#', ['s.c_str()', 's.size()'],
+        ...                   direct_conversion='PyUnicode_FromStringAndSize(s.c_str(), s.size())')
+        >>> bld.get_conversions()
+        [('PyFloat_FromDouble((double) x)', True), ('PyUnicode_FromStringAndSize(s.c_str(), s.size())', True)]
+        """
+        conversions = []
+        for (param_template, param_values, dummy, direct_conversion) in self._build_value_items:
+            if direct_conversion is None:
+                conversions.append(get_build_value_unit_conversion(param_template, param_values))
+            else:
+                conversions.append((direct_conversion, True))
+        return conversions
+
+
+_build_value_unit_converters = {
+    'i': ('PyLong_FromLong', 'long'),
+    'b': ('PyLong_FromLong', 'long'),
+    'h': ('PyLong_FromLong', 'long'),
+    'l': ('PyLong_FromLong', 'long'),
+    'B': ('PyLong_FromUnsignedLong', 'unsigned long'),
+    'H': ('PyLong_FromUnsignedLong', 'unsigned long'),
+    'I': ('PyLong_FromUnsignedLong', 'unsigned long'),
+    'k': ('PyLong_FromUnsignedLong', 'unsigned long'),
+    'L': ('PyLong_FromLongLong', 'PY_LONG_LONG'),
+    'K': ('PyLong_FromUnsignedLongLong', 'unsigned PY_LONG_LONG'),
+    'n': ('PyLong_FromSsize_t', 'Py_ssize_t'),
+    'd': ('PyFloat_FromDouble', 'double'),
+    'f': ('PyFloat_FromDouble', 'double'),
+    }
+
+def get_build_value_unit_conversion(param_template, param_values):
+    """
+    Get a C expression that converts a single Py_BuildValue parameter
+    (as given to BuildValueParameters.add_parameter) into a python
+    object, without going through the Py_BuildValue format parser when
+    a direct Python/C API function exists for it.
+
+    Returns a (expression, new_reference) tuple; new_reference is
+    False only for 'O' parameters, which evaluate to a borrowed
+    reference.  The expression may evaluate to NULL, with a python
+    exception set.  Note that the integer conversions always create
+    python 3 int (i.e. long) objects.
+
+    >>> get_build_value_unit_conversion('i', ['x'])
+    ('PyLong_FromLong((long) x)', True)
+    >>> get_build_value_unit_conversion('N', ['py_Foo'])
+    ('(PyObject *) py_Foo', True)
+    >>> get_build_value_unit_conversion('O', ['obj'])
+    ('(PyObject *) obj', False)
+    >>> get_build_value_unit_conversion('s#', ['buf', 'len'])
+    ('Py_BuildValue((char *) "s#", buf, len)', True)
+    """
+    if param_template in ('N', 'O'):
+        assert len(param_values) == 1
+        return ('(PyObject *) %s' % (param_values[0],), param_template == 'N')
+    try:
+        function, ctype = _build_value_unit_converters[param_template]
+    except KeyError:
+        return ('Py_BuildValue(%s)' % ', '.join(['(char *) "%s"' % param_template]
+                                                + [str(value) for value in param_values]),
+                True)
+    assert len(param_values) == 1
+    return ('%s((%s) %s)' % (function, ctype, param_values[0]), True)
 
 
 class DeclarationsScope(object):
@@ -448,16 +699,22 @@ class DeclarationsScope(object):
                         versa.
         """
         self._declarations = codesink.MemoryCodeSink()
+        ## (type, name, initializer, array) of the variables declared in this scope
+        self._variables = []
         ## name -> number of variables with that name prefix
         if parent_scope is None:
             self.declared_variables = {}
+            self.variable_types = {}
         else:
             assert isinstance(parent_scope, DeclarationsScope)
             self.declared_variables = parent_scope.declared_variables
+            self.variable_types = parent_scope.variable_types
 
     def clear(self):
         self._declarations = codesink.MemoryCodeSink()
+        self._variables = []
         self.declared_variables.clear()
+        self.variable_types.clear()
 
     def declare_variable(self, type_, name, initializer=None, array=None):
         """Add code to declare a variable. Returns the actual variable
@@ -479,13 +736,29 @@ class DeclarationsScope(object):
             varname = name
         else:
             varname = "%s%i" % (name, num)
+        if array is None:
+            self.variable_types[varname] = type_
+        self._write_declaration(type_, varname, initializer, array)
+        self._variables.append((type_, varname, initializer, array))
+        return varname
+
+    def _write_declaration(self, type_, varname, initializer, array):
         decl = join_ctype_and_name(type_, varname)
         if array is not None:
             decl += array
         if initializer is not None:
             decl += ' = ' + initializer
         self._declarations.writeln(decl + ';')
-        return varname
+
+    def remove_variables(self, names):
+        """Remove the declarations of the given variables.  Their
+        names remain reserved."""
+        self._variables = [var for var in self._variables if var[1] not in names]
+        self._declarations = codesink.MemoryCodeSink()
+        for type_, varname, initializer, array in self._variables:
+            self._write_declaration(type_, varname, initializer, array)
+        for name in names:
+            self.variable_types.pop(name, None)
 
     def reserve_variable(self, name):
         """Reserve a variable name, to be used later.
@@ -505,10 +778,20 @@ class DeclarationsScope(object):
             varname = "%s%i" % (name, num)
         return varname
 
+    def get_variable_type(self, name):
+        """Returns the C type of a (non-array) variable declared in
+        this scope, or None if the variable is not known."""
+        return self.variable_types.get(name)
+
     def get_code_sink(self):
         """Returns the internal MemoryCodeSink that holds all declararions."""
         return self._declarations
 
+    def get_variables(self):
+        """Returns a list of (type, name, initializer, array) tuples
+        describing the variables declared in this scope, in declaration order."""
+        return list(self._variables)
+
 
 
 class ReverseWrapperBase(object):
@@ -686,6 +969,24 @@ class ReverseWrapperBase(object):
 
 
 
+class WrapperGenerationResult(collections.namedtuple('WrapperGenerationResult',
+                                                     ['body', 'flags', 'wrapper_actual_name',
+                                                      'wrapper_return', 'wrapper_args'])):
+    """
+    The (immutable) result of generating a forward wrapper, see
+    L{ForwardWrapperBase.get_generation_result}:
+
+     - body: tuple of code lines of the wrapper function body, or
+       None once the wrapper function has been written (see
+       L{ForwardWrapperBase.write_generation_result});
+     - flags: tuple of PyMethodDef flags of the wrapper;
+     - wrapper_actual_name, wrapper_return, wrapper_args: the wrapper
+       function prototype, or None if the wrapper function has not
+       been generated yet.
+    """
+    __slots__ = ()
+
+
 class ForwardWrapperBase(object):
     """Generic base for all forward wrapper generators.
 
@@ -706,7 +1007,10 @@ class ForwardWrapperBase(object):
          attribute;
 
      3. A PyArg_ParseTupleAndKeywords call; uses items from the
-         parse_params object;
+         parse_params object; wrappers generated with the
+         METH_FASTCALL calling convention (see the 'fastcall'
+         attribute) instead bind the arguments against a static
+         keyword table and convert each parse_params item inline;
 
      4. 'code before call' -- this is a code block dedicated to contain
          all code that is needed before calling the C function; code can be
@@ -778,12 +1082,18 @@ class ForwardWrapperBase(object):
         self.overload_index = None
         self.deprecated = False
 
+        ## True/False to force/forbid the METH_FASTCALL calling
+        ## convention for this wrapper, None to use the module default
+        self.fastcall = None
+
         # The following 3 variables describe the C wrapper function
         # prototype; do not confuse with the python function/method!
         self.wrapper_actual_name = None # name of the wrapper function/method
         self.wrapper_return = None # C type expression for the wrapper return
         self.wrapper_args = None # list of arguments to the wrapper function
 
+        self._generation_result = None
+        self._generation_key = None
         self._init_code_generation_state()
 
     def _init_code_generation_state(self):
@@ -807,9 +1117,123 @@ class ForwardWrapperBase(object):
         self.parse_params.clear()
         self.call_params = []
         self.meth_flags = []
+        self._generation_result = None
+        self._generation_key = None
 
         self._init_code_generation_state()
 
+    def _get_gen_call_params(self):
+        """Returns the parameters of generate_call() used to generate the wrapper body"""
+        return ()
+
+    def _get_generation_key(self):
+        """Returns the wrapper settings that the generated body depends on"""
+        return (self.force_parse, self.before_parse.error_return, self.before_call.error_return,
+                self.after_call.error_return, self.unblock_threads, self.deprecated, self.fastcall)
+
+    def get_generation_result(self):
+        """
+        Generates the wrapper body, and returns it as a
+        L{WrapperGenerationResult}.  The result, and the code
+        generation state left by generate_body(), are kept until
+        reset_code_generation_state() is called or one of the
+        settings the body depends on (e.g. force_parse) changes, so
+        the body is generated only once however many times the
+        wrapper code, declaration or flags are needed.
+        """
+        key = self._get_generation_key()
+        if self._generation_result is not None and self._generation_key != key:
+            self.reset_code_generation_state()
+        if self._generation_result is None:
+            tmp_sink = codesink.MemoryCodeSink()
+            try:
+                self.generate_body(tmp_sink, self._get_gen_call_params())
+            except:
+                self.reset_code_generation_state()
+                raise
+            self._generation_result = WrapperGenerationResult(
+                tuple([line.rstrip() for line in tmp_sink.lines]), tuple(sorted(set(self.meth_flags))),
+                None, None, None)
+            self._generation_key = key
+        return self._generation_result
+
+    def write_generation_result(self, code_sink, closing_code=None):
+        """
+        Writes the wrapper function, using the prototype given by the
+        wrapper_actual_name, wrapper_return and wrapper_args
+        attributes and the memoized body (see get_generation_result),
+        and records the prototype in the generation result.  Once
+        written, the body is not needed anymore, and is dropped from
+        the generation result, so that the memory it takes does not
+        add up over the whole module; if the wrapper function is
+        written again, the body is generated again.
+
+        :param closing_code: optional code to write after the body
+        """
+        result = self.get_generation_result()
+        null_sink = isinstance(code_sink, codesink.NullCodeSink)
+        if result.body is None and not null_sink:
+            self.reset_code_generation_state()
+            result = self.get_generation_result()
+        self.write_open_wrapper(code_sink)
+        if result.body:
+            code_sink.writeln('\n'.join(result.body))
+        if closing_code is not None:
+            code_sink.writeln(closing_code)
+        self.write_close_wrapper(code_sink)
+        self._generation_result = result._replace(body=(result.body if null_sink else None),
+                                                  wrapper_actual_name=self.wrapper_actual_name,
+                                                  wrapper_return=self.wrapper_return,
+                                                  wrapper_args=tuple(self.wrapper_args))
+
+    def get_declaration_prototype(self, extra_wrapper_params=()):
+        """
+        Returns the (wrapper_return, wrapper_actual_name,
+        wrapper_args) prototype of the wrapper function with its
+        default name, as recorded in the generation result when the
+        function was written, or, if it was not written with the
+        default name and the given extra parameters, as obtained by
+        generating the wrapper into a L{NullCodeSink}.
+        """
+        result = self._generation_result
+        extra_wrapper_params = tuple(extra_wrapper_params)
+        if (result is not None and result.wrapper_actual_name is not None
+            and self._generation_key == self._get_generation_key()
+            and result.wrapper_actual_name == getattr(self, 'wrapper_base_name', None)
+            and result.wrapper_args[len(result.wrapper_args) - len(extra_wrapper_params):] == extra_wrapper_params):
+            return result.wrapper_return, result.wrapper_actual_name, list(result.wrapper_args)
+        self.generate(codesink.NullCodeSink(), extra_wrapper_params=list(extra_wrapper_params))
+        return self.wrapper_return, self.wrapper_actual_name, self.wrapper_args
+
+    def _get_fastcall_module(self):
+        """
+        Returns the module whose 'fastcall' default applies to this
+        wrapper, or None if the wrapper never uses METH_FASTCALL.
+        Subclasses that support the calling convention override this.
+        """
+        return None
+
+    def _get_fastcall_name(self):
+        """Returns the function name used in argument binding error messages"""
+        return getattr(self, 'mangled_name', None) or self.wrapper_actual_name
+
+    def uses_fastcall(self):
+        """
+        Returns True if the wrapper is generated with the
+        METH_FASTCALL (or METH_O/METH_NOARGS) calling convention
+        instead of PyArg_ParseTupleAndKeywords.  Wrappers with a
+        forced parsing mode (e.g. overloaded delegates) always use
+        the tuple/dict calling convention.
+        """
+        if self.force_parse is not None:
+            return False
+        module = self._get_fastcall_module()
+        if module is None:
+            return False
+        if self.fastcall is not None:
+            return self.fastcall
+        return module.get_fastcall()
+
     def set_parse_error_return(self, parse_error_return):
         self.before_parse.error_return = parse_error_return
         self.before_call.error_return = parse_error_return
@@ -857,11 +1281,87 @@ class ForwardWrapperBase(object):
         code_sink.writeln('}')
 
 
+    def write_build_value(self):
+        """
+        Writes to the after_call block the code that sets py_retval
+        to the python object(s) given by build_params: Py_None if
+        there are none, else a single object or a tuple of objects.
+
+        With python 3, numbers and objects are converted with direct
+        Python/C API calls (and the tuple is filled with
+        PyTuple_SET_ITEM), only format units with no direct equivalent
+        going through Py_BuildValue; the python 2 code always uses
+        Py_BuildValue.  On error py_retval is NULL.
+        """
+        params = self.build_params.get_parameters()
+        if params == ['""']:
+            self.after_call.write_code('Py_INCREF(Py_None);')
+            self.after_call.write_code('py_retval = Py_None;')
+            return
+        assert params[0][0] == '"'
+        params[0] = "(char *) " + params[0]
+        conversions = self.build_params.get_conversions()
+        block = self.after_call
+        block.write_code('#if PY_VERSION_HEX >= 0x03000000')
+        if len(conversions) == 1:
+            expression, new_reference = conversions[0]
+            block.write_code('py_retval = %s;' % (expression,))
+            if not new_reference:
+                block.write_code('Py_XINCREF(py_retval);')
+        else:
+            block.write_code('{')
+            block.indent()
+            block.write_code('PyObject *py_items[%i];' % (len(conversions),))
+            for index, (expression, new_reference) in enumerate(conversions):
+                block.write_code('py_items[%i] = %s;' % (index, expression))
+                if not new_reference:
+                    block.write_code('Py_XINCREF(py_items[%i]);' % (index,))
+            block.write_code('if (%s || (py_retval = PyTuple_New(%i)) == NULL) {'
+                             % (' || '.join(['py_items[%i] == NULL' % index for index in range(len(conversions))]),
+                                len(conversions)))
+            block.indent()
+            for index in range(len(conversions)):
+                block.write_code('Py_XDECREF(py_items[%i]);' % (index,))
+            block.write_code('py_retval = NULL;')
+            block.unindent()
+            block.write_code('} else {')
+            block.indent()
+            for index in range(len(conversions)):
+                block.write_code('PyTuple_SET_ITEM(py_retval, %i, py_items[%i]);' % (index, index))
+            block.unindent()
+            block.write_code('}')
+            block.unindent()
+            block.write_code('}')
+        block.write_code('#else')
+        block.write_code('py_retval = Py_BuildValue(%s);' % (', '.join(params),))
+        block.write_code('#endif')
+
     def generate_body(self, code_sink, gen_call_params=()):
         """Generate the wrapper function body
         code_sink -- a CodeSink object that will receive the code
         """
 
+        from pybindgen import settings
+
+        fastcall = self.uses_fastcall()
+        if fastcall:
+            for name in ['arg', 'nargs', 'kwnames']:
+                self.declarations.reserve_variable(name)
+
+        if settings.goto_cleanup:
+            epilogue = CleanupEpilogue()
+            if (self.return_value is not None
+                and self.return_value.REQUIRES_ASSIGNMENT_CONSTRUCTOR):
+                ## retval is declared at the call, which jumps to the
+                ## end of the function are not allowed to cross
+                blocks = [self.after_call]
+            else:
+                blocks = [self.before_parse, self.before_call, self.after_call]
+            for block in blocks:
+                block.set_epilogue(epilogue)
+        else:
+            epilogue = None
+
         if self.unblock_threads:
             py_thread_state = self.declarations.declare_variable("PyThreadState*", "py_thread_state", "NULL")
             self.after_call.write_code(
@@ -899,7 +1399,9 @@ class ForwardWrapperBase(object):
         params_empty = (params == ['""'])
         params[0] = '(char *) ' + params[0]
         keywords = self.parse_params.get_keywords()
-        if not params_empty or self.force_parse != None:
+        if fastcall:
+            self._write_fastcall_parse()
+        elif not params_empty or self.force_parse != None:
             self.meth_flags.append("METH_VARARGS")
             if keywords is None \
                     and self.force_parse != self.PARSE_TUPLE_AND_KEYWORDS:
@@ -940,49 +1442,398 @@ class ForwardWrapperBase(object):
                         % (self.return_value.ctype,))
 
             self._before_return_hook()
-
-            params = self.build_params.get_parameters()
-            if params:
-                if params == ['""']:
-                    self.after_call.write_code('Py_INCREF(Py_None);')
-                    self.after_call.write_code('py_retval = Py_None;')
-                else:
-                    assert params[0][0] == '"'
-                    params[0] = "(char *) " + params[0]
-                    self.after_call.write_code('py_retval = Py_BuildValue(%s);' %
-                                               (', '.join(params),))
+            self.write_build_value()
 
             ## cleanup and return
             self.after_call.write_cleanup()
             self.after_call.write_code('return py_retval;')
 
+        if settings.optimize_wrapper_bodies:
+            self._write_optimized_body(code_sink, epilogue)
+            return
+
         ## now write out the wrapper function body itself
         self.declarations.get_code_sink().flush_to(code_sink)
         code_sink.writeln()
         self.before_parse.sink.flush_to(code_sink)
         self.before_call.sink.flush_to(code_sink)
         self.after_call.sink.flush_to(code_sink)
+        if epilogue is not None:
+            epilogue.generate(code_sink, fall_through=(self.return_value is None and not self.HAVE_RETURN_VALUE))
+
+    def _write_optimized_body(self, code_sink, epilogue):
+        """
+        Writes the wrapper function body, like the end of
+        generate_body(), after running the codeir optimization passes
+        over it and removing the declarations of unused variables.
+        """
+        nodes = []
+        for block in [self.before_parse, self.before_call, self.after_call]:
+            if isinstance(block.sink, codeir.BodyCodeSink):
+                nodes.extend(block.sink.take_nodes())
+            else:
+                nodes.extend([codeir.Code(0, line) for line in block.sink.lines])
+                block.sink.lines = []
+        body = codeir.render_lines(codeir.optimize(nodes))
+        if epilogue is not None:
+            epilogue_sink = codesink.MemoryCodeSink()
+            epilogue.generate(epilogue_sink,
+                              fall_through=(self.return_value is None and not self.HAVE_RETURN_VALUE))
+            body.extend(epilogue_sink.lines)
+        self.declarations.remove_variables(
+            codeir.find_unused_variables(self.declarations.get_variables(), body))
+        self.declarations.get_code_sink().flush_to(code_sink)
+        code_sink.writeln()
+        for line in body:
+            code_sink.writeln(line.rstrip())
+
+    ## PyArg_ParseTuple format units that METH_FASTCALL wrappers
+    ## convert inline for exact/common object types; unit -> (C type
+    ## of the temporary, conversion function, min value, max value)
+    _FASTCALL_INTEGER_UNITS = {
+        'b': ('long', 'PyLong_AsLong', '0', 'UCHAR_MAX'),
+        'h': ('long', 'PyLong_AsLong', 'SHRT_MIN', 'SHRT_MAX'),
+        'i': ('long', 'PyLong_AsLong', 'INT_MIN', 'INT_MAX'),
+        'l': ('long', 'PyLong_AsLong', None, None),
+        'L': ('PY_LONG_LONG', 'PyLong_AsLongLong', None, None),
+        'n': ('Py_ssize_t', 'PyLong_AsSsize_t', None, None),
+        }
+    _FASTCALL_MASK_UNITS = {
+        'B': 'PyLong_AsUnsignedLongMask',
+        'H': 'PyLong_AsUnsignedLongMask',
+        'I': 'PyLong_AsUnsignedLongMask',
+        'k': 'PyLong_AsUnsignedLongMask',
+        'K': 'PyLong_AsUnsignedLongLongMask',
+        }
+
+    def _write_fastcall_parse(self):
+        """
+        Generates the argument binding code for a wrapper that uses
+        the METH_FASTCALL calling convention, and sets the
+        corresponding method flags.  Each parse_params item is
+        converted inline from its own argument object.
+        """
+        items = self.parse_params.get_items()
+        if self.force_parse is None:
+            if not items:
+                self.meth_flags.append("METH_NOARGS")
+                return
+            if len(items) == 1 and not items[0][3]:
+                self.meth_flags.append("METH_O")
+                param_template, param_values, dummy, dummy = items[0]
+                self._write_fastcall_conversion('arg', param_template, param_values, False)
+                return
+
+        self.meth_flags.append("METH_FASTCALL")
+        self.meth_flags.append("METH_KEYWORDS")
+        nrequired = len([item for item in items if not item[3]])
+        keywords = self.parse_params.get_keywords()
+        if keywords:
+            keywords_var = self.declarations.declare_variable(
+                'static const char * const', 'keywords',
+                '{' + ', '.join(['"%s"' % kw for kw in keywords] + ['NULL']) + '}',
+                '[]')
+            interned_var = self.declarations.declare_variable(
+                'static PyObject *', 'keywords_interned', None, '[%i]' % len(keywords))
+        else:
+            keywords_var = interned_var = 'NULL'
+        if items:
+            py_args = self.declarations.declare_variable(
+                'PyObject *', 'py_args', None, '[%i]' % len(items))
+        else:
+            py_args = 'NULL'
+        self.before_parse.write_error_check(
+            '_pybindgen_fastcall_bind("%s", args, nargs, kwnames, %s, %s, %i, %i, %s) < 0'
+            % (self._get_fastcall_name(), keywords_var, interned_var,
+               len(items), nrequired, py_args))
+        for index, (param_template, param_values, dummy, optional) in enumerate(items):
+            self._write_fastcall_conversion('%s[%i]' % (py_args, index),
+                                            param_template, param_values, optional)
+
+    def _write_fastcall_conversion(self, obj, param_template, param_values, optional):
+        """
+        Generates code that converts a single argument object,
+        following a PyArg_ParseTuple format unit; common units get an
+        inline fast path, and anything else (including conversion
+        errors, to keep error messages identical) goes through
+        PyArg_Parse on that single object.
+        """
+        def lvalue(value):
+            if value.startswith('&'):
+                return value[1:]
+            return '*(%s)' % value
+
+        block = self.before_parse
+        check = None
+        assignment = None
+        clear_error = False
+        if param_template in self._FASTCALL_INTEGER_UNITS and len(param_values) == 1:
+            ctype, converter, min_value, max_value = self._FASTCALL_INTEGER_UNITS[param_template]
+            tmp = self.declarations.declare_variable(ctype, 'tmp_' + ctype.replace(' ', '_').lower())
+            check = ("PyLong_Check(%s) && ((%s = %s(%s)) != -1 || !PyErr_Occurred())"
+                     % (obj, tmp, converter, obj))
+            if min_value is not None:
+                check += " && %s >= %s && %s <= %s" % (tmp, min_value, tmp, max_value)
+            assignment = "%s = %s;" % (lvalue(param_values[0]), tmp)
+            clear_error = True
+        elif param_template in self._FASTCALL_MASK_UNITS and len(param_values) == 1:
+            check = "PyLong_Check(%s)" % obj
+            assignment = "%s = %s(%s);" % (lvalue(param_values[0]),
+                                           self._FASTCALL_MASK_UNITS[param_template], obj)
+        elif param_template == 'd' and len(param_values) == 1:
+            check = "PyFloat_CheckExact(%s)" % obj
+            assignment = "%s = PyFloat_AS_DOUBLE(%s);" % (lvalue(param_values[0]), obj)
+        elif param_template == 'f' and len(param_values) == 1:
+            check = "PyFloat_CheckExact(%s)" % obj
+            assignment = "%s = (float) PyFloat_AS_DOUBLE(%s);" % (lvalue(param_values[0]), obj)
+        elif param_template in ('O', 'O!') and param_values[-1].startswith('&'):
+            ctype = self.declarations.get_variable_type(param_values[-1][1:])
+            if ctype is not None:
+                if param_template == 'O':
+                    check = "1"
+                else:
+                    check = "PyObject_TypeCheck(%s, %s)" % (obj, param_values[0])
+                assignment = "%s = (%s) %s;" % (param_values[-1][1:], ctype, obj)
+
+        if optional:
+            block.write_code("if (%s) {" % obj)
+            block.indent()
+        parse = '!PyArg_Parse(%s)' % ', '.join([obj, '(char *) "%s"' % param_template]
+                                                + list(param_values))
+        if check is None:
+            block.write_error_check(parse)
+        elif check == "1":
+            block.write_code(assignment)
+        else:
+            block.write_code("if (%s) {" % check)
+            block.indent()
+            block.write_code(assignment)
+            block.unindent()
+            block.write_code("} else {")
+            block.indent()
+            if clear_error:
+                block.write_code("PyErr_Clear();")
+            block.write_error_check(parse)
+            block.unindent()
+            block.write_code("}")
+        if optional:
+            block.unindent()
+            block.write_code("}")
 
     def get_py_method_def_flags(self):
         """
         Get a list of PyMethodDef flags that should be used for this wrapper.
         """
-        flags = set(self.meth_flags)
-        if flags:
-            return list(flags)
+        if self.meth_flags and self._generation_result is None:
+            ## flags given explicitly, without generating a body
+            return list(set(self.meth_flags))
+        return list(self.get_generation_result().flags)
 
-        tmp_sink = codesink.NullCodeSink()
+    def generate_batch(self, code_sink, self_pystruct=None, self_pytypestruct=None, gen_call_params=()):
+        """
+        Generates a 'batch' wrapper function, named
+        self.wrapper_actual_name, that takes a sequence of argument
+        tuples and calls the wrapped C/C++ function once per item,
+        returning the list of results (or None, if the function
+        returns nothing).  All items are converted first, then the C
+        function is called for each item in a tight loop, with the GIL
+        released once for the whole loop if unblock_threads is set,
+        and finally the results are converted back to Python.
+
+        The items are first copied into a tuple, which keeps them
+        (and any memory the converted arguments point into) alive
+        while the GIL is released.
+
+        The parse, call and build phases generated by the parameter
+        and return value type handlers are reused unmodified, as
+        member functions of a per-item structure whose fields are the
+        variables the handlers declare.  Items of wrappers taking a
+        single argument are given directly instead of as 1-tuples.
+
+        :param self_pystruct: for instance methods, the Python
+           structure of the class; each item then starts with the
+           instance the method is called on
+        :param self_pytypestruct: the type object of self_pystruct
+        :param gen_call_params: parameters for generate_call()
+        """
+        if getattr(self, 'throw', None):
+            raise NotSupportedError("batch wrappers do not support functions that throw exceptions")
+        if getattr(self, 'custodians_and_wards', None):
+            raise NotSupportedError("batch wrappers do not support custodian/ward relationships")
+        if self.return_value is not None and (self.return_value.REQUIRES_ASSIGNMENT_CONSTRUCTOR
+                                              or self.return_value.NO_RETVAL_DECL):
+            raise NotSupportedError("batch wrappers do not support return values of type %s"
+                                    % (self.return_value.ctype,))
+
+        unblock_threads = self.unblock_threads
+        parse_error_return = self.before_parse.error_return
+        self.reset_code_generation_state()
+        self.unblock_threads = False
+        self.set_parse_error_return("return -1;")
         try:
-#             try:
-#                 self.generate_body(tmp_sink)
-#             except CodegenErrorBase:
-#                 return []
-#             else:
-#                 return list(set(self.meth_flags))
-            self.generate_body(tmp_sink)
-            return list(set(self.meth_flags))
+            if self_pystruct is not None:
+                self_var = self.declarations.declare_variable(self_pystruct + '*', 'self')
+                self.parse_params.add_parameter('O!', ['&' + self_pytypestruct, '&' + self_var], 'self',
+                                                prepend=True)
+
+            for param in self.parameters:
+                param.convert_python_to_c(self)
+            parse_sink = self.before_call.sink
+            self.before_call.sink = codesink.MemoryCodeSink()
+            self.generate_call(*gen_call_params)
+            call_sink = self.before_call.sink
+            self.before_call.sink = codesink.MemoryCodeSink()
+            self.before_call.write_cleanup()
+            cleanup_sink = self.before_call.sink
+
+            params = self.parse_params.get_parameters()
+            params[0] = '(char *) ' + params[0]
+            self.before_parse.write_error_check('!PyArg_ParseTuple(%s)' % (', '.join(['args'] + params),))
+            items = self.parse_params.get_items()
+            single_arg = (len(items) == 1 and not items[0][3])
+
+            if self.return_value is not None:
+                self.return_value.convert_c_to_python(self)
+            has_results = (self.build_params.get_parameters() != ['""'])
+            if has_results:
+                self.write_build_value()
+            self.after_call.write_cleanup()
+            self.after_call.write_code('return py_retval;')
+
+            item_struct = self.wrapper_actual_name + '_item'
+            code_sink.writeln('struct %s {' % item_struct)
+            code_sink.indent()
+            initializers = []
+            for type_, name, initializer, array in self.declarations.get_variables():
+                if array is not None:
+                    if initializer is not None:
+                        raise NotSupportedError("batch wrappers do not support initialized arrays")
+                    code_sink.writeln(join_ctype_and_name(type_, name) + array + ';')
+                else:
+                    code_sink.writeln(join_ctype_and_name(type_, name) + ';')
+                    if initializer is not None:
+                        initializers.append('%s = %s;' % (name, initializer))
+            for title, prototype, sinks in [
+                    ('parse', 'int parse(PyObject *args)', [self.before_parse.sink, parse_sink]),
+                    ('call', 'void call()', [call_sink]),
+                    ('build', 'PyObject *build()', [self.after_call.sink]),
+                    ('cleanup', 'void cleanup()', [cleanup_sink])]:
+                if title == 'build' and not has_results:
+                    continue
+                code_sink.writeln()
+                code_sink.writeln(prototype)
+                code_sink.writeln('{')
+                code_sink.indent()
+                if title == 'parse':
+                    for line in initializers:
+                        code_sink.writeln(line)
+                for sink in sinks:
+                    sink.flush_to(code_sink)
+                if title == 'parse':
+                    code_sink.writeln('return 0;')
+                code_sink.unindent()
+                code_sink.writeln('}')
+            code_sink.unindent()
+            code_sink.writeln('};')
+            code_sink.writeln()
+
+            if single_arg:
+                parse_item = '''py_item = PyTuple_Pack(1, PyTuple_GET_ITEM(py_seq, i));
+    status = (py_item == NULL ? -1 : items[i].parse(py_item));
+    Py_XDECREF(py_item);'''
+            else:
+                parse_item = '''py_item = PyTuple_GET_ITEM(py_seq, i);
+    if (!PyTuple_Check(py_item)) {
+        PyErr_Format(PyExc_TypeError, "item %zd is not a tuple", i);
+        status = -1;
+    } else {
+        status = items[i].parse(py_item);
+    }'''
+            if unblock_threads:
+                call_items = '''Py_BEGIN_ALLOW_THREADS
+for (i = 0; i < n; i++) {
+    items[i].call();
+}
+Py_END_ALLOW_THREADS'''
+            else:
+                call_items = '''for (i = 0; i < n; i++) {
+    items[i].call();
+}'''
+            if has_results:
+                build_items = '''py_retval = PyList_New(n);
+if (py_retval == NULL) {
+    for (i = 0; i < n; i++) {
+        items[i].cleanup();
+    }
+    delete[] items;
+    Py_DECREF(py_seq);
+    return NULL;
+}
+for (i = 0; i < n; i++) {
+    py_result = items[i].build();
+    if (py_result == NULL) {
+        for (j = i + 1; j < n; j++) {
+            items[j].cleanup();
+        }
+        Py_DECREF(py_retval);
+        delete[] items;
+        Py_DECREF(py_seq);
+        return NULL;
+    }
+    PyList_SET_ITEM(py_retval, i, py_result);
+}'''
+            else:
+                build_items = '''for (i = 0; i < n; i++) {
+    items[i].cleanup();
+}
+Py_INCREF(Py_None);
+py_retval = Py_None;'''
+
+            self.wrapper_return = "PyObject *"
+            self.wrapper_args = ["PyObject * PYBINDGEN_UNUSED(dummy)", "PyObject *args", "PyObject *kwargs"]
+            self.write_open_wrapper(code_sink)
+            code_sink.writeln('''PyObject *py_items;
+PyObject *py_seq;
+PyObject *py_item;
+PyObject *py_result;
+PyObject *py_retval;
+Py_ssize_t n, i, j;
+int status;
+%(ITEM)s *items;
+const char *keywords[] = {"items", NULL};
+
+(void) py_result;
+if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &py_items)) {
+    return NULL;
+}
+py_seq = PySequence_Tuple(py_items);
+if (py_seq == NULL) {
+    return NULL;
+}
+n = PyTuple_GET_SIZE(py_seq);
+items = new %(ITEM)s[n];
+for (i = 0; i < n; i++) {
+    %(PARSE_ITEM)s
+    if (status < 0) {
+        for (j = 0; j < i; j++) {
+            items[j].cleanup();
+        }
+        delete[] items;
+        Py_DECREF(py_seq);
+        return NULL;
+    }
+}
+%(CALL_ITEMS)s
+%(BUILD_ITEMS)s
+delete[] items;
+Py_DECREF(py_seq);
+return py_retval;''' % dict(ITEM=item_struct, PARSE_ITEM=parse_item,
+                            CALL_ITEMS=call_items, BUILD_ITEMS=build_items))
+            self.write_close_wrapper(code_sink)
         finally:
+            self.unblock_threads = unblock_threads
             self.reset_code_generation_state()
+            self.set_parse_error_return(parse_error_return)
 
 
 class TypeTransformation(object):
@@ -1232,6 +2083,8 @@ class ParameterMeta(type):
                 sys.stderr.write("ERROR: missing CTYPES on class %s\n" % mcs)
         for ctype in mcs.CTYPES:
             param_type_matcher.register(ctype, mcs)
+        for ctype in getattr(mcs, 'BUFFER_CTYPES', ()):
+            buffer_param_type_matcher.register(ctype, mcs)
 
 
 class _Parameter(TypeHandler):
@@ -1346,10 +2199,185 @@ class PointerParameter(Parameter):
 PointerParameter.CTYPES = NotImplemented
 
 
+class BufferParameter(Parameter):
+    """
+    Base class for handlers of a pointer to an array of primitive
+    values, followed by the array length, as in::
+
+        void process(const double *data, size_t n);
+
+    The Python side passes a single object supporting the buffer
+    protocol; the C function receives a pointer to the buffer contents
+    (no copy is made) and the number of items in the buffer.  The
+    buffer must be C contiguous, and its format and item size must
+    match the pointed-to type.  For DIRECTION_OUT and DIRECTION_INOUT
+    the buffer must also be writable, and the C function writes
+    directly into it; nothing extra is returned to Python.
+
+    Buffer parameters are looked up by the pointer C type with
+    BufferParameter.new, since Parameter.new maps the same C types
+    to the single-value pointer handlers::
+
+        BufferParameter.new('const double *', 'data', length_ctype='size_t')
+
+    Subclasses list the C types they handle in BUFFER_CTYPES and the
+    acceptable struct module format characters in BUFFER_FORMATS.
+    """
+
+    DIRECTIONS = [Parameter.DIRECTION_IN, Parameter.DIRECTION_OUT,
+                  Parameter.DIRECTION_IN|Parameter.DIRECTION_OUT]
+    CTYPES = []
+    BUFFER_CTYPES = []
+    BUFFER_FORMATS = NotImplemented
+
+    #@classmethod
+    def new(cls, *args, **kwargs):
+        """
+        >>> import doubletype
+        >>> isinstance(BufferParameter.new('const double *', 'data'), doubletype.DoubleBufferParam)
+        True
+        """
+        if cls is BufferParameter:
+            type_handler_class, dummy_transformation, type_traits = \
+                buffer_param_type_matcher.lookup(args[0])
+            args = (type_traits,) + tuple(args[1:])
+            return type_handler_class(*args, **kwargs)
+        else:
+            return cls(*args, **kwargs)
+
+    new = classmethod(new)
+
+    def __init__(self, ctype, name, direction=Parameter.DIRECTION_IN, is_const=False,
+                 length_ctype='size_t'):
+        """
+        :param ctype: the pointer C type
+        :param name: parameter name
+        :param direction: direction of the parameter transfer
+        :param length_ctype: C type of the array length parameter that
+           follows the pointer in the C function signature, or None if
+           the C function takes no length parameter
+        """
+        super(BufferParameter, self).__init__(ctype, name, direction, is_const)
+        self.length_ctype = length_ctype
+
+    def convert_c_to_python(self, wrapper):
+        raise NotSupportedError("buffer parameters are not supported in reverse wrappers")
+
+    def convert_python_to_c(self, wrapper):
+        assert isinstance(wrapper, ForwardWrapperBase)
+        item_ctype = str(self.type_traits.target)
+        py_obj = wrapper.declarations.declare_variable('PyObject*', self.name)
+        view = wrapper.declarations.declare_variable('Py_buffer', self.name + '_view')
+        fmt = wrapper.declarations.declare_variable('const char*', self.name + '_format')
+        wrapper.parse_params.add_parameter('O', ['&' + py_obj], self.name)
+
+        flags = 'PyBUF_FORMAT|PyBUF_C_CONTIGUOUS'
+        if self.direction & self.DIRECTION_OUT:
+            flags += '|PyBUF_WRITABLE'
+        wrapper.before_call.write_error_check(
+            'PyObject_GetBuffer(%s, &%s, %s) < 0' % (py_obj, view, flags))
+        wrapper.before_call.add_cleanup_code('PyBuffer_Release(&%s);' % view)
+
+        ## a NULL format means unsigned bytes; a leading '@' or '='
+        ## selects native byte order, which is what the C code expects
+        wrapper.before_call.write_code('%s = (%s.format ? %s.format : "B");' % (fmt, view, view))
+        wrapper.before_call.write_code("if (%s[0] == '@' || %s[0] == '=') {" % (fmt, fmt))
+        wrapper.before_call.write_code('    %s++;' % fmt)
+        wrapper.before_call.write_code('}')
+        wrapper.before_call.write_error_check(
+            "%(fmt)s[0] == '\\0' || %(fmt)s[1] != '\\0' || strchr(\"%(formats)s\", %(fmt)s[0]) == NULL"
+            " || %(view)s.itemsize != (Py_ssize_t) sizeof(%(item_ctype)s)"
+            % dict(fmt=fmt, view=view, formats=self.BUFFER_FORMATS, item_ctype=item_ctype),
+            'PyErr_Format(PyExc_TypeError, "Parameter `%s\' must be a buffer of %s, not format \'%%s\' with item size %%d",'
+            ' %s.format ? %s.format : "B", (int) %s.itemsize);' % (self.name, item_ctype, view, view, view))
+
+        wrapper.call_params.append('(%s) %s.buf' % (self.ctype_no_const, view))
+        if self.length_ctype is not None:
+            wrapper.call_params.append('(%s) (%s.len / %s.itemsize)' % (self.length_ctype, view, view))
+
+
+class BufferReturnValue(ReturnValue):
+    """
+    Handler for a returned pointer to an array of primitive values,
+    exported to Python as a memoryview of the C/C++ memory (no copy is
+    made).  The view is read-only if the pointed-to type is const.  A
+    NULL pointer is returned as None.
+
+    Since the memory is normally owned by some object, the owner can be
+    kept alive for as long as the view (or any object created from the
+    view) exists, with the custodian option::
+
+        klass.add_method('get_frame', BufferReturnValue('const uint8_t *', 'self->obj->GetFrameSize()',
+                                                        custodian=0), [])
+    """
+
+    CTYPES = []
+
+    def __init__(self, ctype, length_expression, custodian=None, format=None):
+        """
+        :param ctype: the pointer C type
+        :param length_expression: C expression giving the number of items
+           in the array; it is evaluated after the call, and can refer to
+           the returned pointer as 'retval'
+        :param custodian: the object that owns the memory, whose
+           lifetime is bound to that of the returned view.  Possible
+           values are:
+               - None: no object owns the memory (e.g. static memory);
+               - 0: the instance of the method in which the return value
+                    is being used;
+               - integer > 0: parameter number, starting at 1, whose
+                    object will be used as owner (only parameters that are
+                    instances of wrapped C++ classes are supported).
+        :param format: struct module format character of the array items;
+           by default it is that of the buffer parameter handler of the
+           same pointer type (see :class:`BufferParameter`).
+        """
+        super(BufferReturnValue, self).__init__(ctype, is_const=False)
+        self.length_expression = length_expression
+        self.buffer_custodian = custodian
+        if format is None:
+            try:
+                handler_class = buffer_param_type_matcher.lookup(str(self.type_traits.ctype))[0]
+            except TypeLookupError:
+                raise TypeConfigurationError("cannot determine the buffer format of %r; use the format option"
+                                             % (str(self.type_traits.ctype),))
+            format = handler_class.BUFFER_FORMATS[0]
+        self.format = format
+
+    def get_c_error_return(self):
+        return "return NULL;"
+
+    def convert_python_to_c(self, wrapper):
+        raise NotSupportedError("buffer return values are not supported in reverse wrappers")
+
+    def convert_c_to_python(self, wrapper):
+        if self.buffer_custodian is None:
+            owner = 'NULL'
+        elif self.buffer_custodian == 0:
+            owner = '((PyObject *) self)'
+        else:
+            param = wrapper.parameters[self.buffer_custodian - 1]
+            if getattr(param, 'py_name', None) is None:
+                raise TypeConfigurationError("parameter %r cannot be used as buffer custodian" % (param.name,))
+            owner = '((PyObject *) %s)' % (param.py_name,)
+        py_view = wrapper.after_call.declare_variable('PyObject*', 'py_view')
+        wrapper.after_call.write_code(
+            '%s = _pybindgen_memoryview_from_memory(%s, (void *) %s, (Py_ssize_t) (%s), sizeof(%s), "%s", %i);'
+            % (py_view, owner, self.value, self.length_expression, self.type_traits.target,
+               self.format, int(bool(self.type_traits.target_is_const))))
+        wrapper.after_call.write_error_check('%s == NULL' % py_view)
+        wrapper.build_params.add_parameter("N", [py_view], prepend=True)
+
+
 class TypeMatcher(object):
     """
     Type matcher object: maps C type names to classes that handle
     those types.
+
+    The results of :meth:`lookup`, including failed lookups, are
+    cached by type name until a new type, transformation or type alias
+    is registered; the :attr:`cache_hits` and :attr:`cache_misses`
+    counters tell how effective the cache is.
     """
 
     def __init__(self):
@@ -1358,12 +2386,23 @@ class TypeMatcher(object):
         self._transformations = []
         self._type_aliases = {}
         self._type_aliases_rev = {}
+        self._lookup_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def clear_cache(self):
+        "Forget all cached lookup results"
+        self._lookup_cache.clear()
 
+    def get_cache_stats(self):
+        "Returns a (hits, misses, cached_names) tuple with lookup cache statistics"
+        return self.cache_hits, self.cache_misses, len(self._lookup_cache)
 
     def register_transformation(self, transformation):
         "Register a type transformation object"
         assert isinstance(transformation, TypeTransformation)
         self._transformations.append(transformation)
+        self._lookup_cache.clear()
 
     def register(self, name, type_handler):
         """Register a new handler class for a given C type
@@ -1376,9 +2415,10 @@ class TypeMatcher(object):
         if name in self._types:
             raise ValueError("return type %s already registered" % (name,))
         self._types[name] = type_handler
+        self._lookup_cache.clear()
 
     def _raw_lookup_with_alias_support(self, name):
-        already_tried = []
+        already_tried = set()
         return self._raw_lookup_with_alias_support_recursive(name, already_tried)
 
     def _raw_lookup_with_alias_support_recursive(self, name, already_tried):
@@ -1397,7 +2437,7 @@ class TypeMatcher(object):
             for alias in aliases_to_try:
                 if alias in already_tried:
                     continue
-                already_tried.append(name)
+                already_tried.add(name)
                 #if 'Time' in name or 'Time' in alias:
                 #    import sys
                 #    print >> sys.stderr, "**** trying name %r in place of %r" % (alias, name)
@@ -1411,9 +2451,29 @@ class TypeMatcher(object):
         :param name: C type name, possibly transformed (e.g. MySmartPointer<Foo> looks up Foo*)
         :returns: a handler with the given ctype name, or raises KeyError.
 
-        Supports type transformations.
+        Supports type transformations.  The returned type traits
+        belong to the caller, who may modify them.
 
         """
+        try:
+            cached = self._lookup_cache[name]
+        except KeyError:
+            self.cache_misses += 1
+            try:
+                cached = self._lookup(name)
+            except TypeLookupError as ex:
+                cached = ex.args[0]
+                self._lookup_cache[name] = cached
+                raise
+            self._lookup_cache[name] = cached
+        else:
+            self.cache_hits += 1
+            if isinstance(cached, list):
+                raise TypeLookupError(list(cached))
+        type_handler, transf, type_traits = cached
+        return type_handler, transf, type_traits.clone()
+
+    def _lookup(self, name):
         logger.debug("TypeMatcher.lookup(%r)", name)
         given_type_traits = ctypeparser.TypeTraits(name)
         noconst_name = str(given_type_traits.ctype_no_modifiers)
@@ -1458,9 +2518,11 @@ class TypeMatcher(object):
         to_type_name_normalized = str(ctypeparser.TypeTraits(to_type_name).ctype)
         self._type_aliases[to_type_name_normalized] = from_type_name_normalized
         self._type_aliases_rev[from_type_name_normalized] = to_type_name_normalized
+        self._lookup_cache.clear()
 
 return_type_matcher = TypeMatcher()
 param_type_matcher = TypeMatcher()
+buffer_param_type_matcher = TypeMatcher()
 
 def add_type_alias(from_type_name, to_type_name):
     return_type_matcher.add_type_alias(from_type_name, to_type_name)
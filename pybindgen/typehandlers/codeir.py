@@ -0,0 +1,266 @@
+"""
+A small intermediate representation (IR) for the bodies of wrapper
+functions.
+
+The code written into a L{CodeBlock} is kept as a list of nodes,
+instead of formatted text, until the code block is flushed.  This
+allows optimization passes to be run over the whole body of a
+wrapper before it is rendered to text (see L{optimize}):
+
+ - L{merge_error_checks}: merges consecutive error checks that exit
+   the same way (same cleanup code and error return) into one;
+
+ - L{find_unused_variables}: finds variables that are declared but
+   never used, so that their declaration can be dropped.
+
+Code written as plain text (CodeSink.writeln, CodeBlock.write_code) is
+the escape hatch: it is kept as an opaque L{Code} node, that the passes
+never look into.  Code blocks only keep nodes when
+settings.optimize_wrapper_bodies is enabled.
+"""
+
+import re
+
+from pybindgen.typehandlers import codesink
+
+
+class Node(object):
+    """Base class of IR nodes.  Each node remembers the indentation
+    level of the code sink at the time it was written."""
+    __slots__ = ['indent']
+
+    def __init__(self, indent):
+        self.indent = indent
+
+    def render(self, sink):
+        """Write the node code into a code sink"""
+        raise NotImplementedError
+
+
+class Code(Node):
+    """Opaque code, one or more lines of text"""
+    __slots__ = ['text']
+
+    def __init__(self, indent, text):
+        super(Code, self).__init__(indent)
+        self.text = text
+
+    def render(self, sink):
+        sink.writeln(self.text)
+
+
+class ErrorCheck(Node):
+    """
+    An error check: if any of the conditions is true, the optional
+    failure_cleanup code runs, followed by the exit code (the pending
+    cleanup actions and error return, or a goto to a cleanup
+    epilogue).
+    """
+    __slots__ = ['conditions', 'failure_cleanup', 'exit_code']
+
+    def __init__(self, indent, condition, failure_cleanup, exit_code):
+        super(ErrorCheck, self).__init__(indent)
+        self.conditions = [condition]
+        self.failure_cleanup = failure_cleanup
+        self.exit_code = tuple(exit_code)
+
+    def get_condition(self):
+        """Returns the C expression of the (merged) condition"""
+        if len(self.conditions) == 1:
+            return self.conditions[0]
+        return ' || '.join([_parenthesize(condition) for condition in self.conditions])
+
+    def render(self, sink):
+        sink.writeln("if (%s) {" % (self.get_condition(),))
+        sink.indent()
+        if self.failure_cleanup is not None:
+            sink.writeln(self.failure_cleanup)
+        for code in self.exit_code:
+            sink.writeln(code)
+        sink.unindent()
+        sink.writeln("}")
+
+
+def _parenthesize(expression):
+    """Add parentheses around an expression if it has top level
+    operators of lower precedence than ||"""
+    depth = 0
+    previous = ''
+    for pos, char in enumerate(expression):
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif depth == 0:
+            if char in '?,':
+                return '(%s)' % expression
+            if (char == '=' and previous not in '=!<>'
+                and expression[pos+1:pos+2] != '='):
+                return '(%s)' % expression
+        previous = char
+    return expression
+
+
+class BodyCodeSink(codesink.MemoryCodeSink):
+    """
+    A memory code sink that keeps IR nodes instead of lines of text.
+    It can be used as a MemoryCodeSink; the nodes are rendered to
+    text when the sink is flushed.
+
+    >>> sink = BodyCodeSink()
+    >>> sink.writeln("foo();")
+    >>> sink.write_node(ErrorCheck(sink.indent_level, "x == NULL", None, ["return NULL;"]))
+    >>> sink.write_node(ErrorCheck(sink.indent_level, "y = bar(x, 1)", None, ["return NULL;"]))
+    >>> sink.nodes = optimize(sink.nodes)
+    >>> print(sink.flush().rstrip())
+    foo();
+    if (x == NULL || (y = bar(x, 1))) {
+        return NULL;
+    }
+    """
+
+    def __init__(self):
+        "Constructor"
+        codesink.MemoryCodeSink.__init__(self)
+        self.nodes = []
+
+    def write_node(self, node):
+        """Append an IR node"""
+        assert isinstance(node, Node)
+        self.nodes.append(node)
+
+    def writeln(self, line=''):
+        """Write one or more lines of code"""
+        self.nodes.append(Code(self.indent_level, line))
+
+    def take_nodes(self):
+        """Remove and return all the IR nodes written so far"""
+        nodes = self.nodes
+        self.nodes = []
+        return nodes
+
+    def _get_lines(self):
+        return render_lines(self.nodes)
+    def _set_lines(self, lines):
+        self.nodes = [Code(0, line) for line in lines]
+    lines = property(_get_lines, _set_lines)
+
+    def get_position(self):
+        """Returns the current position in the code, for get_lines()"""
+        return len(self.nodes)
+
+    def get_lines(self, position=0):
+        """Returns the lines of code written since the given position"""
+        return render_lines(self.nodes[position:])
+
+    write_fragments = codesink.CodeSink.write_fragments
+
+    def flush_to(self, sink):
+        """Flushes code to another code sink
+        :param sink: another CodeSink instance
+        """
+        assert isinstance(sink, codesink.CodeSink)
+        sink.write_fragments([(0, None, line) for line in self.lines])
+        self.nodes = []
+
+    def flush(self):
+        "Flushes the code and returns the formatted output as a return value string"
+        l = []
+        for line in self.lines:
+            l.extend(self._format_code(line))
+        self.nodes = []
+        return "\n".join(l) + '\n'
+
+
+def render_lines(nodes):
+    """Render a list of nodes, returning a list of lines of text"""
+    sink = codesink.MemoryCodeSink()
+    for node in nodes:
+        sink.indent(node.indent)
+        node.render(sink)
+        sink.unindent()
+    return sink.lines
+
+
+def merge_error_checks(nodes):
+    """
+    Merges consecutive error checks that exit the same way, and have
+    no failure specific cleanup code, into one error check whose
+    condition is the || of the original conditions.
+    """
+    result = []
+    for node in nodes:
+        if (isinstance(node, ErrorCheck) and node.failure_cleanup is None
+            and result and isinstance(result[-1], ErrorCheck)
+            and result[-1].failure_cleanup is None
+            and result[-1].exit_code == node.exit_code
+            and result[-1].indent == node.indent):
+            result[-1].conditions.extend(node.conditions)
+            continue
+        result.append(node)
+    return result
+
+
+def optimize(nodes):
+    """Runs the optimization passes over a list of nodes, returning
+    the optimized list of nodes"""
+    return merge_error_checks(nodes)
+
+
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+
+## C types of variables whose declaration can be removed if unused
+_SCALAR_TYPES = frozenset(['bool', 'char', 'short', 'int', 'long', 'float', 'double',
+                           'signed', 'unsigned', 'const', 'size_t', 'Py_ssize_t',
+                           'PY_LONG_LONG', 'Py_UNICODE', 'Py_buffer'])
+
+def _is_removable(type_, initializer):
+    if initializer is not None and '(' in initializer:
+        return False # may have side effects
+    type_ = type_.strip()
+    if type_.endswith('*'):
+        return True
+    return all([word in _SCALAR_TYPES for word in type_.split()])
+
+
+def find_unused_variables(variables, code_lines):
+    """
+    Returns the set of names of the variables that can be removed,
+    because they are not used in the given code nor in the
+    initializers of other variables that are used.  Only variables of
+    pointer or plain C types, with no initializer or an initializer
+    without function calls, are considered for removal.
+
+    :param variables: list of (type, name, initializer, array) tuples,
+       as returned by DeclarationsScope.get_variables()
+    :param code_lines: lines of code of the function body
+
+    >>> sorted(find_unused_variables([('int', 'x', None, None), ('int', 'y', '1', None),
+    ...                               ('int *', 'z', '&y', None), ('PyObject*', 'w', 'f()', None)],
+    ...                              ["z = NULL;"]))
+    ['x']
+    """
+    used = set()
+    for line in code_lines:
+        used.update(_IDENTIFIER_RE.findall(line))
+    unused = set()
+    candidates = []
+    for type_, name, initializer, array in variables:
+        if name not in used and _is_removable(type_, initializer):
+            candidates.append((name, initializer))
+        elif initializer is not None:
+            used.update(_IDENTIFIER_RE.findall(initializer))
+    ## a variable only used by the initializer of a removed variable
+    ## becomes unused as well
+    changed = True
+    while changed:
+        changed = False
+        referenced = set(used)
+        for name, initializer in candidates:
+            if name not in unused and initializer is not None:
+                referenced.update(_IDENTIFIER_RE.findall(initializer))
+        for name, initializer in candidates:
+            if name not in unused and name not in referenced:
+                unused.add(name)
+                changed = True
+    return unused
@@ -3,6 +3,11 @@ Objects that receive generated C/C++ code lines, reindents them, and
 writes them to a file, memory, or another code sink object.
 """
 import sys
+import os
+import io
+import errno
+import hashlib
+import tempfile
 PY3 = (sys.version_info[0] >= 3)
 
 if PY3:
@@ -16,6 +21,45 @@ if DEBUG:
     import traceback
     import sys
 
+## Size of the chunks of text written to files at once
+WRITE_CHUNK_SIZE = 1 << 20
+
+
+## Memory code sinks keep the code as (outer_indent, inner_indent, text)
+## fragments, text being one or more lines written with writeln().
+## Each line of a fragment is rendered as ' '*outer_indent + line if
+## inner_indent is None, else, if the fragment was flushed from
+## another memory sink, as ' '*outer_indent + (' '*inner_indent +
+## line).rstrip().  Flushing a fragment into a sink at indentation
+## level N produces the fragment (N, outer_indent + inner_indent,
+## text), so nested sinks compose their indentation without touching
+## the text until it is finally rendered.
+
+def _flushed_fragments(fragments, indent_level):
+    """Returns the fragments that result from flushing the given
+    fragments into a sink at the given indentation level"""
+    return [(indent_level, outer + (inner or 0), text)
+            for outer, inner, text in fragments]
+
+def _render_fragments(fragments):
+    """Returns the lines of text of a list of fragments"""
+    lines = []
+    for outer, inner, text in fragments:
+        outer = ' '*outer
+        if inner is None:
+            for line in text.split('\n'):
+                lines.append(outer + line)
+        else:
+            inner = ' '*inner
+            for line in text.split('\n'):
+                line = line.rstrip()
+                if line:
+                    lines.append(outer + inner + line)
+                else:
+                    lines.append(outer)
+    return lines
+
+
 class CodeSink(object):
     """Abstract base class for code sinks"""
     def __init__(self):
@@ -59,6 +103,12 @@ class CodeSink(object):
         """Write one or more lines of code"""
         raise NotImplementedError
 
+    def write_fragments(self, fragments):
+        """Write the code fragments of a L{MemoryCodeSink} that is
+        being flushed into this sink"""
+        for line in _render_fragments(_flushed_fragments(fragments, 0)):
+            self.writeln(line)
+
     def indent(self, level=4):
         '''Add a certain ammount of indentation to all lines written
         from now on and until unindent() is called'''
@@ -94,8 +144,28 @@ class FileCodeSink(CodeSink):
 
     def writeln(self, line=''):
         """Write one or more lines of code"""
-        self.file.write('\n'.join(self._format_code(line)))
-        self.file.write('\n')
+        self.file.write('\n'.join(self._format_code(line)) + '\n')
+
+    def write_fragments(self, fragments):
+        """Write the code fragments of a L{MemoryCodeSink} that is
+        being flushed into this sink, in large chunks"""
+        self._write_lines(_render_fragments(_flushed_fragments(fragments, self.indent_level)))
+
+    def _write_lines(self, lines):
+        """(internal) Writes lines of text to the file in large chunks"""
+        chunk = []
+        chunk_size = 0
+        for line in lines:
+            chunk.append(line)
+            chunk_size += len(line) + 1
+            if chunk_size >= WRITE_CHUNK_SIZE:
+                chunk.append('')
+                self.file.write('\n'.join(chunk))
+                chunk = []
+                chunk_size = 0
+        if chunk:
+            chunk.append('')
+            self.file.write('\n'.join(chunk))
 
     def __lt__(self, other):
         if isinstance(other, FileCodeSink):
@@ -103,34 +173,215 @@ class FileCodeSink(CodeSink):
 
 class MemoryCodeSink(CodeSink):
     """A code sink that keeps the code in memory,
-    and can later flush the code to another code sink"""
+    and can later flush the code to another code sink.  The code is
+    only split into lines and indented when it is finally written out;
+    flushing into another memory code sink only records the extra
+    indentation."""
     def __init__(self):
         "Constructor"
         CodeSink.__init__(self)
-        self.lines = []
+        self.fragments = []
+
+    def _get_lines(self):
+        return _render_fragments(self.fragments)
+    def _set_lines(self, lines):
+        self.fragments = [(0, None, line) for line in lines]
+    lines = property(_get_lines, _set_lines, doc="list of the lines of code written so far")
+
+    def get_position(self):
+        """Returns the current position in the code, for get_lines()"""
+        return len(self.fragments)
+
+    def get_lines(self, position=0):
+        """Returns the lines of code written since the given position"""
+        return _render_fragments(self.fragments[position:])
 
     def writeln(self, line=''):
         """Write one or more lines of code"""
-        self.lines.extend(self._format_code(line))
+        assert isinstance(line, string_types)
+        self.fragments.append((self.indent_level, None, line))
+
+    def write_fragments(self, fragments):
+        """Write the code fragments of a L{MemoryCodeSink} that is
+        being flushed into this sink"""
+        self.fragments.extend(_flushed_fragments(fragments, self.indent_level))
 
     def flush_to(self, sink):
         """Flushes code to another code sink
         :param sink: another CodeSink instance
         """
         assert isinstance(sink, CodeSink)
-        for line in self.lines:
-            sink.writeln(line.rstrip())
-        self.lines = []
+        sink.write_fragments(self.fragments)
+        self.fragments = []
 
     def flush(self):
         "Flushes the code and returns the formatted output as a return value string"
         l = []
         for line in self.lines:
             l.extend(self._format_code(line))
-        self.lines = []
+        self.fragments = []
         return "\n".join(l) + '\n'
 
 
+class WriteIfChangedCodeSink(MemoryCodeSink):
+    """A code sink that writes to a file, but only when closed, and
+    only if the code differs from the current contents of the file.
+    Otherwise the file, and its modification time, are left alone,
+    so that build tools do not needlessly recompile it.  The file is
+    replaced atomically, by renaming a temporary file over it."""
+    def __init__(self, file_name):
+        """
+        :param file_name: name of the file to write
+        """
+        MemoryCodeSink.__init__(self)
+        self.file_name = file_name
+        self.changed = None # set by close()
+
+    def __repr__(self):
+        return "<pybindgen.typehandlers.codesink.WriteIfChangedCodeSink %r>" % (self.file_name,)
+
+    def close(self):
+        """Writes the file, if its contents changed.  Returns True if
+        the file was written, False if it was left unchanged."""
+        content = ''.join([line + '\n' for line in self.lines])
+        self.fragments = []
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+        try:
+            with open(self.file_name, 'rb') as old_file:
+                old_digest = hashlib.sha1(old_file.read()).digest()
+        except (IOError, OSError):
+            old_digest = None
+        self.changed = (hashlib.sha1(content).digest() != old_digest)
+        if self.changed:
+            temp_name = "%s.tmp%i" % (self.file_name, os.getpid())
+            with open(temp_name, 'wb') as temp_file:
+                temp_file.write(content)
+            if hasattr(os, 'replace'):
+                os.replace(temp_name, self.file_name)
+            else:
+                if old_digest is not None and sys.platform == 'win32':
+                    os.remove(self.file_name)
+                os.rename(temp_name, self.file_name)
+        return self.changed
+
+
+class SpoolCodeSink(FileCodeSink):
+    """A code sink that writes the code, already formatted as it would
+    be by flushing a L{MemoryCodeSink}, to an anonymous temporary
+    file, and can later copy it into another code sink.  Unlike a
+    memory code sink, the amount of memory it uses does not depend on
+    the amount of code written into it."""
+    def __init__(self, encoding=None):
+        """
+        :param encoding: text encoding of the temporary file; it
+           should be the same as the file the code will be copied to,
+           so that the code can be copied as bytes, without decoding it
+        """
+        FileCodeSink.__init__(self, tempfile.TemporaryFile('w+t', WRITE_CHUNK_SIZE,
+                                                           encoding=(encoding or 'utf-8')))
+
+    def __repr__(self):
+        return "<pybindgen.typehandlers.codesink.SpoolCodeSink>"
+
+    def writeln(self, line=''):
+        """Write one or more lines of code"""
+        self.file.write(''.join([l.rstrip() + '\n' for l in self._format_code(line)]))
+
+    def write_fragments(self, fragments):
+        """Write the code fragments of a L{MemoryCodeSink} that is
+        being flushed into this sink, in large chunks"""
+        ## the same lines, right stripped, that flushing the fragments
+        ## into a memory sink and then that into a file would give
+        self._write_lines(_render_fragments(
+            [(0, outer + inner, text)
+             for outer, inner, text in _flushed_fragments(fragments, self.indent_level)]))
+
+    def flush_to(self, sink):
+        """Copies the code to another code sink, and empties this one.
+        When the other sink is a L{FileCodeSink} writing to a real
+        file with the same encoding, the bytes are copied by the
+        operating system (copy_file_range or sendfile), without going
+        through Python.
+
+        :param sink: another CodeSink instance
+        """
+        assert isinstance(sink, CodeSink)
+        self.file.flush()
+        size = os.fstat(self.file.fileno()).st_size
+        if not (size and self._copy_file(sink, size)):
+            self.file.seek(0)
+            while True:
+                lines = self.file.readlines(WRITE_CHUNK_SIZE)
+                if not lines:
+                    break
+                sink.write_fragments([(0, None, ''.join(lines)[:-1])])
+        self.file.seek(0)
+        self.file.truncate()
+
+    def _copy_file(self, sink, size):
+        """(internal) Copies the contents of the temporary file to the
+        file of the given sink at the operating system level.  Returns
+        False if that is not possible."""
+        if not isinstance(sink, FileCodeSink) or sink.indent_level != 0:
+            return False
+        dst = sink.file
+        if getattr(dst, 'encoding', None) != self.file.encoding:
+            return False
+        try:
+            dst_fd = dst.fileno()
+        except (AttributeError, io.UnsupportedOperation, OSError):
+            return False
+        src_fd = self.file.fileno()
+        dst.flush()
+        offset = 0
+        for copy in (_copy_file_range, _sendfile, _read_write):
+            try:
+                while offset < size:
+                    copied = copy(src_fd, dst_fd, offset, size - offset)
+                    if not copied:
+                        break
+                    offset += copied
+            except OSError as ex:
+                if ex.errno not in _COPY_NOT_SUPPORTED_ERRORS:
+                    raise
+            if offset >= size:
+                break
+        ## let the file object know where the file descriptor is now
+        if dst.seekable():
+            dst.seek(os.lseek(dst_fd, 0, os.SEEK_CUR))
+        return True
+
+    def close(self):
+        """Removes the temporary file"""
+        self.file.close()
+
+
+## errors meaning that a way of copying files is not supported for a
+## particular pair of files
+_COPY_NOT_SUPPORTED_ERRORS = frozenset([getattr(errno, name) for name in
+                                        ('EXDEV', 'EINVAL', 'ENOSYS', 'EOPNOTSUPP', 'EBADF')
+                                        if hasattr(errno, name)])
+
+def _copy_file_range(src_fd, dst_fd, offset, count):
+    if not hasattr(os, 'copy_file_range'):
+        return 0
+    return os.copy_file_range(src_fd, dst_fd, count, offset)
+
+def _sendfile(src_fd, dst_fd, offset, count):
+    if not hasattr(os, 'sendfile'):
+        return 0
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+def _read_write(src_fd, dst_fd, offset, count):
+    os.lseek(src_fd, offset, os.SEEK_SET)
+    data = os.read(src_fd, min(count, WRITE_CHUNK_SIZE))
+    written = 0
+    while written < len(data):
+        written += os.write(dst_fd, data[written:])
+    return written
+
+
 class NullCodeSink(CodeSink):
     """A code sink that discards all content.  Useful to 'test' if code
     generation would work without actually generating anything."""
@@ -143,6 +394,11 @@ class NullCodeSink(CodeSink):
         """Write one or more lines of code"""
         pass
 
+    def write_fragments(self, fragments):
+        """Write the code fragments of a L{MemoryCodeSink} that is
+        being flushed into this sink"""
+        pass
+
     def flush_to(self, sink):
         """Flushes code to another code sink
         :param sink: another CodeSink instance
@@ -1,3 +1,6 @@
+import re
+from collections import deque
+
 from pybindgen.typehandlers.ctypeparser import tokenizer
 
 
@@ -30,65 +33,46 @@ class CType(object):
         Reoder const modifiers, as rightward as possible without
         changing the meaning of the type.  I.e., move modifiers to the
         right until a * or & is found."""
-        for modifier in MODIFIERS:
-            self._reorder_modifier(modifier)
-
-    def _reorder_modifier(self, modifier):
-        tokens_moved = []
-        while 1:
-            reordered = False
-            for token_i, token in enumerate(self.tokens):
-                if isinstance(token, CType):
+        ## Single pass: modifiers are held back until the next * or &
+        ## (or the end of the type), keeping their relative order,
+        ## with all 'const' modifiers placed before all 'volatile' ones.
+        tokens = []
+        pending = None
+        have_modifiers = False
+        for token in self.tokens:
+            if not isinstance(token, CType):
+                if token.name in MODIFIERS:
+                    if pending is None:
+                        pending = {}
+                    pending.setdefault(token.name, []).append(token)
+                    have_modifiers = True
                     continue
-                if token.name == modifier and token not in tokens_moved:
-                    ## Reorder the token.  Note: we are mutating the
-                    ## list we are iterating over, but it's ok because
-                    ## we'll break the for unconditionally next.
-
-                    self.tokens.pop(token_i)
-
-                    for new_pos in range(token_i, len(self.tokens)):
-                        other_token = self.tokens[new_pos]
-                        if isinstance(other_token, CType):
-                            continue
-                        if other_token.name in ['*', '&']:
-                            self.tokens.insert(new_pos, token)
-                            break
-                    else:
-                        self.tokens.append(token)
-                        new_pos = -1
-
-                    tokens_moved.append(token)
-                    reordered = True
-                    break
-            if not reordered:
-                break
+                if pending is not None and token.name in ('*', '&'):
+                    for modifier in MODIFIERS:
+                        tokens.extend(pending.get(modifier, ()))
+                    pending = None
+            tokens.append(token)
+        if not have_modifiers:
+            return
+        if pending is not None:
+            for modifier in MODIFIERS:
+                tokens.extend(pending.get(modifier, ()))
+        self.tokens[:] = tokens
 
     def remove_modifiers(self):
         """
         Remove modifiers from the toplevel type.  Return a set of modifiers removed.
         """
         retval = set()
-        for modifier in MODIFIERS:
-            if self._remove_modifier(modifier):
-                retval.add(modifier)
+        tokens = []
+        for token in self.tokens:
+            if not isinstance(token, CType) and token.name in MODIFIERS:
+                retval.add(token.name)
+            else:
+                tokens.append(token)
+        self.tokens[:] = tokens
         return retval
 
-    def _remove_modifier(self, modifier):
-        changed = True
-        removed = False
-        while changed:
-            changed = False
-            for token_i, token in enumerate(self.tokens):
-                if isinstance(token, CType):
-                    continue
-                if token.name == modifier:
-                    del self.tokens[token_i]
-                    changed = True
-                    removed = True
-                    break
-        return removed
-
     def remove_outer_modifier(self, modifier):
         """
         Remove the given modifier from the type, but only from the
@@ -126,16 +110,57 @@ class CType(object):
         return ''.join(l)
 
 
+_TYPE_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<name> (?:[A-Za-z_$]|::) (?:::|[A-Za-z0-9_$])* )
+      | (?P<constant> (?:0[xX][0-9a-fA-F]*|[0-9][0-9eE+\-.]*)
+                      (?:[uU][lL][lL]|[lL][lL]|[uU][lL]|[lL]|[fF]|[uU])? )
+      | (?P<syntax> ->|\+\+|--|<<|>>|&&|\|\||\*\*|[:+\-<>&|*=]=?
+                    |[()\[\]{}~!?^%;,]|\.(?![0-9])|/(?![/*]) )
+      | $
+    )""", re.VERBOSE)
+
+_TOKEN_TYPES = {
+    'name': tokenizer.NAME,
+    'constant': tokenizer.CONSTANT,
+    'syntax': tokenizer.SYNTAX,
+}
+
+
+def _tokenize_type(type_string):
+    """
+    Split a C type expression into a list of L{tokenizer.Token}s.
+
+    Type expressions only use a small subset of C++, which is handled
+    here with a single regular expression; anything else (comments,
+    string or character literals, ...) falls back to the generic
+    L{tokenizer.GetTokens}, which yields exactly the same tokens but
+    is much slower.
+    """
+    tokens = []
+    match = _TYPE_TOKEN_RE.match
+    pos = 0
+    while 1:
+        m = match(type_string, pos)
+        if m is None:
+            return list(tokenizer.GetTokens(type_string + '\n'))
+        kind = m.lastgroup
+        if kind is None:
+            return tokens
+        start, pos = m.span(kind)
+        tokens.append(tokenizer.Token(_TOKEN_TYPES[kind], m.group(kind), start, pos))
+
+
 def _parse_type_recursive(tokens):
     ctype = CType()
     while tokens:
-        token = tokens.pop(0)
+        token = tokens.popleft()
         if token.name.startswith('::'):
             token.name = token.name[2:]
         if token.token_type == tokenizer.SYNTAX:
             if token.name in [ '>>' ]:
-                tokens.insert(0, tokenizer.Token(tokenizer.SYNTAX, token.name[0], None, None))
-                tokens.insert(0, tokenizer.Token(tokenizer.SYNTAX, token.name[0], None, None))
+                tokens.appendleft(tokenizer.Token(tokenizer.SYNTAX, token.name[0], None, None))
+                tokens.appendleft(tokenizer.Token(tokenizer.SYNTAX, token.name[0], None, None))
                 continue
             if token.name in [',', '>', ')']:
                 ctype.reorder_modifiers()
@@ -161,6 +186,12 @@ def _parse_type_recursive(tokens):
     return ctype, None
 
 
+## Interning tables: type strings are parsed only once, and the result
+## is shared by all later requests for the same string.
+_parsed_types = {}
+_normalized_types = {}
+_type_traits = {}
+
 def parse_type(type_string):
     """
     Parse a C type string.
@@ -168,10 +199,16 @@ def parse_type(type_string):
     :param type_string: C type expression
     :returns: a L{CType} object representing the type
     """
-    tokens = list(tokenizer.GetTokens(type_string + '\n'))
-    ctype, last_token = _parse_type_recursive(tokens)
-    assert last_token is None
-    return ctype
+    try:
+        ctype = _parsed_types[type_string]
+    except KeyError:
+        tokens = deque(_tokenize_type(type_string))
+        ctype, last_token = _parse_type_recursive(tokens)
+        assert last_token is None
+        _parsed_types[type_string] = ctype
+    ## the interned CType must not be modified, so hand out a copy
+    ## of its (toplevel) token list
+    return ctype.clone()
 
 def normalize_type_string(type_string):
     """
@@ -193,11 +230,17 @@ def normalize_type_string(type_string):
     'char const * const'
     >>> normalize_type_string('const char*const*const')
     'char const * const * const'
+    >>> normalize_type_string('volatile const int * volatile const')
+    'int const volatile * const volatile'
     >>> normalize_type_string('const std::map<std::string, void (*) (int, std::vector<zbr>) >')
     'std::map< std::string, void ( * ) ( int, std::vector< zbr > ) > const'
     """
-    ctype = parse_type(type_string)
-    return str(ctype)
+    try:
+        return _normalized_types[type_string]
+    except KeyError:
+        normalized = str(parse_type(type_string))
+        _normalized_types[type_string] = normalized
+        return normalized
 
 
 class TypeTraits(object):
@@ -303,6 +346,8 @@ class TypeTraits(object):
     >>> t.make_target_const()
     >>> print(repr(str(t.ctype)))
     'char const * const'
+    >>> str(TypeTraits("char *").ctype)
+    'char *'
 
     >>> str(TypeTraits("T<X<int>>").ctype)
     'T< X< int > >'
@@ -310,6 +355,15 @@ class TypeTraits(object):
     """
 
     def __init__(self, ctype):
+        try:
+            parsed = _type_traits[ctype]
+        except KeyError:
+            parsed = TypeTraits.__new__(TypeTraits)
+            parsed._parse(ctype)
+            _type_traits[ctype] = parsed
+        parsed._copy_to(self)
+
+    def _parse(self, ctype):
         self.ctype = parse_type(ctype)
         self.ctype_no_modifiers = self.ctype.clone()
         self.ctype_no_modifiers.remove_modifiers()
@@ -351,6 +405,24 @@ class TypeTraits(object):
         self.ctype_no_const_no_ref = self.ctype_no_const.clone()
         self.ctype_no_const_no_ref.remove_outer_modifier("&")
 
+    def _copy_to(self, other):
+        other.__dict__.update(self.__dict__)
+        other.ctype = self.ctype.clone()
+        other.ctype_no_modifiers = self.ctype_no_modifiers.clone()
+        other.ctype_no_const = self.ctype_no_const.clone()
+        other.ctype_no_const_no_ref = self.ctype_no_const_no_ref.clone()
+        if self.target is not None:
+            other.target = self.target.clone()
+
+    def clone(self):
+        """
+        Return a copy of these type traits that can be modified (e.g. with
+        L{make_const}) without affecting the original.
+        """
+        clone = TypeTraits.__new__(TypeTraits)
+        self._copy_to(clone)
+        return clone
+
     def make_const(self):
         """
         Add a const modifier to the type.  Has no effect if the type is already const.
@@ -1,7 +1,7 @@
 # docstrings not neede here (the type handler doubleerfaces are fully
 # documented in base.py) pylint: disable-msg=C0111
 
-from .base import ReturnValue, Parameter, \
+from .base import ReturnValue, Parameter, BufferParameter, \
      ReverseWrapperBase, ForwardWrapperBase
 
 class DoubleParam(Parameter):
@@ -78,3 +78,9 @@ class DoubleRefParam(Parameter):
             wrapper.parse_params.add_parameter('d', ['&'+name], self.name)
         if self.direction & self.DIRECTION_OUT:
             wrapper.build_params.add_parameter("d", [name])
+
+
+class DoubleBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['double*']
+    BUFFER_FORMATS = 'd'
@@ -1,7 +1,7 @@
 # docstrings not neede here (the type handler floaterfaces are fully
 # documented in base.py) pylint: disable-msg=C0111
 
-from .base import ReturnValue, Parameter, \
+from .base import ReturnValue, Parameter, BufferParameter, \
      ReverseWrapperBase, ForwardWrapperBase
 from .ctypeparser import parse_type
 
@@ -123,3 +123,9 @@ class FloatRefParam(Parameter):
             wrapper.parse_params.add_parameter('f', ['&'+name], self.name)
         if self.direction & self.DIRECTION_OUT:
             wrapper.build_params.add_parameter("f", [name])
+
+
+class FloatBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['float*']
+    BUFFER_FORMATS = 'f'
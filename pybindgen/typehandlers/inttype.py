@@ -7,7 +7,7 @@ assert struct.calcsize(b'i') == 4 # assumption is made that sizeof(int) == 4 for
 
 
 from .base import ReturnValue, Parameter, PointerParameter, PointerReturnValue, \
-     ReverseWrapperBase, ForwardWrapperBase, TypeConfigurationError, NotSupportedError
+     BufferParameter, ReverseWrapperBase, ForwardWrapperBase, TypeConfigurationError, NotSupportedError
 
 
 class IntParam(Parameter):
@@ -761,3 +761,66 @@ class UnsignedInt16PtrParam(PointerParameter):
             wrapper.parse_params.add_parameter('H', ['&'+name], self.name)
         if self.direction & self.DIRECTION_OUT:
             wrapper.build_params.add_parameter('H', [name])
+
+
+## buffer parameters; the format characters of the same size are
+## accepted interchangeably (the item size is checked at run time)
+
+class Int8BufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['int8_t*', 'signed char*']
+    BUFFER_FORMATS = 'b'
+
+
+class UInt8BufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['uint8_t*', 'unsigned char*']
+    BUFFER_FORMATS = 'B'
+
+
+class Int16BufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['int16_t*', 'short*', 'short int*']
+    BUFFER_FORMATS = 'h'
+
+
+class UInt16BufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['uint16_t*', 'unsigned short*', 'unsigned short int*']
+    BUFFER_FORMATS = 'H'
+
+
+class IntBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['int*', 'int32_t*']
+    BUFFER_FORMATS = 'il'
+
+
+class UnsignedIntBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['unsigned int*', 'uint32_t*']
+    BUFFER_FORMATS = 'IL'
+
+
+class LongBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['long*', 'long int*']
+    BUFFER_FORMATS = 'lqi'
+
+
+class UnsignedLongBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['unsigned long*', 'unsigned long int*']
+    BUFFER_FORMATS = 'LQI'
+
+
+class LongLongBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['long long*', 'int64_t*']
+    BUFFER_FORMATS = 'ql'
+
+
+class UnsignedLongLongBufferParam(BufferParameter):
+
+    BUFFER_CTYPES = ['unsigned long long*', 'uint64_t*']
+    BUFFER_FORMATS = 'QL'
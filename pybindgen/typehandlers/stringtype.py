@@ -135,7 +135,9 @@ class StdStringRefParam(Parameter):
                             default_value=self.default_value))
 
         if self.direction & Parameter.DIRECTION_OUT:
-            wrapper.build_params.add_parameter("s#", ['('+name_std+').c_str()', '('+name_std+').size()'])
+            wrapper.build_params.add_parameter("s#", ['('+name_std+').c_str()', '('+name_std+').size()'],
+                                               direct_conversion=('PyUnicode_FromStringAndSize((%s).c_str(), (%s).size())'
+                                                                  % (name_std, name_std)))
 
 
 class StdStringPtrParam(PointerParameter):
@@ -188,7 +190,9 @@ class StdStringPtrParam(PointerParameter):
                                            (name_std_value, name, name_len))
 
         if self.direction & Parameter.DIRECTION_OUT:
-            wrapper.build_params.add_parameter("s#", ['('+name_std_value+').c_str()', '('+name_std_value+').size()'])
+            wrapper.build_params.add_parameter("s#", ['('+name_std_value+').c_str()', '('+name_std_value+').size()'],
+                                               direct_conversion=('PyUnicode_FromStringAndSize((%s).c_str(), (%s).size())'
+                                                                  % (name_std_value, name_std_value)))
 
 
 class CharReturn(ReturnValue):
@@ -243,7 +247,9 @@ class StdStringReturn(ReturnValue):
     def convert_c_to_python(self, wrapper):
         wrapper.build_params.add_parameter("s#", ['(%s).c_str()' % self.value,
                                                   '(%s).size()' % self.value],
-                                           prepend=True)
+                                           prepend=True,
+                                           direct_conversion=('PyUnicode_FromStringAndSize((%s).c_str(), (%s).size())'
+                                                              % (self.value, self.value)))
 
 
 class StdStringRefReturn(ReturnValue):
@@ -259,7 +265,9 @@ class StdStringRefReturn(ReturnValue):
     def convert_c_to_python(self, wrapper):
         wrapper.build_params.add_parameter("s#", ['(%s).c_str()' % self.value,
                                                   '(%s).size()' % self.value],
-                                           prepend=True)
+                                           prepend=True,
+                                           direct_conversion=('PyUnicode_FromStringAndSize((%s).c_str(), (%s).size())'
+                                                              % (self.value, self.value)))
 
 
 class GlibStringParam(Parameter):
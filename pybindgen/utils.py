@@ -147,6 +147,335 @@ typedef enum _PyBindGenWrapperFlags {
 
 ''')
 
+    code_sink.writeln(r'''
+#if PY_VERSION_HEX >= 0x03070000 && !defined(_PyBindGenFastcall_defined_)
+#define _PyBindGenFastcall_defined_
+/* Binds the arguments of a METH_FASTCALL|METH_KEYWORDS call to
+   parameter slots; 'keywords' is the wrapper's static keyword table,
+   and 'interned' its per-wrapper cache of interned keyword strings. */
+static inline int
+_pybindgen_fastcall_bind(const char *funcname, PyObject *const *args, Py_ssize_t nargs,
+                         PyObject *kwnames, const char *const *keywords, PyObject **interned,
+                         Py_ssize_t nparams, Py_ssize_t nrequired, PyObject **out)
+{
+    Py_ssize_t i, k, nkw;
+
+    if (nargs > nparams) {
+        PyErr_Format(PyExc_TypeError, "%s() takes at most %zd arguments (%zd given)",
+                     funcname, nparams, nargs);
+        return -1;
+    }
+    for (i = 0; i < nargs; i++)
+        out[i] = args[i];
+    for (; i < nparams; i++)
+        out[i] = NULL;
+    nkw = (kwnames == NULL ? 0 : PyTuple_GET_SIZE(kwnames));
+    if (nkw == 0)
+        goto check_required;
+    if (keywords == NULL) {
+        PyErr_Format(PyExc_TypeError, "%s() takes no keyword arguments", funcname);
+        return -1;
+    }
+    if (interned[0] == NULL) {
+        /* in reverse order, so that interned[0] is only set when complete */
+        for (i = nparams - 1; i >= 0; i--) {
+            if (interned[i] == NULL && (interned[i] = PyUnicode_InternFromString(keywords[i])) == NULL)
+                return -1;
+        }
+    }
+    for (k = 0; k < nkw; k++) {
+        PyObject *key = PyTuple_GET_ITEM(kwnames, k);
+        for (i = 0; i < nparams; i++) {
+            if (key == interned[i])
+                break;
+        }
+        if (i == nparams) {
+            for (i = 0; i < nparams; i++) {
+                if (PyUnicode_Compare(key, interned[i]) == 0)
+                    break;
+            }
+        }
+        if (i == nparams) {
+            PyErr_Format(PyExc_TypeError, "%s() got an unexpected keyword argument '%U'", funcname, key);
+            return -1;
+        }
+        if (out[i] != NULL) {
+            PyErr_Format(PyExc_TypeError, "%s() got multiple values for argument '%s'", funcname, keywords[i]);
+            return -1;
+        }
+        out[i] = args[nargs + k];
+    }
+check_required:
+    for (i = 0; i < nrequired; i++) {
+        if (out[i] == NULL) {
+            PyErr_Format(PyExc_TypeError, "%s() missing required argument '%s' (pos %zd)",
+                         funcname, keywords != NULL ? keywords[i] : "", i + 1);
+            return -1;
+        }
+    }
+    return 0;
+}
+#endif
+''')
+
+    code_sink.writeln(r'''
+#ifndef _PyBindGenBufferExporter_defined_
+#define _PyBindGenBufferExporter_defined_
+#if PY_VERSION_HEX >= 0x03000000
+/* Exports a block of C/C++ memory through the buffer protocol, holding
+   a reference to the Python object that owns the memory. */
+typedef struct {
+    PyObject_HEAD
+    PyObject *owner;
+    void *buf;
+    Py_ssize_t shape;
+    Py_ssize_t itemsize;
+    const char *format;
+    int readonly;
+} _PyBindGenBufferExporter;
+
+static int
+_pybindgen_buffer_exporter_getbuffer(PyObject *obj, Py_buffer *view, int flags)
+{
+    _PyBindGenBufferExporter *self = (_PyBindGenBufferExporter *) obj;
+
+    if ((flags & PyBUF_WRITABLE) && self->readonly) {
+        PyErr_SetString(PyExc_BufferError, "buffer is read-only");
+        view->obj = NULL;
+        return -1;
+    }
+    view->obj = obj;
+    Py_INCREF(obj);
+    view->buf = self->buf;
+    view->len = self->shape * self->itemsize;
+    view->readonly = self->readonly;
+    view->itemsize = self->itemsize;
+    view->format = ((flags & PyBUF_FORMAT) ? (char *) self->format : NULL);
+    view->ndim = 1;
+    view->shape = ((flags & PyBUF_ND) ? &self->shape : NULL);
+    view->strides = ((flags & PyBUF_STRIDES) == PyBUF_STRIDES ? &self->itemsize : NULL);
+    view->suboffsets = NULL;
+    view->internal = NULL;
+    return 0;
+}
+
+static void
+_pybindgen_buffer_exporter_dealloc(PyObject *obj)
+{
+    Py_XDECREF(((_PyBindGenBufferExporter *) obj)->owner);
+    PyObject_Del(obj);
+}
+
+static PyBufferProcs _PyBindGenBufferExporter_as_buffer = {
+    (getbufferproc) _pybindgen_buffer_exporter_getbuffer,
+    (releasebufferproc) NULL
+};
+
+static PyTypeObject _PyBindGenBufferExporter_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    (char *) "pybindgen.BufferExporter",      /* tp_name */
+    sizeof(_PyBindGenBufferExporter),         /* tp_basicsize */
+    0,                                        /* tp_itemsize */
+    (destructor) _pybindgen_buffer_exporter_dealloc, /* tp_dealloc */
+    0,                                        /* tp_print / tp_vectorcall_offset */
+    0,                                        /* tp_getattr */
+    0,                                        /* tp_setattr */
+    0,                                        /* tp_compare / tp_as_async */
+    0,                                        /* tp_repr */
+    0,                                        /* tp_as_number */
+    0,                                        /* tp_as_sequence */
+    0,                                        /* tp_as_mapping */
+    0,                                        /* tp_hash */
+    0,                                        /* tp_call */
+    0,                                        /* tp_str */
+    0,                                        /* tp_getattro */
+    0,                                        /* tp_setattro */
+    &_PyBindGenBufferExporter_as_buffer,      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                       /* tp_flags */
+};
+#endif
+
+/* Returns a new memoryview of 'nitems' items of the memory at 'buf'
+   (None if 'buf' is NULL); 'owner', if not NULL, is kept alive for as
+   long as the memory is exported. */
+static inline PyObject *
+_pybindgen_memoryview_from_memory(PyObject *owner, void *buf, Py_ssize_t nitems,
+                                  Py_ssize_t itemsize, const char *format, int readonly)
+{
+#if PY_VERSION_HEX >= 0x03000000
+    _PyBindGenBufferExporter *exporter;
+    PyObject *view;
+#endif
+
+    if (buf == NULL) {
+        Py_INCREF(Py_None);
+        return Py_None;
+    }
+#if PY_VERSION_HEX >= 0x03000000
+    if (!(_PyBindGenBufferExporter_Type.tp_flags & Py_TPFLAGS_READY)) {
+        if (PyType_Ready(&_PyBindGenBufferExporter_Type) < 0)
+            return NULL;
+    }
+    exporter = PyObject_New(_PyBindGenBufferExporter, &_PyBindGenBufferExporter_Type);
+    if (exporter == NULL)
+        return NULL;
+    Py_XINCREF(owner);
+    exporter->owner = owner;
+    exporter->buf = buf;
+    exporter->shape = nitems;
+    exporter->itemsize = itemsize;
+    exporter->format = format;
+    exporter->readonly = readonly;
+    view = PyMemoryView_FromObject((PyObject *) exporter);
+    Py_DECREF(exporter);
+    return view;
+#else
+    (void) owner; (void) format;
+    if (readonly)
+        return PyBuffer_FromMemory(buf, nitems * itemsize);
+    return PyBuffer_FromReadWriteMemory(buf, nitems * itemsize);
+#endif
+}
+#endif
+''')
+
+    code_sink.writeln(r'''
+#if PY_VERSION_HEX >= 0x03000000 && !defined(_PyBindGenUFunc_defined_)
+#define _PyBindGenUFunc_defined_
+/* NumPy ufunc support, without a build time dependency on NumPy: the
+   ufunc C API table is looked up when the first ufunc is created. */
+typedef void (*_PyBindGenUFuncLoop)(char **args, const Py_intptr_t *dimensions,
+                                    const Py_intptr_t *steps, void *data);
+typedef PyObject *(*_PyBindGenUFuncFromFuncAndData)(_PyBindGenUFuncLoop *loops, void **data, char *types,
+                                                    int ntypes, int nin, int nout, int identity,
+                                                    const char *name, const char *doc, int unused);
+
+/* Returns a new ufunc with the given loops, or NULL, with no exception
+   set, if NumPy is not available. */
+static inline PyObject *
+_pybindgen_ufunc_new(_PyBindGenUFuncLoop *loops, void **data, char *types, int ntypes,
+                     int nin, int nout, const char *name, const char *doc)
+{
+    static void **ufunc_api = NULL;
+    static const char *const umath_modules[] = {
+        "numpy._core._multiarray_umath",  /* NumPy >= 2.0 */
+        "numpy.core._multiarray_umath",
+        NULL
+    };
+    PyObject *module, *capsule;
+    int i;
+
+    for (i = 0; ufunc_api == NULL && umath_modules[i] != NULL; i++) {
+        module = PyImport_ImportModule(umath_modules[i]);
+        if (module == NULL) {
+            PyErr_Clear();
+            continue;
+        }
+        capsule = PyObject_GetAttrString(module, "_UFUNC_API");
+        Py_DECREF(module);
+        if (capsule == NULL) {
+            PyErr_Clear();
+            continue;
+        }
+        ufunc_api = (void **) PyCapsule_GetPointer(capsule, NULL);
+        Py_DECREF(capsule);
+        if (ufunc_api == NULL)
+            PyErr_Clear();
+    }
+    if (ufunc_api == NULL)
+        return NULL;
+    /* PyUFunc_FromFuncAndData is entry 1 of the API table; -1 is PyUFunc_None */
+    return ((_PyBindGenUFuncFromFuncAndData) ufunc_api[1])(loops, data, types, ntypes, nin, nout, -1,
+                                                           name, doc, 0);
+}
+#endif
+''')
+
+    code_sink.writeln(r'''
+#ifndef _PyBindGenAddWard_defined_
+#define _PyBindGenAddWard_defined_
+/* Keeps 'ward' alive for as long as 'custodian' is alive, by adding
+   it to the custodian's __wards__ list. */
+static inline void
+_pybindgen_add_ward(PyObject *custodian, PyObject *ward)
+{
+    PyObject *wards = PyObject_GetAttrString(custodian, (char *) "__wards__");
+    if (wards == NULL) {
+        PyErr_Clear();
+        wards = PyList_New(0);
+        if (wards == NULL)
+            return;
+        PyObject_SetAttrString(custodian, (char *) "__wards__", wards);
+    }
+    if (ward && !PySequence_Contains(wards, ward))
+        PyList_Append(wards, ward);
+    Py_DECREF(wards);
+}
+#endif
+
+#if defined(__cplusplus) && !defined(_PyBindGenContainerConverters_defined_)
+#define _PyBindGenContainerConverters_defined_
+#include <utility>
+/* Ways of adding a value to a container, named after the method. */
+struct _PyBindGenContainerAdd_push_back {
+    template <typename Container, typename Item>
+    static void add(Container &container, const Item &item) { container.push_back(item); }
+};
+struct _PyBindGenContainerAdd_push {
+    template <typename Container, typename Item>
+    static void add(Container &container, const Item &item) { container.push(item); }
+};
+struct _PyBindGenContainerAdd_insert {
+    template <typename Container, typename Item>
+    static void add(Container &container, const Item &item) { container.insert(item); }
+};
+
+/* Fills a container from a list, converting each item with 'convert';
+   returns 0, with an exception set, if an item cannot be converted. */
+template <typename Add, typename Container, typename Item>
+static int
+_pybindgen_list_to_container(PyObject *arg, Container *container, int (*convert)(PyObject *, Item *))
+{
+    container->clear();
+    Py_ssize_t size = PyList_Size(arg);
+    for (Py_ssize_t i = 0; i < size; i++) {
+        Item item;
+        if (!convert(PyList_GET_ITEM(arg, i), &item)) {
+            return 0;
+        }
+        Add::add(*container, item);
+    }
+    return 1;
+}
+
+/* Fills a mapping from a list of (key, value) tuples. */
+template <typename Add, typename Container, typename Key, typename Value>
+static int
+_pybindgen_list_to_mapping(PyObject *arg, Container *container,
+                           int (*convert_key)(PyObject *, Key *), int (*convert_value)(PyObject *, Value *))
+{
+    container->clear();
+    Py_ssize_t size = PyList_Size(arg);
+    for (Py_ssize_t i = 0; i < size; i++) {
+        PyObject *tup = PyList_GET_ITEM(arg, i);
+        if (!PyTuple_Check(tup) || PyTuple_Size(tup) != 2) {
+            PyErr_SetString(PyExc_TypeError, "items must be tuples with two elements");
+            return 0;
+        }
+        std::pair< Key, Value > item;
+        if (!convert_key(PyTuple_GET_ITEM(tup, 0), &item.first)) {
+            return 0;
+        }
+        if (!convert_value(PyTuple_GET_ITEM(tup, 1), &item.second)) {
+            return 0;
+        }
+        Add::add(*container, item);
+    }
+    return 1;
+}
+#endif
+''')
+
 
 
 def mangle_name(name):
@@ -127,3 +127,264 @@ class StdMapWrapperRegistry(WrapperRegistry):
                               "    %(MAP)s.erase(%(ITER)s);\n"
                               "}\n"
                               % dict(ITER=iterator, MAP=self.map_name, WRAPPER=wrapper_lvalue, OBJECT_VALUE=object_rvalue))
+
+
+class HashTableWrapperRegistry(WrapperRegistry):
+    """
+    A wrapper registry that uses an open addressing hash table, keyed
+    by object pointer, as implementation.  Unlike
+    :class:`StdMapWrapperRegistry`, lookups take constant time and
+    the generated code is plain C.
+
+    The table capacity is always a power of two.  It grows when
+    live and deleted entries fill 3/4 of the table, and shrinks back
+    (never below the initial capacity) when live entries use less
+    than 1/8 of it.
+
+    The module gains a function ``_<registry name>_info()`` that
+    returns a dict with the current size, capacity, number of deleted
+    entries and load factor of the table.
+    """
+
+    initial_capacity = 64
+    """
+    Default initial number of table slots; the table is only
+    allocated when the first wrapper is registered.
+    """
+
+    def __init__(self, base_name, initial_capacity=None):
+        super(HashTableWrapperRegistry, self).__init__(base_name)
+        self.map_name = "%s_wrapper_registry" % base_name
+        if initial_capacity is not None:
+            self.initial_capacity = initial_capacity
+        capacity = 8
+        while capacity < self.initial_capacity:
+            capacity *= 2
+        self.initial_capacity = capacity
+
+    def _generate_hash_table_support(self, code_sink):
+        code_sink.writeln(r'''
+#ifndef _PyBindGenWrapperHashTable_defined_
+#define _PyBindGenWrapperHashTable_defined_
+#include <string.h>
+
+typedef struct _PyBindGenWrapperHashEntry {
+    void *key;   /* NULL: never used slot */
+    PyObject *wrapper; /* NULL with a non-NULL key: deleted slot */
+} PyBindGenWrapperHashEntry;
+
+typedef struct _PyBindGenWrapperHashTable {
+    PyBindGenWrapperHashEntry *entries;
+    size_t capacity; /* power of two, 0 until the first insertion */
+    size_t size;     /* live entries */
+    size_t used;     /* live plus deleted entries */
+    size_t initial_capacity;
+} PyBindGenWrapperHashTable;
+
+static inline size_t
+_pybindgen_wrapper_hash(void *key)
+{
+    unsigned long long h = (unsigned long long) (size_t) key;
+    h ^= h >> 33;
+    h *= 0xff51afd7ed558ccdULL;
+    h ^= h >> 33;
+    return (size_t) h;
+}
+
+static inline PyBindGenWrapperHashEntry *
+_pybindgen_wrapper_hash_find(PyBindGenWrapperHashTable *table, void *key)
+{
+    size_t mask = table->capacity - 1;
+    size_t i = _pybindgen_wrapper_hash(key) & mask;
+    while (table->entries[i].key != NULL) {
+        if (table->entries[i].key == key) {
+            return &table->entries[i];
+        }
+        i = (i + 1) & mask;
+    }
+    return NULL;
+}
+
+static int
+_pybindgen_wrapper_hash_resize(PyBindGenWrapperHashTable *table, size_t capacity)
+{
+    PyBindGenWrapperHashEntry *old_entries = table->entries;
+    size_t old_capacity = table->capacity;
+    PyBindGenWrapperHashEntry *entries;
+    size_t i, j, mask = capacity - 1;
+
+    entries = (PyBindGenWrapperHashEntry *) PyMem_Malloc(capacity * sizeof(PyBindGenWrapperHashEntry));
+    if (entries == NULL) {
+        return -1;
+    }
+    memset(entries, 0, capacity * sizeof(PyBindGenWrapperHashEntry));
+    /* re-insert the live entries only, dropping the deleted ones */
+    for (i = 0; i < old_capacity; i++) {
+        if (old_entries[i].wrapper != NULL) {
+            j = _pybindgen_wrapper_hash(old_entries[i].key) & mask;
+            while (entries[j].key != NULL) {
+                j = (j + 1) & mask;
+            }
+            entries[j] = old_entries[i];
+        }
+    }
+    PyMem_Free(old_entries);
+    table->entries = entries;
+    table->capacity = capacity;
+    table->used = table->size;
+    return 0;
+}
+
+static inline PyObject *
+_pybindgen_wrapper_hash_lookup(PyBindGenWrapperHashTable *table, void *key)
+{
+    PyBindGenWrapperHashEntry *entry;
+    if (table->size == 0) {
+        return NULL;
+    }
+    entry = _pybindgen_wrapper_hash_find(table, key);
+    return (entry == NULL ? NULL : entry->wrapper);
+}
+
+/* Maps key to wrapper, replacing any previous mapping.  If memory
+   cannot be allocated the wrapper is simply not registered. */
+static void
+_pybindgen_wrapper_hash_insert(PyBindGenWrapperHashTable *table, void *key, PyObject *wrapper)
+{
+    PyBindGenWrapperHashEntry *entry;
+    size_t mask, i;
+
+    if (table->capacity == 0) {
+        if (_pybindgen_wrapper_hash_resize(table, table->initial_capacity) < 0) {
+            return;
+        }
+    } else if ((table->used + 1) * 4 > table->capacity * 3) {
+        /* double when mostly live entries, else just purge deleted ones */
+        if (_pybindgen_wrapper_hash_resize(table, ((table->size + 1) * 2 > table->capacity
+                                                   ? table->capacity * 2 : table->capacity)) < 0) {
+            return;
+        }
+    }
+    entry = _pybindgen_wrapper_hash_find(table, key);
+    if (entry != NULL) {
+        if (entry->wrapper == NULL) {
+            table->size++;
+        }
+        entry->wrapper = wrapper;
+        return;
+    }
+    /* new key: take the first deleted slot in its probe sequence, if any */
+    mask = table->capacity - 1;
+    i = _pybindgen_wrapper_hash(key) & mask;
+    while (table->entries[i].key != NULL && table->entries[i].wrapper != NULL) {
+        i = (i + 1) & mask;
+    }
+    if (table->entries[i].key == NULL) {
+        table->used++;
+    }
+    table->entries[i].key = key;
+    table->entries[i].wrapper = wrapper;
+    table->size++;
+}
+
+static void
+_pybindgen_wrapper_hash_remove(PyBindGenWrapperHashTable *table, void *key)
+{
+    PyBindGenWrapperHashEntry *entry;
+    if (table->size == 0) {
+        return;
+    }
+    entry = _pybindgen_wrapper_hash_find(table, key);
+    if (entry == NULL || entry->wrapper == NULL) {
+        return;
+    }
+    /* keep the key, marking the slot as deleted, so that probing
+       for keys inserted after it still works */
+    entry->wrapper = NULL;
+    table->size--;
+    if (table->capacity > table->initial_capacity && table->size * 8 < table->capacity) {
+        _pybindgen_wrapper_hash_resize(table, table->capacity / 2);
+    }
+}
+
+static inline double
+_pybindgen_wrapper_hash_load_factor(PyBindGenWrapperHashTable *table)
+{
+    return (table->capacity == 0 ? 0.0 : (double) table->size / (double) table->capacity);
+}
+
+static PyObject *
+_pybindgen_wrapper_hash_info(PyObject *capsule, PyObject *PYBINDGEN_UNUSED(args))
+{
+    PyBindGenWrapperHashTable *table = (PyBindGenWrapperHashTable *) PyCapsule_GetPointer(capsule, NULL);
+    if (table == NULL) {
+        return NULL;
+    }
+    return Py_BuildValue((char *) "{s:n,s:n,s:n,s:d}",
+                         "size", (Py_ssize_t) table->size,
+                         "capacity", (Py_ssize_t) table->capacity,
+                         "deleted", (Py_ssize_t) (table->used - table->size),
+                         "load_factor", _pybindgen_wrapper_hash_load_factor(table));
+}
+#endif
+''')
+
+    def generate_forward_declarations(self, code_sink, module, import_from_module):
+        self._generate_hash_table_support(code_sink)
+        if import_from_module:
+            code_sink.writeln("extern PyBindGenWrapperHashTable *_%s;" % self.map_name)
+            code_sink.writeln("#define %s (*_%s)" % (self.map_name, self.map_name))
+        else:
+            code_sink.writeln("extern PyBindGenWrapperHashTable %s;" % self.map_name)
+            code_sink.writeln("extern PyMethodDef %s_info_def;" % self.map_name)
+
+    def generate(self, code_sink, module):
+        code_sink.writeln("PyBindGenWrapperHashTable %s = {NULL, 0, 0, 0, %i};"
+                          % (self.map_name, self.initial_capacity))
+        code_sink.writeln("PyMethodDef %s_info_def = {(char *) \"_%s_info\", "
+                          "(PyCFunction) _pybindgen_wrapper_hash_info, METH_NOARGS, NULL};"
+                          % (self.map_name, self.map_name))
+        # register the table in the module namespace, along with the function to inspect it
+        module.after_init.write_code("{")
+        module.after_init.indent()
+        module.after_init.write_code("PyObject *_cobj = PyCObject_FromVoidPtr(&%s, NULL);" % self.map_name)
+        module.after_init.write_code("PyModule_AddObject(m, (char *) \"_%s_info\", PyCFunction_New(&%s_info_def, _cobj));"
+                                     % (self.map_name, self.map_name))
+        module.after_init.write_code("PyModule_AddObject(m, (char *) \"_%s\", _cobj);" % self.map_name)
+        module.after_init.unindent()
+        module.after_init.write_code("}")
+
+    def generate_import(self, code_sink, code_block, module_pyobj_var):
+        code_sink.writeln("PyBindGenWrapperHashTable *_%s;" % self.map_name)
+        code_block.write_code("PyObject *_cobj = PyObject_GetAttrString(%s, (char*) \"_%s\");"
+                              % (module_pyobj_var, self.map_name))
+        code_block.write_code("if (_cobj == NULL) {\n"
+                              "    PyErr_Clear();\n"
+                              "    _%(MAP)s = (PyBindGenWrapperHashTable *) PyMem_Malloc(sizeof(PyBindGenWrapperHashTable));"
+                              % dict(MAP=self.map_name))
+        code_block.indent()
+        code_block.write_error_check("_%s == NULL" % self.map_name, "PyErr_NoMemory();")
+        code_block.unindent()
+        code_block.write_code("    memset(_%(MAP)s, 0, sizeof(PyBindGenWrapperHashTable));\n"
+                              "    _%(MAP)s->initial_capacity = %(CAPACITY)i;\n"
+                              "} else {\n"
+                              "    _%(MAP)s = (PyBindGenWrapperHashTable *) PyCObject_AsVoidPtr(_cobj);\n"
+                              "    Py_DECREF(_cobj);\n"
+                              "}"
+                              % dict(MAP=self.map_name, CAPACITY=self.initial_capacity))
+
+    def write_register_new_wrapper(self, code_block, wrapper_lvalue, object_rvalue):
+        code_block.write_code("_pybindgen_wrapper_hash_insert(&%s, (void *) %s, (PyObject *) %s);"
+                              % (self.map_name, object_rvalue, wrapper_lvalue))
+
+    def write_lookup_wrapper(self, code_block, wrapper_type, wrapper_lvalue, object_rvalue):
+        code_block.write_code("%(WRAPPER)s = (%(TYPE)s *) _pybindgen_wrapper_hash_lookup(&%(MAP)s, (void *) %(OBJECT_VALUE)s);\n"
+                              "if (%(WRAPPER)s != NULL) {\n"
+                              "    Py_INCREF(%(WRAPPER)s);\n"
+                              "}"
+                              % dict(MAP=self.map_name, WRAPPER=wrapper_lvalue, TYPE=wrapper_type,
+                                     OBJECT_VALUE=object_rvalue))
+
+    def write_unregister_wrapper(self, code_block, wrapper_lvalue, object_rvalue):
+        code_block.write_code("_pybindgen_wrapper_hash_remove(&%s, (void *) %s);"
+                              % (self.map_name, object_rvalue))
@@ -468,6 +468,89 @@ get_set ()
     return rv;
 }
 
+std::vector<double>
+get_double_vector (int n)
+{
+    std::vector<double> rv;
+    for (int i = 0; i < n; i++)
+        rv.push_back (i * 0.5);
+    return rv;
+}
+
+double
+sum_double_vector (const std::vector<double> &vec)
+{
+    double sum = 0;
+    for (std::vector<double>::const_iterator iter = vec.begin (); iter != vec.end (); iter++)
+        sum += *iter;
+    return sum;
+}
+
+double
+sum_doubles (const double *data, size_t n)
+{
+    double sum = 0;
+    for (size_t i = 0; i < n; i++)
+        sum += data[i];
+    return sum;
+}
+
+void
+scale_ints (int *data, int n, int factor)
+{
+    for (int i = 0; i < n; i++)
+        data[i] *= factor;
+}
+
+int FrameBuffer::instance_count = 0;
+
+int
+FrameBuffer::get_checksum () const
+{
+    int sum = 0;
+    for (std::vector<uint8_t>::const_iterator iter = m_data.begin (); iter != m_data.end (); iter++)
+        sum += *iter;
+    return sum;
+}
+
+static const double static_doubles[] = {1.0, 2.0, 3.0};
+
+const double *
+get_static_doubles ()
+{
+    return static_doubles;
+}
+
+const double *
+get_null_doubles ()
+{
+    return NULL;
+}
+
+double
+scale_double (double x, double factor)
+{
+    return x * factor;
+}
+
+int
+square_int (int x)
+{
+    return x * x;
+}
+
+double
+lerp (double a, double b, double t)
+{
+    return a + (b - a) * t;
+}
+
+float
+lerp (float a, float b, float t)
+{
+    return a + (b - a) * t;
+}
+
 namespace xpto
 {
     FlowId
@@ -475,6 +558,12 @@ namespace xpto
     {
         return flowId + 1;
     }
+
+    double
+    midpoint (double a, double b)
+    {
+        return (a + b) / 2;
+    }
 }
 
 double
@@ -628,3 +717,24 @@ void Add (const std::string filePath,
           char delimiter)
 {
 }
+
+
+void *
+AlignedValue::operator new (size_t size)
+{
+    // room for the padding and for the address of the block
+    char *block = (char *) malloc (size + 64 + sizeof (void *));
+    if (block == NULL)
+        throw std::bad_alloc ();
+    char *ptr = block + sizeof (void *);
+    ptr += (64 - (size_t) ptr % 64) % 64;
+    ((void **) ptr)[-1] = block;
+    return ptr;
+}
+
+void
+AlignedValue::operator delete (void *ptr)
+{
+    if (ptr != NULL)
+        free (((void **) ptr)[-1]);
+}
@@ -297,6 +297,10 @@ public:
         return m_prefix + foo.get_datum();
     }
 
+    std::string call_get_prefix_with_foo_value (Foo foo) const {
+        return get_prefix_with_foo_value(foo);
+    }
+
     // -#- @foo(direction=inout) -#-
     virtual std::string get_prefix_with_foo_ref (const Foo &foo) const {
         return m_prefix + foo.get_datum ();
@@ -317,6 +321,10 @@ public:
         return out.str ();
     }
 
+    std::string call_get_something (int x) const {
+        return get_something(x);
+    }
+
     // -#- @pyobject(transfer_ownership=false) -#-
     virtual void set_pyobject (PyObject *pyobject) {
         if (m_pyobject) {
@@ -865,6 +873,48 @@ std::map<std::string, int> get_map ();
 
 std::set<uint32_t> get_set ();
 
+std::vector<double> get_double_vector (int n);
+double sum_double_vector (const std::vector<double> &vec);
+
+// buffer parameters
+double sum_doubles (const double *data, size_t n);
+void scale_ints (int *data, int n, int factor);
+
+// buffer return values
+class FrameBuffer
+{
+public:
+    static int instance_count;
+
+    FrameBuffer (int size) : m_data (size, 0) { FrameBuffer::instance_count++; }
+    ~FrameBuffer () { FrameBuffer::instance_count--; }
+
+    uint8_t *get_data () { return &m_data[0]; }
+    const uint8_t *get_const_data () const { return &m_data[0]; }
+    int get_size () const { return (int) m_data.size (); }
+    int get_checksum () const;
+    void set_byte (int index, int value) { m_data.at (index) = (uint8_t) value; }
+
+private:
+    std::vector<uint8_t> m_data;
+};
+
+const double *get_static_doubles ();
+const double *get_null_doubles ();
+
+// batch wrappers
+double scale_double (double x, double factor);
+int square_int (int x);
+
+// ufuncs
+double lerp (double a, double b, double t);
+float lerp (float a, float b, float t);
+
+namespace xpto
+{
+    double midpoint (double a, double b);
+}
+
 
 // test binary operators
 
@@ -1405,4 +1455,35 @@ void Add (const std::string filePath,
           char delimiter = ',');
 
 
+class FastcallPoint
+{
+public:
+    FastcallPoint(int x, double y = 0.5) : m_x(x), m_y(y) {}
+    int get_x() const { return m_x; }
+    double get_y() const { return m_y; }
+    double scaled(double factor, int offset = 0) const { return (m_x + offset) * factor; }
+    int add_x(int delta) const { return m_x + delta; }
+private:
+    int m_x;
+    double m_y;
+};
+
+// over-aligned class, for inline storage; it has its own allocator
+// because new only honours alignas since C++17
+class alignas(64) AlignedValue
+{
+public:
+    AlignedValue(double value) : m_value(value) {}
+    double get_value() const { return m_value; }
+    bool is_aligned() const { return (size_t) this % 64 == 0; }
+
+    static void *operator new (size_t size);
+    static void *operator new (size_t, void *where) { return where; }
+    static void operator delete (void *ptr);
+    static void operator delete (void *, void *) {}
+private:
+    double m_value;
+};
+
+
 #endif 	    /* !FOO_H_ */
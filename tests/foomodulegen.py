@@ -7,7 +7,7 @@ import re
 import pybindgen
 import pybindgen.utils
 from pybindgen.typehandlers import base as typehandlers
-from pybindgen import ReturnValue, Parameter, Module, Function, FileCodeSink
+from pybindgen import ReturnValue, Parameter, BufferParameter, BufferReturnValue, Module, Function, FileCodeSink
 from pybindgen import CppMethod, CppConstructor, CppClass, Enum
 from pybindgen.function import CustomFunctionWrapper
 from pybindgen.cppmethod import CustomCppMethodWrapper
@@ -31,7 +31,7 @@ def my_module_gen(out_file):
                      [],
                      custom_name='IntegerTypeNameGet', template_parameters=['int'])
 
-    Foo = mod.add_class('Foo', automatic_type_narrowing=True)
+    Foo = mod.add_class('Foo', automatic_type_narrowing=True, freelist_size=8)
 
     Foo.add_static_attribute('instance_count', ReturnValue.new('int'))
     Foo.add_constructor([Parameter.new('std::string', 'datum')])
@@ -133,7 +133,7 @@ int %s::custom_method_added_by_a_hook(int x)
                      ReturnValue.new('ToBeFreed *', free_after_copy=False),
                      [Parameter.new('int', 'size')])
 
-    SomeObject = mod.add_class('SomeObject', allow_subclassing=True)
+    SomeObject = mod.add_class('SomeObject', allow_subclassing=True, freelist_size=4)
 
     SomeObject.add_instance_attribute('foo', ReturnValue.new('Foo'),
                                       getter='get_foo_value',
@@ -215,6 +215,10 @@ int %s::custom_method_added_by_a_hook(int x)
 
     # ---
     SomeObject.add_method('call_get_prefix', ReturnValue.new('std::string'), [])
+    SomeObject.add_method('call_get_prefix_with_foo_value', ReturnValue.new('std::string'),
+                          [Parameter.new('Foo', 'foo')], is_const=True)
+    SomeObject.add_method('call_get_something', ReturnValue.new('std::string'),
+                          [Parameter.new('int', 'x')], is_const=True)
 
     SomeObject.add_method('set_foo_value', None, [Parameter.new('Foo', 'foo')])
     SomeObject.add_method('get_foo_value', ReturnValue.new('Foo'), [])
@@ -470,7 +474,7 @@ int %s::custom_method_added_by_a_hook(int x)
     TestContainer.add_method('get_simple_vec', ReturnValue.new('std::vector<simple_struct_t>'), [], is_virtual=True)
     TestContainer.add_method('set_simple_vec', 'int', [Parameter.new('std::vector<simple_struct_t>', 'vec')], is_virtual=True)
 
-    mod.add_container('std::vector<std::string>', 'std::string', 'vector')
+    mod.add_container('std::vector<std::string>', 'std::string', 'vector', freelist_size=4)
     TestContainer.add_method('get_vec', 'void', [Parameter.new('std::vector<std::string> &', 'outVec',
                                                                direction=Parameter.DIRECTION_OUT)])
 
@@ -480,6 +484,37 @@ int %s::custom_method_added_by_a_hook(int x)
                                                                    direction=Parameter.DIRECTION_OUT)])
 
 
+    mod.add_container('std::vector<double>', 'double', 'vector')
+    mod.add_function('get_double_vector', ReturnValue.new('std::vector<double>'), [Parameter.new('int', 'n')])
+    mod.add_function('sum_double_vector', 'double', [Parameter.new('std::vector<double> const &', 'vec')])
+    mod.add_function('sum_doubles', 'double', [BufferParameter.new('const double *', 'data')])
+    mod.add_function('scale_ints', 'void', [BufferParameter.new('int *', 'data', direction=Parameter.DIRECTION_INOUT,
+                                                                length_ctype='int'),
+                                            Parameter.new('int', 'factor')])
+
+    FrameBuffer = mod.add_class('FrameBuffer')
+    FrameBuffer.add_static_attribute('instance_count', ReturnValue.new('int'))
+    FrameBuffer.add_constructor([Parameter.new('int', 'size')])
+    FrameBuffer.add_method('get_data', BufferReturnValue('uint8_t *', 'self->obj->get_size()', custodian=0), [])
+    FrameBuffer.add_method('get_const_data', BufferReturnValue('const uint8_t *', 'self->obj->get_size()', custodian=0),
+                           [], is_const=True)
+    FrameBuffer.add_method('get_size', 'int', [], is_const=True)
+    FrameBuffer.add_method('get_checksum', 'int', [], is_const=True, batch=True)
+    FrameBuffer.add_method('set_byte', 'void', [Parameter.new('int', 'index'), Parameter.new('int', 'value')],
+                           batch=True)
+    mod.add_function('get_static_doubles', BufferReturnValue('const double *', '3'), [])
+    mod.add_function('get_null_doubles', BufferReturnValue('const double *', '0'), [])
+
+    mod.add_function('scale_double', 'double', [Parameter.new('double', 'x'), Parameter.new('double', 'factor')],
+                     batch=True, unblock_threads=True)
+    mod.add_function('square_int', 'int', [Parameter.new('int', 'x')], batch=True)
+
+    mod.add_ufunc('lerp', 'double', [Parameter.new('double', 'a'), Parameter.new('double', 'b'),
+                                     Parameter.new('double', 't')])
+    mod.add_ufunc('lerp', 'float', [Parameter.new('float', 'a'), Parameter.new('float', 'b'),
+                                    Parameter.new('float', 't')])
+    xpto.add_ufunc('midpoint', 'double', [Parameter.new('double', 'a'), Parameter.new('double', 'b')])
+
     mod.add_container('std::map<std::string, simple_struct_t>',
                       (ReturnValue.new('std::string'), ReturnValue.new('simple_struct_t')),
                       'map')
@@ -495,7 +530,7 @@ int %s::custom_method_added_by_a_hook(int x)
     TestContainer.add_method('set_simple_unordered_map', 'int', [Parameter.new('std::unordered_map<std::string, simple_struct_t>', 'map')], is_virtual=True)
 
 
-    Tupl = mod.add_class('Tupl')
+    Tupl = mod.add_class('Tupl', inline_storage=True)
     Tupl.add_binary_comparison_operator('<')
     Tupl.add_binary_comparison_operator('<=')
     Tupl.add_binary_comparison_operator('>=')
@@ -661,6 +696,34 @@ int %s::custom_method_added_by_a_hook(int x)
                    is_virtual=True)
 
 
+    ## METH_FASTCALL wrappers
+    mod.add_function('get_int_from_string', ReturnValue.new('int'),
+                     [Parameter.new('const char*', 'from_string'),
+                      Parameter.new('int', 'multiplier', default_value='1')],
+                     custom_name="get_int_from_string_fastcall", fastcall=True)
+    mod.add_function('get_int_from_float', ReturnValue.new('int'),
+                     [Parameter.new('double', 'from_float'),
+                      Parameter.new('int', 'multiplier')],
+                     custom_name="get_int_from_float_fastcall", fastcall=True)
+    mod.add_function('my_inverse_func3', 'double', [Parameter.new('double', 'x')],
+                     throw=[std_exception], custom_name="my_inverse_func3_fastcall", fastcall=True)
+    FastcallPoint = mod.add_class('FastcallPoint', inline_storage=True)
+    FastcallPoint.add_constructor([Parameter.new('int', 'x'),
+                                   Parameter.new('double', 'y', default_value='0.5')],
+                                  fastcall=True)
+    FastcallPoint.add_method('get_x', 'int', [], is_const=True, fastcall=True)
+    FastcallPoint.add_method('get_y', 'double', [], is_const=True, fastcall=True)
+    FastcallPoint.add_method('scaled', 'double', [Parameter.new('double', 'factor'),
+                                                  Parameter.new('int', 'offset', default_value='0')],
+                             is_const=True, fastcall=True)
+    FastcallPoint.add_method('add_x', 'int', [Parameter.new('int', 'delta')], is_const=True, fastcall=True)
+
+    AlignedValue = mod.add_class('AlignedValue', inline_storage=True)
+    AlignedValue.add_constructor([Parameter.new('double', 'value')])
+    AlignedValue.add_copy_constructor()
+    AlignedValue.add_method('get_value', 'double', [], is_const=True)
+    AlignedValue.add_method('is_aligned', 'bool', [], is_const=True)
+
 
     #### --- error handler ---
     class MyErrorHandler(pybindgen.settings.ErrorHandler):
@@ -677,9 +740,15 @@ int %s::custom_method_added_by_a_hook(int x)
     pybindgen.settings.error_handler = MyErrorHandler()
 
     foomodulegen_common.customize_module(mod)
-
-    ## ---- finally, generate the whole thing ----
-    mod.generate(FileCodeSink(out_file))
+    ## the other test modules keep using the std::map wrapper registry
+    pybindgen.settings.wrapper_registry = pybindgen.settings.HashTableWrapperRegistry
+    ## and shared goto cleanup epilogues in the wrappers
+    pybindgen.settings.goto_cleanup = True
+    ## with the wrapper bodies optimized
+    pybindgen.settings.optimize_wrapper_bodies = True
+
+    ## ---- finally, generate the whole thing, streaming it ----
+    mod.generate(FileCodeSink(out_file), streaming=True)
 
 
 if __name__ == '__main__':
@@ -5,6 +5,7 @@ import gc
 import os.path
 import copy
 import resource
+import struct
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
                                 '..', 'build', 'tests'))
@@ -139,6 +140,25 @@ class TestFoo(unittest.TestCase):
 
         self.assertRaises(TypeError, foo.get_int, [123])
 
+    def test_overloaded_functions_dispatch(self):
+        self.assertEqual(foo.get_int(from_float=2.0, multiplier=3), 6)
+        self.assertEqual(foo.get_int(from_string="2", multiplier=3), 6)
+        self.assertEqual(foo.get_int(12), 12)
+
+        class Number(object):
+            def __float__(self):
+                return 7.0
+        self.assertEqual(foo.get_int(Number()), 7)
+
+        ## when nothing matches, the error lists every overload
+        try:
+            foo.get_int("1", from_float=2.0)
+        except TypeError as ex:
+            self.assertEqual(len(ex.args[0]), 2)
+        else:
+            self.fail("expected TypeError")
+        self.assertRaises(TypeError, foo.get_int, 1.0, 2, 3)
+
     def test_default_value(self):
         v1 = foo.get_int(123.0)
         self.assertEqual(v1, 123)
@@ -146,6 +166,71 @@ class TestFoo(unittest.TestCase):
         v1 = foo.get_int(123.0, 2)
         self.assertEqual(v1, 123*2)
 
+    def test_wrapper_registry_info(self):
+        info_func = getattr(foo, '_PyZbr_wrapper_registry_info', None)
+        if info_func is None:
+            self.skipTest("module not using HashTableWrapperRegistry")
+        objs = [foo.SomeObject("") for dummy in range(200)]
+        zbrs = [obj.get_internal_zbr() for obj in objs]
+        for obj, zbr in zip(objs, zbrs):
+            self.assertTrue(obj.get_internal_zbr() is zbr)
+        info = info_func()
+        self.assertTrue(info['size'] >= len(zbrs))
+        self.assertTrue(info['size'] <= info['capacity'])
+        self.assertEqual(info['capacity'] & (info['capacity'] - 1), 0)
+        self.assertAlmostEqual(info['load_factor'], float(info['size']) / info['capacity'])
+        size = info['size']
+        del zbrs, zbr
+        while gc.collect():
+            pass
+        self.assertEqual(info_func()['size'], size - len(objs))
+        del objs
+
+    def test_freelist(self):
+        if not hasattr(foo, '_PyFoo_freelist_info'):
+            self.skipTest("module not using freelists")
+        while gc.collect():
+            pass
+        info = foo._PyFoo_freelist_info()
+        self.assertEqual(info['capacity'], 8)
+        objs = [foo.Foo("x") for dummy in range(20)]
+        del objs
+        info2 = foo._PyFoo_freelist_info()
+        self.assertEqual(info2['size'], 8)
+        ## allocations from the freelist, both from python and C++
+        f = foo.Foo("hello")
+        obj = foo.SomeObject("")
+        obj.set_foo_value(f)
+        f2 = obj.get_foo_value()
+        self.assertEqual(f2.get_datum(), "hello")
+        info3 = foo._PyFoo_freelist_info()
+        self.assertEqual(info3['hits'], info2['hits'] + 2)
+        self.assertEqual(info3['size'], 6)
+        self.assertTrue(info2['misses'] >= info['misses'] + 20 - info['size'])
+
+        ## gc-enabled wrappers
+        objs = [foo.SomeObject("") for dummy in range(10)]
+        del objs
+        while gc.collect():
+            pass
+        self.assertEqual(foo._PySomeObject_freelist_info()['size'], 4)
+        obj3 = foo.SomeObject("x")
+        self.assertEqual(obj3.get_prefix(), "x")
+        self.assertEqual(foo._PySomeObject_freelist_info()['size'], 3)
+
+        ## subclasses don't use the freelist
+        class MySomeObject(foo.SomeObject):
+            pass
+        hits = foo._PySomeObject_freelist_info()['hits']
+        obj2 = MySomeObject("y")
+        self.assertEqual(obj2.get_prefix(), "y")
+        del obj2
+        while gc.collect():
+            pass
+        info = foo._PySomeObject_freelist_info()
+        self.assertEqual(info['hits'], hits)
+        self.assertEqual(info['size'], 3)
+
     def test_overloaded_methods(self):
         obj = foo.SomeObject("zbr")
 
@@ -239,6 +324,53 @@ class TestFoo(unittest.TestCase):
         t = Test("xxx")
         self.assertEqual(t.call_get_prefix(), "yyy")
 
+    def test_virtual_override_many_subclasses(self):
+        ## more python classes than the helper class remembers at once
+        classes = []
+        for num in range(20):
+            if num % 2:
+                classes.append(type(str("Test%i" % num), (foo.SomeObject,),
+                                    {'get_prefix': lambda self, num=num: "yyy%i" % num}))
+            else:
+                classes.append(type(str("Test%i" % num), (foo.SomeObject,), {}))
+        for dummy in range(2):
+            for num, class_ in enumerate(classes):
+                t = class_("xxx")
+                self.assertEqual(t.call_get_prefix(), (num % 2) and "yyy%i" % num or "xxx")
+
+    def test_virtual_subclass_modified(self):
+        class Test(foo.SomeObject):
+            pass
+
+        t = Test("xxx")
+        self.assertEqual(t.call_get_prefix(), "xxx")
+        ## overriding after the first call must be noticed
+        Test.get_prefix = lambda self: "yyy"
+        self.assertEqual(t.call_get_prefix(), "yyy")
+        del Test.get_prefix
+        self.assertEqual(t.call_get_prefix(), "xxx")
+        ## so must overriding on the instance
+        t.get_prefix = lambda: "zzz"
+        self.assertEqual(t.call_get_prefix(), "zzz")
+
+    def test_virtual_override_arguments(self):
+        received = []
+        class Test(foo.SomeObject):
+            def get_something(self, *args):
+                received.append(args)
+                return "[%r]" % (args,)
+            def get_prefix_with_foo_value(self, *args):
+                received.append(args)
+                return "foo"
+
+        t = Test("xxx")
+        self.assertEqual(t.call_get_something(123), "[(123,)]")
+        self.assertTrue(type(received[0][0]) is int)
+        self.assertEqual(t.call_get_prefix_with_foo_value(foo.Foo("bar")), "foo")
+        self.assertEqual(len(received[1]), 1)
+        self.assertTrue(isinstance(received[1][0], foo.Foo))
+        self.assertEqual(received[1][0].get_datum(), "bar")
+
     def test_virtual_with_chaining_to_parent_class(self):
         class Test(foo.SomeObject):
             def get_prefix(self):
@@ -889,6 +1021,113 @@ class TestFoo(unittest.TestCase):
         rv = foo.set_simple_list(l)
         self.assertEqual(rv, sum(range(10)))
 
+    def test_container_buffer(self):
+        container = foo.get_double_vector(4)
+        view = memoryview(container)
+        self.assertEqual(view.format, 'd')
+        self.assertEqual(view.itemsize, 8)
+        self.assertEqual(view.shape, (4,))
+        self.assertFalse(view.readonly)
+        self.assertEqual(view.tolist(), [0.0, 0.5, 1.0, 1.5])
+
+        ## writes through the view are seen by C++
+        view[0] = 10.0
+        self.assertEqual(list(container), [10.0, 0.5, 1.0, 1.5])
+        self.assertEqual(foo.sum_double_vector(container), 13.0)
+
+        ## each view has its own shape
+        view2 = memoryview(container)
+        self.assertEqual(view2.shape, (4,))
+        view2.release()
+        self.assertEqual(view.shape, (4,))
+
+        ## the container cannot be resized while a view is alive
+        self.assertRaises(BufferError, container.__init__, [1.0])
+        view.release()
+        container.__init__([1.0])
+        self.assertEqual(list(container), [1.0])
+
+        self.assertEqual(memoryview(foo.get_double_vector(0)).tolist(), [])
+
+    def test_buffer_parameters(self):
+        import array
+        self.assertEqual(foo.sum_doubles(array.array('d', [1.0, 2.0, 3.5])), 6.5)
+        self.assertEqual(foo.sum_doubles(array.array('d')), 0.0)
+        self.assertEqual(foo.sum_doubles(foo.get_double_vector(4)), 3.0)
+        self.assertRaises(TypeError, foo.sum_doubles, array.array('f', [1.0]))
+        self.assertRaises(TypeError, foo.sum_doubles, [1.0, 2.0])
+        self.assertRaises(BufferError, foo.sum_doubles, memoryview(array.array('d', [1.0, 2.0, 3.0]))[::2])
+
+        ints = array.array('i', [1, 2, 3])
+        self.assertEqual(foo.scale_ints(ints, 3), None)
+        self.assertEqual(ints.tolist(), [3, 6, 9])
+        self.assertRaises(BufferError, foo.scale_ints, memoryview(ints).toreadonly(), 2)
+        self.assertEqual(ints.tolist(), [3, 6, 9])
+
+    def test_buffer_return_value(self):
+        count = foo.FrameBuffer.instance_count
+        frame = foo.FrameBuffer(16)
+        view = frame.get_data()
+        self.assertTrue(isinstance(view, memoryview))
+        self.assertEqual(view.format, 'B')
+        self.assertEqual(len(view), 16)
+        self.assertFalse(view.readonly)
+        view[3] = 7
+        view[15] = 5
+        self.assertEqual(frame.get_checksum(), 12)
+
+        const_view = frame.get_const_data()
+        self.assertTrue(const_view.readonly)
+        self.assertEqual(const_view[3], 7)
+        self.assertRaises(TypeError, const_view.__setitem__, 0, 1)
+
+        ## the views keep the frame alive
+        del frame
+        gc.collect()
+        self.assertEqual(foo.FrameBuffer.instance_count, count + 1)
+        self.assertEqual(bytes(view[3:4]), b'\x07')
+        del view, const_view
+        gc.collect()
+        self.assertEqual(foo.FrameBuffer.instance_count, count)
+
+        doubles = foo.get_static_doubles()
+        self.assertEqual(doubles.format, 'd')
+        self.assertTrue(doubles.readonly)
+        self.assertEqual(doubles.tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(foo.get_null_doubles(), None)
+
+    def test_batch_wrappers(self):
+        self.assertEqual(foo.scale_double_batch([(1.0, 2.0), (3.0, 0.5)]), [2.0, 1.5])
+        self.assertEqual(foo.scale_double_batch(()), [])
+        self.assertEqual(foo.square_int_batch(range(5)), [0, 1, 4, 9, 16])
+        self.assertRaises(TypeError, foo.scale_double_batch, [(1.0, 2.0), 3.0])
+        self.assertRaises(TypeError, foo.square_int_batch, [1, "2"])
+        self.assertRaises(TypeError, foo.square_int_batch, 3)
+
+        frames = [foo.FrameBuffer(4) for i in range(3)]
+        self.assertEqual(foo.FrameBuffer.set_byte_batch([(frame, i, i + 1) for i, frame in enumerate(frames)]),
+                         None)
+        self.assertEqual(foo.FrameBuffer.get_checksum_batch(frames), [1, 2, 3])
+        self.assertRaises(TypeError, foo.FrameBuffer.get_checksum_batch, [frames[0], foo.Foo()])
+
+    def test_ufunc(self):
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        self.assertEqual(foo.lerp(1.0, 3.0, 0.5), 2.0)
+        self.assertEqual(foo.xpto.midpoint(1.0, 2.0), 1.5)
+        if numpy is None:
+            self.assertRaises(TypeError, foo.lerp, 1.0, 3.0)
+            return
+        self.assertTrue(isinstance(foo.lerp, numpy.ufunc))
+        self.assertTrue(isinstance(foo.xpto.midpoint, numpy.ufunc))
+        self.assertEqual(foo.xpto.midpoint(numpy.array([0.0, 1.0]), 3.0).tolist(), [1.5, 2.0])
+        result = foo.lerp(numpy.array([0.0, 1.0, 2.0]), 4.0, numpy.array([[0.5], [0.25]]))
+        self.assertEqual(result.shape, (2, 3))
+        self.assertEqual(result.tolist(), [[2.0, 2.5, 3.0], [1.0, 1.75, 2.5]])
+        self.assertEqual(foo.lerp(numpy.arange(3, dtype=numpy.float32), 2.0, 0.5).dtype, numpy.float32)
+
     def test_container_reverse_wrappers(self):
         class MyTestContainer(foo.TestContainer):
             def __init__(self):
@@ -1096,6 +1335,34 @@ class TestFoo(unittest.TestCase):
         r = t.get_vec_ptr()
         self.assertEqual(list(r), ["hello", "world"])
 
+    def test_inline_storage(self):
+        t1 = foo.Tupl()
+        t1.x = 1
+        t1.y = 2
+        t2 = foo.Tupl(t1)
+        t3 = copy.copy(t1)
+        t4 = t1 + t2
+        del t1
+        while gc.collect():
+            pass
+        self.assertEqual((t2.x, t2.y), (1, 2))
+        self.assertEqual((t3.x, t3.y), (1, 2))
+        self.assertEqual((t4.x, t4.y), (2, 4))
+        t4 += 3
+        self.assertEqual((t4.x, t4.y), (5, 7))
+
+        if which == 1:
+            ## the wrapper structure holds the two ints of the object
+            self.assertTrue(foo.Tupl.__basicsize__ >= foo.Foo.__basicsize__ + struct.calcsize('ii'))
+
+    def test_inline_storage_alignment(self):
+        ## objects are only constructed inside suitably aligned wrappers
+        values = [foo.AlignedValue(float(i)) for i in range(32)]
+        values += [copy.copy(value) for value in values]
+        for i, value in enumerate(values):
+            self.assertTrue(value.is_aligned())
+            self.assertEqual(value.get_value(), float(i % 32))
+
     def test_richcompare(self):
         t1 = foo.Tupl()
 
@@ -1607,6 +1874,43 @@ class TestFoo(unittest.TestCase):
         self.assertTrue(diff < leaky)
         self.assertTrue(leaky > size * 10)
 
+    def test_fastcall_function(self):
+        self.assertEqual(foo.get_int_from_string_fastcall("123"), 123)
+        self.assertEqual(foo.get_int_from_string_fastcall("123", 2), 246)
+        self.assertEqual(foo.get_int_from_string_fastcall("123", multiplier=3), 369)
+        self.assertEqual(foo.get_int_from_string_fastcall(multiplier=3, from_string="2"), 6)
+        self.assertEqual(foo.get_int_from_float_fastcall(2.5, 2), 4)
+        self.assertEqual(foo.get_int_from_float_fastcall(2, 2), 4)
+        self.assertRaises(TypeError, foo.get_int_from_string_fastcall)
+        self.assertRaises(TypeError, foo.get_int_from_string_fastcall, "1", 2, 3)
+        self.assertRaises(TypeError, foo.get_int_from_string_fastcall, "1", foo=2)
+        self.assertRaises(TypeError, foo.get_int_from_string_fastcall, "1", from_string="2")
+        self.assertRaises(TypeError, foo.get_int_from_string_fastcall, 1)
+        self.assertRaises(TypeError, foo.get_int_from_float_fastcall, 1.0)
+        self.assertRaises(TypeError, foo.get_int_from_float_fastcall, 1.0, "x")
+
+    def test_fastcall_single_arg(self):
+        self.assertEqual(foo.my_inverse_func3_fastcall(2.0), 0.5)
+        self.assertEqual(foo.my_inverse_func3_fastcall(4), 0.25)
+        self.assertRaises(foo.exception, foo.my_inverse_func3_fastcall, 0)
+        self.assertRaises(TypeError, foo.my_inverse_func3_fastcall)
+        self.assertRaises(TypeError, foo.my_inverse_func3_fastcall, "x")
+
+    def test_fastcall_class(self):
+        point = foo.FastcallPoint(3)
+        self.assertEqual(point.get_x(), 3)
+        self.assertEqual(point.get_y(), 0.5)
+        point = foo.FastcallPoint(4, y=1.5)
+        self.assertEqual(point.get_x(), 4)
+        self.assertEqual(point.get_y(), 1.5)
+        self.assertEqual(point.scaled(2.0), 8.0)
+        self.assertEqual(point.scaled(2.0, offset=1), 10.0)
+        self.assertEqual(point.add_x(10), 14)
+        self.assertRaises(TypeError, foo.FastcallPoint)
+        self.assertRaises(TypeError, foo.FastcallPoint, "x")
+        self.assertRaises(TypeError, foo.FastcallPoint, 1, z=2)
+        self.assertRaises(TypeError, point.get_x, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,6 @@
 from __future__ import unicode_literals, print_function
 import pybindgen.typehandlers.base as typehandlers
-from pybindgen.typehandlers import stringtype, ctypeparser
+from pybindgen.typehandlers import stringtype, ctypeparser, codeir
 import pybindgen.typehandlers.codesink as codesink
 from pybindgen import module, cppclass, overloading, utils
 
@@ -9,6 +9,9 @@ import unittest
 import doctest
 import re
 import sys
+import os
+import tempfile
+import shutil
 
 
 class SmartPointerTransformation(typehandlers.TypeTransformation):
@@ -61,6 +64,400 @@ class ParamLookupTests(unittest.TestCase):
         self.assertTrue(isinstance(transformed, TestParam))
         self.assertTrue(transformed.has_been_transformed)
 
+    def testLookupCache(self):
+        matcher = typehandlers.TypeMatcher()
+        matcher.register('cachedtype*', TestParam)
+        handler, transf, traits = matcher.lookup('cachedtype*')
+        self.assertEqual(matcher.get_cache_stats(), (0, 1, 1))
+        traits.make_target_const()
+        handler2, transf2, traits2 = matcher.lookup('cachedtype*')
+        self.assertEqual(matcher.get_cache_stats(), (1, 1, 1))
+        self.assertTrue(handler2 is handler)
+        self.assertEqual(str(traits2.ctype), 'cachedtype *')
+
+        ## failed lookups are cached too, until a new type is registered
+        self.assertRaises(typehandlers.TypeLookupError, matcher.lookup, 'othertype*')
+        self.assertRaises(typehandlers.TypeLookupError, matcher.lookup, 'othertype*')
+        self.assertEqual(matcher.get_cache_stats(), (2, 2, 2))
+        matcher.add_type_alias('cachedtype*', 'othertype*')
+        self.assertTrue(matcher.lookup('othertype*')[0] is TestParam)
+        self.assertEqual(matcher.get_cache_stats(), (2, 3, 1))
+
+
+class BalancedMultiSectionFactoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_directory(self):
+        """Returns a new directory for generated files, removed after the test"""
+        return tempfile.mkdtemp(dir=self.directory)
+
+    def testAssignSections(self):
+        from pybindgen import ReturnValue, Parameter
+        mod = module.Module('balanced')
+        for num in range(8):
+            mod.add_function('func%i' % num, ReturnValue.new('int'),
+                             [Parameter.new('int', 'x%i' % arg) for arg in range(num)])
+        base = mod.add_class('Base')
+        derived = mod.add_class('Derived', parent=base)
+        derived.add_method('method', None, [])
+        ## anonymous enums, in a class and in the module
+        class_enum = base.add_enum('', ['CONSTANT_A', 'CONSTANT_B'])
+        module_enum = mod.add_enum('', [('VALUE_A', '1'), ('VALUE_B', '2')])
+        directory = self.make_directory()
+        factory = module.BalancedMultiSectionFactory(directory, 'balanced', num_sections=3)
+        group_sizes = [group[0] for group in factory._get_groups(mod)]
+        factory.assign_sections(mod)
+        factory.close()
+
+        section_names = factory.get_section_names()
+        self.assertEqual(base.section, derived.section)
+        self.assertTrue(base.section in section_names)
+        self.assertTrue(class_enum.section in section_names)
+        self.assertTrue(module_enum.section in section_names)
+        for overload in mod.functions.values():
+            for wrapper in overload.wrappers:
+                self.assertTrue(wrapper.section in section_names)
+        average_size = float(sum(group_sizes))/3
+        self.assertEqual(sum(factory.section_sizes), sum(group_sizes))
+        self.assertTrue(max(factory.section_sizes)
+                        <= average_size + max(average_size*factory.BALANCE_TOLERANCE, max(group_sizes)))
+        self.assertEqual(len(factory.get_file_names()), 4)
+
+    def testParallelGeneration(self):
+        from pybindgen import ReturnValue, Parameter
+        def make_module():
+            mod = module.Module('balanced')
+            mod.add_include('<string>')
+            for num in range(6):
+                mod.add_function('func%i' % num, ReturnValue.new('int'),
+                                 [Parameter.new('std::string', 'x%i' % arg) for arg in range(num)])
+            klass = mod.add_class('Klass')
+            klass.add_constructor([])
+            klass.add_method('method', None, [Parameter.new('double', 'x')])
+            return mod
+        sources = []
+        for jobs in [None, 3]:
+            directory = self.make_directory()
+            factory = module.BalancedMultiSectionFactory(directory, 'balanced', num_sections=3)
+            make_module().generate(factory, jobs=jobs)
+            factory.close()
+            sources.append([open(file_name).read() for file_name in factory.get_file_names()
+                            + [os.path.join(directory, factory.header_name)]])
+        self.assertEqual(sources[0], sources[1])
+
+    def testParallelErrorHandling(self):
+        from pybindgen import ReturnValue, Parameter, settings
+        class BrokenReturnValue(ReturnValue):
+            CTYPES = []
+            def convert_c_to_python(self, wrapper):
+                raise utils.NotSupportedError("broken return value")
+            def convert_python_to_c(self, wrapper):
+                raise utils.NotSupportedError("broken return value")
+        log_file_name = os.path.join(self.directory, 'errors.log')
+        class RecordingErrorHandler(settings.ErrorHandler):
+            def __init__(self, handled=True):
+                super(RecordingErrorHandler, self).__init__()
+                self.handled = handled
+                self.errors = []
+            def handle_error(self, wrapper, exception, traceback_):
+                self.errors.append((re.sub(" at 0x[0-9a-f]+", "", str(wrapper)), str(exception)))
+                ## a side effect seen by all processes
+                with open(log_file_name, 'a') as log_file:
+                    log_file.write('%s\n' % (exception,))
+                return self.handled
+        def make_module():
+            mod = module.Module('errors')
+            for num in range(6):
+                mod.add_function('func%i' % num, ReturnValue.new('int'), [Parameter.new('int', 'x')])
+                mod.add_function('broken%i' % num, BrokenReturnValue('int'), [])
+            return mod
+        old_error_handler = settings.error_handler
+        results = []
+        try:
+            for jobs in [None, 3]:
+                settings.error_handler = RecordingErrorHandler()
+                directory = self.make_directory()
+                factory = module.BalancedMultiSectionFactory(directory, 'errors', num_sections=3)
+                make_module().generate(factory, jobs=jobs)
+                factory.close()
+                with open(log_file_name) as log_file:
+                    num_calls = len(log_file.readlines())
+                os.remove(log_file_name)
+                results.append((settings.error_handler.errors, num_calls,
+                                [open(file_name).read() for file_name in factory.get_file_names()]))
+
+            ## errors that the handler does not handle abort the generation
+            settings.error_handler = RecordingErrorHandler(handled=False)
+            factory = module.BalancedMultiSectionFactory(self.make_directory(), 'errors', num_sections=3)
+            self.assertRaises(utils.NotSupportedError, make_module().generate, factory, jobs=3)
+            factory.close()
+        finally:
+            settings.error_handler = old_error_handler
+        self.assertEqual(len(results[0][0]), 6)
+        self.assertEqual(results[0][1], 6)
+        self.assertEqual(results[0], results[1])
+
+    def testWriteIfChanged(self):
+        from pybindgen import ReturnValue, Parameter
+        directory = self.make_directory()
+        def generate(num_functions):
+            mod = module.Module('changes')
+            for num in range(num_functions):
+                mod.add_function('func%i' % num, ReturnValue.new('int'), [Parameter.new('int', 'x')])
+            factory = module.BalancedMultiSectionFactory(directory, 'changes', num_sections=3,
+                                                         write_if_changed=True)
+            mod.generate(factory)
+            factory.close()
+            return factory
+        factory = generate(3)
+        self.assertEqual(len(factory.changed_files), 5)
+        self.assertEqual(factory.unchanged_files, [])
+        mtimes = dict([(name, os.stat(name).st_mtime) for name in factory.changed_files])
+
+        factory = generate(3)
+        self.assertEqual(factory.changed_files, [])
+        self.assertEqual(sorted(factory.unchanged_files), sorted(mtimes))
+        for name, mtime in mtimes.items():
+            self.assertEqual(os.stat(name).st_mtime, mtime)
+
+        ## a new function changes the main file (function table) and one section
+        factory = generate(4)
+        self.assertEqual(len(factory.changed_files), 2)
+        self.assertTrue(os.path.join(directory, 'changes.cc') in factory.changed_files)
+        self.assertEqual(sorted(os.listdir(directory)),
+                         sorted([os.path.basename(name) for name in mtimes]))
+
+    def testStableAssignment(self):
+        from pybindgen import ReturnValue, Parameter
+        directory = self.make_directory()
+        def generate(extra_method):
+            mod = module.Module('stable')
+            for num in range(40):
+                klass = mod.add_class('Klass%i' % num)
+                klass.add_constructor([])
+                for method in range(num % 5 + 1):
+                    klass.add_method('method%i' % method, ReturnValue.new('int'),
+                                     [Parameter.new('int', 'x')])
+                if extra_method and num == 17:
+                    klass.add_method('extra', None, [Parameter.new('double', 'x')])
+            factory = module.BalancedMultiSectionFactory(directory, 'stable', num_sections=8,
+                                                         write_if_changed=True)
+            mod.generate(factory)
+            factory.close()
+            return factory
+        generate(False)
+        factory = generate(True)
+        ## the main file, the header and the section of the class
+        self.assertTrue(len(factory.changed_files) <= 3)
+        self.assertTrue(len([name for name in factory.changed_files if '-section' in name]) <= 1)
+
+
+
+class CodeSinkTests(unittest.TestCase):
+
+    def testNestedFlush(self):
+        import io
+        inner = codesink.MemoryCodeSink()
+        inner.writeln("a();")
+        inner.indent()
+        inner.writeln("b();  \n\nc();")
+        inner.writeln("    ")
+        inner.unindent()
+        middle = codesink.MemoryCodeSink()
+        middle.writeln("{")
+        middle.indent()
+        inner.flush_to(middle)
+        middle.unindent()
+        position = middle.get_position()
+        middle.writeln("}")
+        self.assertEqual(middle.get_lines(position), ["}"])
+        out = io.StringIO()
+        file_sink = codesink.FileCodeSink(out)
+        file_sink.indent(2)
+        middle.flush_to(file_sink)
+        self.assertEqual(out.getvalue(),
+                         "  {\n"
+                         "      a();\n"
+                         "          b();\n"
+                         "  \n"
+                         "          c();\n"
+                         "  \n"
+                         "  }\n")
+        self.assertEqual(middle.lines, [])
+
+    def testSpool(self):
+        import io
+        def write(sink):
+            sink.writeln("a();  ")
+            sink.indent()
+            inner = codesink.MemoryCodeSink()
+            inner.writeln("b();\n\n    c();")
+            inner.indent()
+            inner.writeln("")
+            inner.unindent()
+            inner.flush_to(sink)
+            sink.unindent()
+            sink.writeln("d();")
+        memory = codesink.MemoryCodeSink()
+        write(memory)
+        expected = io.StringIO()
+        memory.flush_to(codesink.FileCodeSink(expected))
+        self.assertEqual(expected.getvalue(), "a();\n    b();\n\n        c();\n\nd();\n")
+
+        ## copied by the operating system into a real file
+        spool = codesink.SpoolCodeSink('utf-8')
+        write(spool)
+        with tempfile.TemporaryFile('w+t', encoding='utf-8') as out:
+            out_sink = codesink.FileCodeSink(out)
+            out_sink.writeln("x();")
+            spool.flush_to(out_sink)
+            out_sink.writeln("y();")
+            out.seek(0)
+            self.assertEqual(out.read(), "x();\n" + expected.getvalue() + "y();\n")
+
+        ## written line by line into any other sink
+        write(spool)
+        out = io.StringIO()
+        out_sink = codesink.FileCodeSink(out)
+        out_sink.indent(2)
+        spool.flush_to(out_sink)
+        self.assertEqual(out.getvalue(), "  a();\n      b();\n  \n          c();\n  \n  d();\n")
+        spool.close()
+
+
+class WrapperGenerationTests(unittest.TestCase):
+
+    def testGenerateBodyOnce(self):
+        from pybindgen import ReturnValue, Parameter
+        mod = module.Module('memo')
+        mod.add_function('func', ReturnValue.new('int'), [Parameter.new('int', 'x')])
+        overload = mod.functions['func']
+        wrapper = overload.wrappers[0]
+        calls = []
+        generate_body = wrapper.generate_body
+        def counting_generate_body(*args, **kwargs):
+            calls.append(args)
+            return generate_body(*args, **kwargs)
+        wrapper.generate_body = counting_generate_body
+
+        sink = codesink.MemoryCodeSink()
+        overload.generate(sink)
+        overload.generate_declaration(codesink.MemoryCodeSink())
+        overload.get_py_method_def('func')
+        self.assertEqual(len(calls), 1)
+        result = wrapper.get_generation_result()
+        self.assertEqual(result.wrapper_actual_name, wrapper.wrapper_actual_name)
+        self.assertEqual(list(result.wrapper_args), wrapper.wrapper_args)
+        code = sink.flush()
+        ## once written, only the flags and the prototype are kept
+        self.assertEqual(result.body, None)
+        self.assertEqual(result.flags, tuple(sorted(wrapper.get_py_method_def_flags())))
+        declaration = codesink.MemoryCodeSink()
+        wrapper.generate_declaration(declaration)
+        self.assertEqual(declaration.flush(), "%s %s(%s);\n" % (result.wrapper_return, result.wrapper_actual_name,
+                                                                ', '.join(result.wrapper_args)))
+        self.assertEqual(len(calls), 1)
+
+        ## writing the wrapper again generates the body again
+        sink = codesink.MemoryCodeSink()
+        overload.generate(sink)
+        self.assertEqual(sink.flush(), code)
+        self.assertEqual(len(calls), 2)
+
+    def testUfuncThrow(self):
+        from pybindgen import ReturnValue, Parameter
+        mod = module.Module('ufuncs')
+        error = mod.add_exception('Error')
+        ufunc = mod.add_ufunc('scale', ReturnValue.new('double'), [Parameter.new('double', 'x')])
+        self.assertEqual(ufunc.get_ufunc_types(), ['double', 'double'])
+        throwing = mod.add_ufunc('checked_scale', ReturnValue.new('double'), [Parameter.new('double', 'x')],
+                                 throw=[error])
+        self.assertRaises(utils.TypeConfigurationError, throwing.get_ufunc_types)
+        self.assertRaises(utils.TypeConfigurationError, mod.generate, codesink.NullCodeSink())
+
+    def testUfuncSubmodule(self):
+        from pybindgen import ReturnValue, Parameter
+        mod = module.Module('ufuncs')
+        submod = mod.add_cpp_namespace('ns')
+        submod.add_ufunc('scale', ReturnValue.new('double'), [Parameter.new('double', 'x')])
+        sink = codesink.MemoryCodeSink()
+        mod.generate(sink)
+        code = sink.flush()
+        ## the ufunc replaces the function in the submodule's init function
+        submodule_init = code[code.index('%s(void)' % submod.init_function_name):code.index('MOD_INIT(ufuncs)')]
+        self.assertTrue('ns::scale(' in code)
+        self.assertTrue('PyModule_AddObject(m, (char *) "scale", ufunc);' in submodule_init)
+
+    def testUfuncInt64(self):
+        from pybindgen import ReturnValue, Parameter
+        mod = module.Module('ufuncs')
+        mod.add_ufunc('twice', ReturnValue.new('int64_t'), [Parameter.new('int64_t', 'x')])
+        mod.add_ufunc('twice', ReturnValue.new('double'), [Parameter.new('double', 'x')])
+        sink = codesink.MemoryCodeSink()
+        mod.generate(sink)
+        ## int64 arrays are NPY_LONG on LP64 platforms, NPY_LONGLONG elsewhere
+        self.assertTrue('static char _wrap_ufuncs_twice__ufunc_types[] = '
+                        '{(sizeof(long) == 8 ? 7 : 9), (sizeof(long) == 8 ? 7 : 9), 12, 12};' in sink.flush())
+
+    def testHashTableWrapperRegistryImport(self):
+        from pybindgen import settings
+        old_wrapper_registry = settings.wrapper_registry
+        settings.wrapper_registry = settings.HashTableWrapperRegistry
+        try:
+            mod = module.Module('importer')
+            mod.add_class('Foo', import_from_module='other')
+            sink = codesink.MemoryCodeSink()
+            mod.generate(sink)
+        finally:
+            settings.wrapper_registry = old_wrapper_registry
+        lines = [line.strip() for line in sink.flush().split('\n')]
+        ## the import fails if the table of the registry cannot be allocated
+        start = lines.index('_PyFoo_wrapper_registry = (PyBindGenWrapperHashTable *) '
+                            'PyMem_Malloc(sizeof(PyBindGenWrapperHashTable));')
+        self.assertEqual(lines[start+1:start+5], ['if (_PyFoo_wrapper_registry == NULL) {',
+                                                  'PyErr_NoMemory();',
+                                                  'return MOD_ERROR;',
+                                                  '}'])
+
+    def testOptimizeWrapperBody(self):
+        from pybindgen import settings
+        declarations = typehandlers.DeclarationsScope()
+        ## code blocks only keep IR nodes when the option is enabled
+        self.assertFalse(isinstance(typehandlers.CodeBlock('return NULL;', declarations).sink,
+                                    codeir.BodyCodeSink))
+        settings.optimize_wrapper_bodies = True
+        try:
+            block = typehandlers.CodeBlock('return NULL;', declarations)
+        finally:
+            settings.optimize_wrapper_bodies = False
+        unused = declarations.declare_variable('PyObject*', 'py_unused', 'NULL')
+        obj = declarations.declare_variable('PyObject*', 'py_obj')
+        block.write_error_check('!PyArg_ParseTuple(args, (char *) "O", &%s)' % obj)
+        block.add_cleanup_code('Py_DECREF(%s);' % obj)
+        block.write_code('Py_INCREF(%s);' % obj)
+        block.write_error_check('PyErr_Occurred()')
+        block.write_error_check('x = foo(%s)' % obj)
+        block.write_cleanup()
+        body = codeir.render_lines(codeir.optimize(block.sink.take_nodes()))
+        self.assertEqual([line.strip() for line in body], [
+            'if (!PyArg_ParseTuple(args, (char *) "O", &py_obj)) {',
+            'return NULL;',
+            '}',
+            'Py_INCREF(py_obj);',
+            'if (PyErr_Occurred() || (x = foo(py_obj))) {',
+            'Py_DECREF(py_obj);',
+            'return NULL;',
+            '}',
+            'Py_DECREF(py_obj);',
+            ])
+        declarations.remove_variables(codeir.find_unused_variables(declarations.get_variables(), body))
+        self.assertEqual([var[1] for var in declarations.get_variables()], [obj])
+        self.assertEqual(declarations.declare_variable('PyObject*', 'py_unused'), unused + '2')
 
 
 if __name__ == '__main__':
@@ -83,7 +480,11 @@ if __name__ == '__main__':
             suite.addTest(doctest.DocTestSuite(mod))
 
     suite.addTest(doctest.DocTestSuite(ctypeparser))
+    suite.addTest(doctest.DocTestSuite(codeir))
     suite.addTest(unittest.TestLoader().loadTestsFromTestCase(ParamLookupTests))
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BalancedMultiSectionFactoryTests))
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(CodeSinkTests))
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(WrapperGenerationTests))
     runner = unittest.TextTestRunner()
     runner.run(suite)
 